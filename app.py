@@ -14,7 +14,7 @@ from tinydb import TinyDB, Query
 
 from config import DB_FILE, RESERVATION_HISTORY_TBL_NM
 from holiday import Holiday
-from util import load_yaml, merge_configs, already_done
+from util import load_yaml, merge_configs, already_done, estimate_server_offset, wait_until_server_time
 
 VACATION_TBL_NM = 'vacation'
 
@@ -46,56 +46,51 @@ logger.addHandler(console_handler)
 # 전역 세션 객체 (로그인 세션 재사용)
 session = requests.Session()
 
-def save_cookies(cookies, filename):
-    with open(filename, 'w') as cookie_file:
-        for cookie in cookies:
-            cookie_file.write(f"{cookie.name}={cookie.value}\n")
-
-
-def check_session():
-    """현재 세션이 유효한지 확인"""
-    url = "https://hcafe.hgreenfood.com/api/menu/reservation/selectMenuReservationList.do"
-    headers = {
-        "Content-Type": "application/json; charset=UTF-8",
-        "Accept": "application/json, text/javascript, */*; q=0.01"
-    }
-    # 오늘 날짜로 조회 시도
-    payload = {
-        "prvdDt": datetime.now().strftime('%Y%m%d'),
-        "bizplcCd": "196274"
-    }
-    
-    try:
-        response = session.post(url, headers=headers, data=json.dumps(payload), verify=False, timeout=5)
-        if response.status_code == 200:
-            try:
-                # 응답이 JSON이고 errorCode가 있으면 세션 유효
-                res = response.json()
-                if res.get('errorCode') == 0:
-                    return True
-            except:
-                pass
-        return False
-    except:
-        return False
+# 로그인 세션 저장 파일 (쿠키 전체 + 만료 정보)
+COOKIE_FILE = 'cookies.json'
+# 서버 세션 유지 시간 추정치 (초) - 이후에는 저장된 세션을 쓰지 않고 새로 로그인
+SESSION_TTL_SECONDS = 1800
+
+
+def save_cookies(cookie_jar, filename=COOKIE_FILE):
+    """쿠키 저장소 전체(도메인/경로/만료 포함)를 만료 시각과 함께 JSON으로 저장"""
+    cookies = [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "expires": cookie.expires,
+            "secure": cookie.secure,
+        }
+        for cookie in cookie_jar
+    ]
+    expires_at = time.time() + SESSION_TTL_SECONDS
+    cookie_expiries = [cookie["expires"] for cookie in cookies if cookie["expires"]]
+    if cookie_expiries:
+        expires_at = min(expires_at, min(cookie_expiries))
+    with open(filename, 'w', encoding='utf-8') as cookie_file:
+        json.dump({"savedAt": time.time(), "expiresAt": expires_at, "cookies": cookies}, cookie_file)
 
 
 def 로그인(merged_config, force=False):
     """로그인 수행 (force=True일 때만 강제 재로그인)"""
-    # 이미 쿠키 파일이 있고 force가 아니면 기존 세션 사용 시도
-    import os
-    if not force and os.path.exists('cookies.txt'):
-        logger.debug("기존 쿠키 로드 및 세션 확인...")
-        cookies = load_cookies('cookies.txt')
-        for name, value in cookies.items():
-            session.cookies.set(name, value)
-            
-        # 세션 유효성 검사
-        if check_session():
-            logger.info("   기존 세션 유효함")
+    # 만료되지 않은 저장 세션이 있으면 검증 호출 없이 그대로 사용
+    # (만료된 경우 401/403 응답을 받은 쪽에서 force=True로 재로그인)
+    if not force:
+        cookies = load_cookies()
+        if cookies is not None:
+            for cookie in cookies:
+                session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain") or "",
+                    path=cookie.get("path") or "/",
+                    expires=cookie.get("expires"),
+                    secure=bool(cookie.get("secure")),
+                )
+            logger.info("   저장된 세션 재사용")
             return True
-        else:
-            logger.info("   기존 세션 만료됨 - 재로그인 필요")
     
     url = "https://hcafe.hgreenfood.com/api/com/login.do"
     headers = {
@@ -118,7 +113,7 @@ def 로그인(merged_config, force=False):
 
         if response.status_code == 200 and json.loads(response.content)['errorCode'] == 0:
             logger.info("   로그인 성공")
-            save_cookies(response.cookies, 'cookies.txt')
+            save_cookies(session.cookies)
             return True
         else:
             logger.error(f"   로그인 실패: {response.text[:200]}")
@@ -128,14 +123,19 @@ def 로그인(merged_config, force=False):
         return False
 
 
-def load_cookies(filename):
-    cookies = {}
-    with open(filename, 'r', encoding='utf-8') as cookie_file:
-        for line in cookie_file:
-            if line.strip():
-                name, value = line.strip().split('=', 1)
-                cookies[name] = value
-    return cookies
+def load_cookies(filename=COOKIE_FILE):
+    """저장된 세션의 쿠키 목록 (파일이 없거나 만료/손상되었으면 None)"""
+    if not os.path.exists(filename):
+        return None
+    try:
+        with open(filename, 'r', encoding='utf-8') as cookie_file:
+            stored = json.load(cookie_file)
+    except (OSError, ValueError):
+        return None
+    if stored.get("expiresAt", 0) <= time.time():
+        logger.info("   저장된 세션 만료됨 - 재로그인 필요")
+        return None
+    return stored.get("cookies", [])
 
 
 def 예약주문요청(config, conerDvCd, prvdDt):
@@ -225,7 +225,7 @@ def 예약조회요청(prvdDt, bizplcCd="196274", retry_on_auth_fail=True):
             default_config = load_yaml('config.default.yaml')
             merged_config = merge_configs(default_config, user_config)
             
-            if 로그인(merged_config):
+            if 로그인(merged_config, force=True):
                 logger.info("   재로그인 성공")
                 # 재귀 호출 (retry_on_auth_fail=False로 무한 루프 방지)
                 return 예약조회요청(prvdDt, bizplcCd, retry_on_auth_fail=False)
@@ -1124,7 +1124,8 @@ def main():
                 # 예약 시간까지 1분 이상 남음 - 대기
                 logger.info(f"⏳ 예약 시간({reservation_time})까지 대기 ({time_until_reservation/3600:.1f}시간)")
                 # sleep_until_action_time 함수를 사용하여 대기 (인터럽트 지원)
-                sleep_until_action_time(action_date_str, merged_config)
+                # 로그인/서버 시계 동기화를 위해 예약 시간 30초 전에 깨어남
+                sleep_until_action_time(action_date_str, merged_config, early_seconds=30)
                 continue
             
             elif -5 < time_until_reservation <= 60:
@@ -1138,6 +1139,12 @@ def main():
                     time.sleep(60)
                     continue
 
+                # 서버 시계 기준 정각까지 대기 (로컬 시계 오차 보정)
+                server_offset = estimate_server_offset(session, "https://hcafe.hgreenfood.com/")
+                lead = merged_config.get("reserve", {}).get("lead_ms", 0) / 1000
+                logger.info(f"🕐 서버 시계 오차: {server_offset:+.3f}초, 선행 발사: {lead:.3f}초")
+                wait_until_server_time(reservation_time, server_offset, lead)
+
                 max_retries = merged_config.get("max_retry", 10)
                 retry_interval = merged_config.get("retry_interval", 5)
                 
@@ -1191,15 +1198,15 @@ def main():
 # 대기 중단 이벤트 (휴가 추가/삭제 시 사용)
 wait_interrupt_event = threading.Event()
 
-def sleep_until_action_time(action_date_str, merged_config):
-    """다음 Action Date의 13시까지 대기 (인터럽트 가능)"""
+def sleep_until_action_time(action_date_str, merged_config, early_seconds=0):
+    """다음 Action Date의 13시(- early_seconds)까지 대기 (인터럽트 가능)"""
     action_dt = datetime.strptime(action_date_str, '%Y%m%d')
     target_time = action_dt.replace(
         hour=merged_config["reserve"]["at"]["hour"],
         minute=merged_config["reserve"]["at"]["minute"],
         second=merged_config["reserve"]["at"]["second"],
         microsecond=0
-    )
+    ) - timedelta(seconds=early_seconds)
 
     current_time = datetime.now()
     sleep_duration = (target_time - current_time).total_seconds()
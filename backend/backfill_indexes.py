@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+기존 사용자 프로필에 대한 인덱스(포인터) 아이템 생성 스크립트
+- EMAIL#<email>/USER: 로그인 시 이메일 → userId 조회 (full scan 제거)
+- DEVICE#<fingerprint>/USER: 자동 로그인 디바이스 조회 (기존 devices 리스트 → 맵 변환)
+- activeSite: 자동 예약 사용자 sparse GSI(ActiveUsersIndex) 키
+  (실패 없이 끝나면 META/ACTIVE_USERS_INDEXED 기록 → 워커가 스캔 대신 GSI 사용)
+
+Usage: python backfill_indexes.py [--dry-run]
+  테이블: CONFIG_TABLE_NAME (기본 HGreenFoodAutoReserve), 리전: AWS_REGION
+"""
+import os
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Add backend/src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('CONFIG_TABLE_NAME', 'HGreenFoodAutoReserve')
+
+from core.config_store import ConfigStore
+
+
+def scan_profiles(store: ConfigStore) -> Iterator[Dict[str, Any]]:
+    """모든 PROFILE 아이템 스캔 (페이지네이션 포함)"""
+    scan_kwargs: Dict[str, Any] = {
+        'FilterExpression': 'SK = :sk AND begins_with(PK, :pk)',
+        'ExpressionAttributeValues': {':sk': 'PROFILE', ':pk': 'USER#'},
+    }
+    while True:
+        response = store._table.scan(**scan_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def email_index(store: ConfigStore, profile: Dict[str, Any], dry_run: bool) -> bool:
+    """EMAIL# 포인터 생성, 생성(대상)이면 True"""
+    email = profile.get('email')
+    if not email:
+        return False
+    if store.find_user_id_by_email(email) == profile['userId']:
+        return False
+    if not dry_run:
+        store.save_email_index(email, profile['userId'])
+    return True
+
+
+def device_index(store: ConfigStore, profile: Dict[str, Any], dry_run: bool) -> bool:
+    """기존 devices 리스트를 DEVICE# 아이템으로 이전, 이전(대상)이면 True"""
+    devices = profile.get('devices')
+    if isinstance(devices, dict) or not devices:
+        return False
+    if not dry_run:
+        store.adopt_legacy_devices(profile)
+    return True
+
+
+def active_site(store: ConfigStore, profile: Dict[str, Any], dry_run: bool) -> bool:
+    """자동 예약 여부에 맞게 activeSite 설정/제거, 변경(대상)이면 True"""
+    if profile.get('activeSite') == store.active_site_of(profile):
+        return False
+    if not dry_run:
+        store.sync_active_site(profile)
+    return True
+
+
+# (이름, 프로필 하나를 인덱싱하는 함수)
+INDEXES: List[Tuple[str, Callable[[ConfigStore, Dict[str, Any], bool], bool]]] = [
+    ('EMAIL#', email_index),
+    ('DEVICE#', device_index),
+    ('activeSite', active_site),
+]
+
+
+def main() -> None:
+    dry_run = '--dry-run' in sys.argv[1:]
+    store = ConfigStore(region_name=os.environ.get('AWS_REGION', 'ap-northeast-2'))
+
+    counts = {name: 0 for name, _ in INDEXES}
+    failures = {name: 0 for name, _ in INDEXES}
+    profiles = 0
+    for profile in scan_profiles(store):
+        profiles += 1
+        for name, build in INDEXES:
+            try:
+                if build(store, profile, dry_run):
+                    counts[name] += 1
+                    print(f"  {'(dry-run) ' if dry_run else ''}{name} {profile.get('userId')}")
+            except RuntimeError as e:
+                failures[name] += 1
+                print(f"⚠️  {profile.get('userId')} {name} 생성 실패: {e}")
+
+    print(f"\n프로필 {profiles}개 확인")
+    for name, count in counts.items():
+        print(f"  {name}: {count}개 {'생성 예정' if dry_run else '생성'}")
+
+    if dry_run:
+        return
+    if failures['activeSite']:
+        print(f"\n⚠️  activeSite 실패 {failures['activeSite']}개: 워커는 계속 테이블을 스캔합니다 (다시 실행하세요)")
+    else:
+        store.mark_active_users_indexed()
+        print("\nActiveUsersIndex 사용 가능 (META/ACTIVE_USERS_INDEXED 기록)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Lambda cold start import 비용 측정 (python -X importtime)
+- 모듈 import 시간을 별도 프로세스에서 측정해 budget(ms) 초과 시 exit 1
+- API 핸들러 경로에 무거운 모듈(aiohttp, requests 등)이 끌려오면 실패
+
+Usage: python check_import_time.py [module ...] [--budget=MS] [--runs=N] [--top=N]
+  기본 module: app (API Lambda 엔트리포인트)
+  DynamoDB 를 쓰는 핸들러는 boto3 (~150ms) 가 하한이므로 --budget 을 따로 지정
+"""
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+
+DEFAULT_MODULES = ['app']
+DEFAULT_BUDGET_MS = 150.0
+# API 경로 import 시 로드되면 안 되는 모듈 (워커 전용)
+WORKER_ONLY = ['aiohttp', 'requests', 'core.reservation_service', 'core.holiday_service']
+FORBIDDEN = {
+    'app': WORKER_ONLY + ['asyncio', 'boto3'],
+    'auth_handler': WORKER_ONLY,
+    'logout_handler': WORKER_ONLY,
+    'get_registration_status': WORKER_ONLY,
+    'delete_account': WORKER_ONLY,
+    'toggle_auto_reservation': WORKER_ONLY,
+    'register_user': WORKER_ONLY,
+    'update_user_settings': WORKER_ONLY,
+}
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """새 인터프리터에서 module import, (전체 ms, 모듈별 누적 ms) 반환"""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} 실패:\n{result.stderr[-2000:]}")
+
+    # 자식 모듈이 부모보다 먼저 출력됨: module 의 최상위 줄 직전까지가 그 하위 트리
+    # (site 등 인터프리터 시작 시 import 는 제외)
+    subtree: Dict[str, float] = {}
+    cumulative: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        subtree[name.strip()] = int(cumulative_us) / 1000
+        if len(name) - len(name.lstrip()) > 1:  # 들여쓰기 = 하위 import
+            continue
+        if name.strip() == module:
+            cumulative = subtree
+        subtree = {}
+    return cumulative.get(module, 0.0), cumulative
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    options = dict(arg[2:].split('=', 1) for arg in args if arg.startswith('--') and '=' in arg)
+    modules: List[str] = [arg for arg in args if not arg.startswith('--')] or DEFAULT_MODULES
+    budget = float(options.get('budget', DEFAULT_BUDGET_MS))
+    runs = int(options.get('runs', '5'))
+    top = int(options.get('top', '10'))
+
+    failed = False
+    for module in modules:
+        totals = []
+        loaded: Dict[str, float] = {}
+        for _ in range(runs):
+            total, loaded = measure(module)
+            totals.append(total)
+        median = statistics.median(totals)
+
+        print(f"\n[{module}] import {median:.1f}ms (median of {runs}, budget {budget:.0f}ms)")
+        for name, ms in sorted(loaded.items(), key=lambda entry: entry[1], reverse=True)[:top]:
+            print(f"  {ms:8.1f}ms  {name}")
+
+        forbidden = [name for name in FORBIDDEN.get(module, []) if name in loaded]
+        if forbidden:
+            print(f"❌ {module} import 시 로드되면 안 되는 모듈: {', '.join(forbidden)}")
+            failed = True
+        if median > budget:
+            print(f"❌ {module} import {median:.1f}ms > budget {budget:.0f}ms")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+    print("\n✅ import budget OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+hcafe(hcafe.hgreenfood.com) API 로컬 시뮬레이터 - 예약 엔진 부하/지연 테스트용
+- login.do, selectReserveMenuList.do, selectDeliveryInfoTypeList.do,
+  insertReservationOrder.do, selectMenuReservationList.do, updateMenuReservationCancel.do
+- 코너별 수량 / 코너·층별 잔여 수량(remainDeliQty), 예약 오픈 시각, 중복 예약 오류
+- 엔드포인트별 응답 지연(log-normal), 5xx / 타임아웃 / "처리 후 5xx" 주입
+- HEAD /: Date 헤더 (ServerClock), GET /_sim/stats: 집계, POST /_sim/reset: 예약·수량 초기화
+
+Usage: python hcafe_simulator.py [--port=8080] [--open-in=SEC | --open-at=HH:MM:SS] [옵션 ...]
+  --floors=10 --corner-capacity=50 --floor-capacity=5
+  --latency-ms=30 --order-latency-ms=80 --latency-sigma=0.5
+  --error-rate=0 --timeout-rate=0 --timeout-seconds=30 --ambiguous-rate=0
+  --fault-endpoints=insertReservationOrder.do,...  (기본: 전체)  --seed=N
+  클라이언트: HCAFE_BASE_URL=http://127.0.0.1:8080
+"""
+import json
+import math
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add backend/src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.retry import DUPLICATE_RESERVATION_MESSAGE
+
+# (conerDvCd, dispNm) - ReservationClient.MENU_CORNER_MAP 과 같은 코너
+MENUS = [
+    ('0005', '샌드위치'),
+    ('0006', '샐러드'),
+    ('0007', '베이커리'),
+    ('0009', '헬시세트'),
+    ('0010', '닭가슴살'),
+]
+NOT_OPEN_MESSAGE = '예약 가능 시간이 아닙니다.'
+SOLD_OUT_MESSAGE = '잔여 수량이 없습니다.'
+FLOOR_MISMATCH_MESSAGE = '배송지 정보가 올바르지 않습니다.'
+LOGIN_FAILED_MESSAGE = '아이디 또는 비밀번호를 확인해주세요.'
+DELIVERY_PLACE = '현대오토에버 본사'
+
+ENDPOINTS = (
+    'login.do',
+    'selectReserveMenuList.do',
+    'selectDeliveryInfoTypeList.do',
+    'insertReservationOrder.do',
+    'selectMenuReservationList.do',
+    'updateMenuReservationCancel.do',
+)
+
+Response = Tuple[int, Dict[str, Any], Dict[str, str]]
+
+
+@dataclass
+class SimulatorConfig:
+    bizplc_cd: str = '196274'
+    floors: int = 10
+    corner_capacity: int = 50  # 코너별 하루 수량
+    floor_capacity: int = 5  # 코너·층별 배송 수량 (remainDeliQty)
+    opens_at: float = 0.0  # 예약 오픈 시각 (epoch), 0 이면 항상 열림
+    latency_ms: float = 30.0  # 응답 지연 중앙값
+    order_latency_ms: float = 80.0  # insertReservationOrder.do 지연 중앙값
+    latency_sigma: float = 0.5  # log-normal 분산 (0 이면 고정 지연)
+    error_rate: float = 0.0  # 503 응답 비율 (처리 안 함)
+    timeout_rate: float = 0.0  # timeout_seconds 만큼 응답 지연 후 504
+    timeout_seconds: float = 30.0
+    ambiguous_rate: float = 0.0  # 주문 처리 후 503 응답 (클라이언트 재시도 → 중복 예약 오류)
+    fault_endpoints: Tuple[str, ...] = ENDPOINTS
+    seed: Optional[int] = None
+
+
+@dataclass
+class SimulatorStats:
+    requests: Counter = field(default_factory=Counter)  # endpoint → 요청 수
+    statuses: Counter = field(default_factory=Counter)  # "endpoint status" → 응답 수
+    orders: Counter = field(default_factory=Counter)  # 주문 결과 → 건수
+    first_order_at: Optional[float] = None
+    last_reserved_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': dict(self.requests),
+            'statuses': dict(self.statuses),
+            'orders': dict(self.orders),
+            'firstOrderAt': self.first_order_at,
+            'lastReservedAt': self.last_reserved_at,
+        }
+
+
+class HcafeState:
+    """세션 / 수량 / 예약 상태 (요청 스레드 간 공유, lock 으로 보호)"""
+
+    def __init__(self, config: SimulatorConfig) -> None:
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.sessions: Dict[str, str] = {}  # JSESSIONID → userId
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.corner_left: Dict[Tuple[str, str], int] = {}
+            self.floor_left: Dict[Tuple[str, str, str], int] = {}
+            self.reservations: List[Dict[str, Any]] = []
+            self.stats = SimulatorStats()
+
+    # 수량 (prvdDt 별로 처음 조회할 때 채움)
+
+    def corner_remaining(self, prvd_dt: str, coner_dv_cd: str) -> int:
+        return self.corner_left.setdefault((prvd_dt, coner_dv_cd), self.config.corner_capacity)
+
+    def floor_remaining(self, prvd_dt: str, coner_dv_cd: str, floor_nm: str) -> int:
+        return self.floor_left.setdefault((prvd_dt, coner_dv_cd, floor_nm), self.config.floor_capacity)
+
+    def floor_descriptor(self, number: int) -> Dict[str, Any]:
+        return {
+            'floorNm': f'{number}층',
+            'rownum': number,
+            'dlvrPlcFloorNo': str(number),
+            'alphabetSeq': chr(ord('A') + (number - 1) % 26),
+            'dlvrPlcFloorSeq': number,
+            'dlvrPlcNm': DELIVERY_PLACE,
+            'totalCount': self.config.floors,
+            'maxDelvQty': self.config.floor_capacity,
+            'dlvrPlcSeq': 1,
+        }
+
+    def active_reservation(self, user_id: str, prvd_dt: str) -> Optional[Dict[str, Any]]:
+        return next((r for r in self.reservations
+                     if r['userId'] == user_id and r['prvdDt'] == prvd_dt and r['rsvStatCd'] == 'A'), None)
+
+    def window_open(self) -> bool:
+        return time.time() >= self.config.opens_at
+
+
+def ok(data_sets: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+    return 200, {'errorCode': 0, 'errorMsg': None, 'dataSets': data_sets or {}}, headers or {}
+
+
+def error(message: str, code: int = -1) -> Response:
+    return 200, {'errorCode': code, 'errorMsg': message, 'dataSets': {}}, {}
+
+
+class HcafeApi:
+    """엔드포인트 구현 (지연/장애 주입은 HcafeSimulator.respond 에서)"""
+
+    def __init__(self, state: HcafeState) -> None:
+        self.state = state
+
+    def handle(self, endpoint: str, payload: Dict[str, Any], user_id: Optional[str]) -> Response:
+        if endpoint == 'login.do':
+            return self.login(payload)
+        if user_id is None:
+            return 401, {'errorCode': -401, 'errorMsg': '로그인이 필요합니다.'}, {}
+        if endpoint == 'selectReserveMenuList.do':
+            return self.menu_list(payload)
+        if endpoint == 'selectDeliveryInfoTypeList.do':
+            return self.delivery_info(payload)
+        if endpoint == 'insertReservationOrder.do':
+            return self.order(payload, user_id)
+        if endpoint == 'selectMenuReservationList.do':
+            return self.reservation_list(payload, user_id)
+        if endpoint == 'updateMenuReservationCancel.do':
+            return self.cancel(payload, user_id)
+        return 404, {'errorCode': -404, 'errorMsg': f'Unknown endpoint {endpoint}'}, {}
+
+    def login(self, payload: Dict[str, Any]) -> Response:
+        user_id = payload.get('userId')
+        if not user_id or not payload.get('userData'):
+            return error(LOGIN_FAILED_MESSAGE)
+        token = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions[token] = user_id
+        return ok({'userInfo': {'userId': user_id}}, {'Set-Cookie': f'JSESSIONID={token}; Path=/; HttpOnly'})
+
+    def menu_list(self, payload: Dict[str, Any]) -> Response:
+        prvd_dt = payload.get('prvdDt', '')
+        bizplc_cd = payload.get('bizplcCd') or self.state.config.bizplc_cd
+        with self.state.lock:
+            reserve_list = [{
+                'conerDvCd': coner_dv_cd,
+                'dispNm': disp_nm,
+                'bizplcCd': bizplc_cd,
+                'mealDvCd': '0002',
+                'prvdDt': prvd_dt,
+                'remainQty': self.state.corner_remaining(prvd_dt, coner_dv_cd),
+            } for coner_dv_cd, disp_nm in MENUS]
+        return ok({'reserveList': reserve_list})
+
+    def delivery_info(self, payload: Dict[str, Any]) -> Response:
+        prvd_dt = payload.get('prvdDt', '')
+        coner_dv_cd = payload.get('conerDvCd', '')
+        floors = []
+        with self.state.lock:
+            for number in range(1, self.state.config.floors + 1):
+                floor = self.state.floor_descriptor(number)
+                floor['remainDeliQty'] = self.state.floor_remaining(prvd_dt, coner_dv_cd, floor['floorNm'])
+                floors.append(floor)
+        return ok({'deliveryInfoTypeList': floors})
+
+    def order(self, payload: Dict[str, Any], user_id: str) -> Response:
+        state = self.state
+        prvd_dt = payload.get('prvdDt', '')
+        coner_dv_cd = payload.get('conerDvCd', '')
+        floor_nm = payload.get('floorNm', '')
+        menu = dict(MENUS).get(coner_dv_cd)
+        with state.lock:
+            now = time.time()
+            if state.stats.first_order_at is None:
+                state.stats.first_order_at = now
+            if not state.window_open():
+                return self._order_result('notOpen', error(NOT_OPEN_MESSAGE))
+            floor = next((state.floor_descriptor(n) for n in range(1, state.config.floors + 1)
+                          if f'{n}층' == floor_nm), None)
+            # 저장된 floor descriptor 가 오래된 경우 (층 번호/순번 불일치)
+            if menu is None or floor is None or str(payload.get('dlvrPlcFloorSeq')) != str(floor['dlvrPlcFloorSeq']):
+                return self._order_result('badFloor', error(FLOOR_MISMATCH_MESSAGE))
+            if state.active_reservation(user_id, prvd_dt):
+                return self._order_result('duplicate', error(DUPLICATE_RESERVATION_MESSAGE))
+            if state.corner_remaining(prvd_dt, coner_dv_cd) <= 0 or state.floor_remaining(prvd_dt, coner_dv_cd, floor_nm) <= 0:
+                return self._order_result('soldOut', error(SOLD_OUT_MESSAGE))
+            state.corner_left[(prvd_dt, coner_dv_cd)] -= 1
+            state.floor_left[(prvd_dt, coner_dv_cd, floor_nm)] -= 1
+            reservation = {
+                'ordNo': f'SIM{len(state.reservations) + 1:08d}',
+                'userId': user_id,
+                'prvdDt': prvd_dt,
+                'conerDvCd': coner_dv_cd,
+                'dispNm': menu,
+                'floorNm': floor_nm,
+                'rsvStatCd': 'A',
+            }
+            state.reservations.append(reservation)
+            state.stats.last_reserved_at = now
+            return self._order_result('reserved', ok({'reservation': reservation}))
+
+    def _order_result(self, outcome: str, response: Response) -> Response:
+        self.state.stats.orders[outcome] += 1
+        return response
+
+    def reservation_list(self, payload: Dict[str, Any], user_id: str) -> Response:
+        prvd_dt = payload.get('prvdDt')
+        with self.state.lock:
+            reserve_list = [dict(r) for r in self.state.reservations
+                            if r['userId'] == user_id and (not prvd_dt or r['prvdDt'] == prvd_dt)]
+        return ok({'reserveList': reserve_list})
+
+    def cancel(self, payload: Dict[str, Any], user_id: str) -> Response:
+        state = self.state
+        with state.lock:
+            reservation = next((r for r in state.reservations
+                                if r['userId'] == user_id and r['rsvStatCd'] == 'A'
+                                and (r['ordNo'] == payload.get('ordNo')
+                                     or (r['prvdDt'] == payload.get('prvdDt') and r['conerDvCd'] == payload.get('conerDvCd')))), None)
+            if reservation is None:
+                return error('취소할 예약이 없습니다.')
+            reservation['rsvStatCd'] = 'C'
+            state.corner_left[(reservation['prvdDt'], reservation['conerDvCd'])] += 1
+            state.floor_left[(reservation['prvdDt'], reservation['conerDvCd'], reservation['floorNm'])] += 1
+            state.stats.orders['cancelled'] += 1
+        return ok({'reservation': dict(reservation)})
+
+
+class HcafeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive (클라이언트 커넥션 풀 재사용)
+    server_version = 'hcafe-simulator'
+
+    @property
+    def simulator(self) -> 'HcafeSimulator':
+        return self.server.simulator  # type: ignore[attr-defined]
+
+    def do_HEAD(self) -> None:
+        # ServerClock: Date 헤더만 사용
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        if self.path.startswith('/_sim/stats'):
+            self._send(200, self.simulator.stats())
+        else:
+            self._send(200, {'service': 'hcafe-simulator'})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if self.path.startswith('/_sim/reset'):
+            self.simulator.state.reset()
+            self._send(200, {'reset': True})
+            return
+        endpoint = self.path.split('?', 1)[0].rsplit('/', 1)[-1]
+        try:
+            payload = json.loads(raw or b'{}')
+        except json.JSONDecodeError:
+            self._send(400, {'errorCode': -400, 'errorMsg': 'Invalid JSON'}, endpoint=endpoint)
+            return
+        status, body, headers = self.simulator.respond(endpoint, payload, self._session_user())
+        self._send(status, body, headers, endpoint)
+
+    def _session_user(self) -> Optional[str]:
+        cookie = SimpleCookie(self.headers.get('Cookie') or '')
+        token = cookie['JSESSIONID'].value if 'JSESSIONID' in cookie else None
+        with self.simulator.state.lock:
+            return self.simulator.state.sessions.get(token or '')
+
+    def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+              endpoint: Optional[str] = None) -> None:
+        if endpoint:
+            with self.simulator.state.lock:
+                self.simulator.state.stats.statuses[f'{endpoint} {status}'] += 1
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 타임아웃으로 먼저 끊은 경우
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - BaseHTTPRequestHandler 시그니처
+        if self.simulator.verbose:
+            super().log_message(format, *args)
+
+
+class _HcafeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # 13:00 동시 접속
+
+
+class HcafeSimulator:
+    """ThreadingHTTPServer 래퍼: CLI 에서는 serve_forever, 부하 테스트에서는 start()/stop()"""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, host: str = '127.0.0.1', port: int = 0,
+                 verbose: bool = False) -> None:
+        self.config = config or SimulatorConfig()
+        self.state = HcafeState(self.config)
+        self.api = HcafeApi(self.state)
+        self.verbose = verbose
+        self.server = _HcafeServer((host, port), HcafeRequestHandler)
+        self.server.simulator = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def respond(self, endpoint: str, payload: Dict[str, Any], user_id: Optional[str]) -> Response:
+        config = self.config
+        with self.state.lock:
+            self.state.stats.requests[endpoint] += 1
+            roll = self.state.rng.random()
+            delay = self._latency(endpoint)
+        time.sleep(delay)
+
+        faulty = endpoint in config.fault_endpoints
+        if faulty and roll < config.timeout_rate:
+            time.sleep(config.timeout_seconds)
+            return 504, {'errorCode': -504, 'errorMsg': 'Gateway Timeout'}, {}
+        roll -= config.timeout_rate
+        if faulty and roll < config.error_rate:
+            return 503, {'errorCode': -503, 'errorMsg': 'Service Unavailable'}, {}
+        roll -= config.error_rate
+
+        response = self.api.handle(endpoint, payload, user_id)
+        if faulty and endpoint == 'insertReservationOrder.do' and response[1].get('errorCode') == 0 \
+                and roll < config.ambiguous_rate:
+            # 주문은 들어갔지만 응답이 유실된 경우
+            return 503, {'errorCode': -503, 'errorMsg': 'Service Unavailable'}, {}
+        return response
+
+    def _latency(self, endpoint: str) -> float:
+        median_ms = self.config.order_latency_ms if endpoint == 'insertReservationOrder.do' else self.config.latency_ms
+        if median_ms <= 0:
+            return 0.0
+        if self.config.latency_sigma <= 0:
+            return median_ms / 1000
+        return self.state.rng.lognormvariate(math.log(median_ms), self.config.latency_sigma) / 1000
+
+    def stats(self) -> Dict[str, Any]:
+        with self.state.lock:
+            active = [r for r in self.state.reservations if r['rsvStatCd'] == 'A']
+            stats = self.state.stats.as_dict()
+        stats['activeReservations'] = len(active)
+        stats['reservedByCorner'] = dict(Counter(r['conerDvCd'] for r in active))
+        stats['opensAt'] = self.config.opens_at
+        return stats
+
+    def start(self) -> 'HcafeSimulator':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='hcafe-simulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def config_from_options(options: Dict[str, str]) -> SimulatorConfig:
+    """--key=value 옵션 → SimulatorConfig (load_test.py 와 공유)"""
+    config = SimulatorConfig()
+    numbers = {
+        'floors': ('floors', int),
+        'corner-capacity': ('corner_capacity', int),
+        'floor-capacity': ('floor_capacity', int),
+        'latency-ms': ('latency_ms', float),
+        'order-latency-ms': ('order_latency_ms', float),
+        'latency-sigma': ('latency_sigma', float),
+        'error-rate': ('error_rate', float),
+        'timeout-rate': ('timeout_rate', float),
+        'timeout-seconds': ('timeout_seconds', float),
+        'ambiguous-rate': ('ambiguous_rate', float),
+        'seed': ('seed', int),
+    }
+    for option, (attribute, parse) in numbers.items():
+        if option in options:
+            setattr(config, attribute, parse(options[option]))
+    if 'bizplc-cd' in options:
+        config.bizplc_cd = options['bizplc-cd']
+    if 'fault-endpoints' in options:
+        config.fault_endpoints = tuple(name.strip() for name in options['fault-endpoints'].split(',') if name.strip())
+    if 'open-in' in options:
+        config.opens_at = time.time() + float(options['open-in'])
+    elif 'open-at' in options:
+        hour, minute, second = ([int(part) for part in options['open-at'].split(':')] + [0, 0])[:3]
+        config.opens_at = datetime.now().replace(hour=hour, minute=minute, second=second, microsecond=0).timestamp()
+    return config
+
+
+def parse_options(args: List[str]) -> Dict[str, str]:
+    return dict(arg[2:].split('=', 1) if '=' in arg else (arg[2:], 'true') for arg in args if arg.startswith('--'))
+
+
+def main() -> None:
+    options = parse_options(sys.argv[1:])
+    simulator = HcafeSimulator(
+        config_from_options(options),
+        host=options.get('host', '127.0.0.1'),
+        port=int(options.get('port', '8080')),
+        verbose='verbose' in options,
+    )
+    opens = datetime.fromtimestamp(simulator.config.opens_at).strftime('%H:%M:%S') if simulator.config.opens_at else '항상'
+    print(f"hcafe 시뮬레이터: {simulator.url} (예약 오픈 {opens})")
+    print(f"  export HCAFE_BASE_URL={simulator.url}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(simulator.stats(), ensure_ascii=False, indent=2))
+    finally:
+        simulator.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+예약 엔진 부하 테스트 - hcafe 시뮬레이터(hcafe_simulator.py)를 상대로 워커와 같은 2단계 실행
+- prepare(로그인/기존 예약 확인/메뉴·층 조회) → 오픈 시각 대기 → fire(주문 POST)
+- 결과: 성공률, 실패 사유, 주문 처리량, 단계별 지연(p50/p95/max, details["phases"]), 시뮬레이터 집계
+- DynamoDB/KMS/SES 없이 실행 (프로필 대신 UserPreferences 를 직접 생성, 층 정보는 미리 조회)
+
+Usage: python load_test.py [--users=100] [--concurrency=16] [--async] [--menus=샐,샌,빵]
+                           [--base-url=http://127.0.0.1:8080] [시뮬레이터 옵션 ...]
+  --base-url 이 없으면 시뮬레이터를 프로세스 안에서 띄움 (옵션은 hcafe_simulator.py 와 동일,
+  --open-in 기본 3초: prepare 가 끝난 뒤 열리도록)
+  엔진 설정은 환경 변수 그대로 (HCAFE_RATE_ORDER, HCAFE_BREAKER_FAILURES, RESERVATION_DEADLINE_SECONDS ...)
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+# Add backend/src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('CONFIG_TABLE_NAME', 'HGreenFoodAutoReserve')
+os.environ.setdefault('DEFAULT_CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'src', 'config.default.yaml'))
+
+from hcafe_simulator import HcafeSimulator, config_from_options, parse_options
+
+
+def build_users(count: int, menus: List[str], floors: int, defaults: Dict[str, Any]) -> List[Any]:
+    """부하용 사용자 (선호 메뉴 순서를 사용자마다 회전, 층은 순서대로 배정)"""
+    from core.models import UserPreferences
+
+    users = []
+    for index in range(count):
+        shift = index % len(menus)
+        payload = dict(defaults, userId=f'load{index:04d}', floorNm=f'{index % floors + 1}층')
+        users.append(UserPreferences(
+            user_id=payload['userId'],
+            password='load-test',
+            menu_sequence=menus[shift:] + menus[:shift],
+            floor_name=payload['floorNm'],
+            raw_payload=payload,
+        ))
+    return users
+
+
+def attach_floor_descriptors(users: List[Any], base_url: str, target_date: date) -> None:
+    """등록 시 저장되는 floor descriptor 를 미리 채움 (실행 중 DynamoDB 저장 없이 stored 경로 사용)"""
+    from core.reservation_client import ReservationClient
+    from core.reservation_service import FLOOR_DESCRIPTOR_FIELDS
+
+    client = ReservationClient(base_url=base_url)
+    first = users[0]
+    if not client.login(first.user_id, first.password, first.raw_payload).success:
+        raise RuntimeError('시뮬레이터 로그인 실패')
+    coner_dv_cd = client.menu_code_for(first.menu_sequence[0])
+    result = client.fetch_delivery_info_type_list(first.raw_payload, coner_dv_cd, target_date.strftime('%Y%m%d'))
+    floors = {
+        item['floorNm']: {key: item[key] for key in FLOOR_DESCRIPTOR_FIELDS if key in item}
+        for item in result.raw.get('dataSets', {}).get('deliveryInfoTypeList', [])
+    }
+    for user in users:
+        user.floor_descriptor = floors.get(user.floor_name)
+
+
+def fan_out(task: Callable[[Any], Any], items: List[Any], concurrency: int) -> List[Any]:
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load') as executor:
+        return list(executor.map(task, items))
+
+
+def wait_until(opens_at: float) -> None:
+    delay = opens_at - time.time()
+    if delay > 0:
+        print(f"오픈까지 {delay:.2f}s 대기")
+        time.sleep(delay)
+
+
+def run_threads(service: Any, users: List[Any], target_date: date, concurrency: int, opens_at: float) -> Dict[str, Any]:
+    from core import RunContext, run_deadline
+
+    context = RunContext()
+    started = time.perf_counter()
+    prepared = fan_out(lambda user: service.prepare(service_date=target_date, preferences=user, context=context),
+                       users, concurrency)
+    prepare_seconds = time.perf_counter() - started
+
+    wait_until(opens_at)
+    context.deadline = run_deadline()
+    started = time.perf_counter()
+    attempts = fan_out(service.fire, prepared, concurrency)
+    return {'attempts': attempts, 'prepareSeconds': prepare_seconds, 'fireSeconds': time.perf_counter() - started}
+
+
+async def run_async(service: Any, users: List[Any], target_date: date, concurrency: int, opens_at: float) -> Dict[str, Any]:
+    from core import AsyncReservationClient, RunContext, create_connector, run_deadline
+
+    context = RunContext()
+    connector = create_connector(limit=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def prepare(user: Any) -> Any:
+        async with semaphore:
+            client = AsyncReservationClient(base_url=service.reservation_client.base_url, connector=connector)
+            return await service.prepare_async(service_date=target_date, preferences=user, context=context, client=client)
+
+    async def fire(item: Any) -> Any:
+        async with semaphore:
+            return await service.fire_async(item)
+
+    prepared: List[Any] = []
+    try:
+        started = time.perf_counter()
+        prepared = await asyncio.gather(*(prepare(user) for user in users))
+        prepare_seconds = time.perf_counter() - started
+
+        await asyncio.to_thread(wait_until, opens_at)
+        context.deadline = run_deadline()
+        started = time.perf_counter()
+        attempts = await asyncio.gather(*(fire(item) for item in prepared))
+        fire_seconds = time.perf_counter() - started
+    finally:
+        for item in prepared:
+            if item.client is not None:
+                await item.client.close()
+        await connector.close()
+    return {'attempts': attempts, 'prepareSeconds': prepare_seconds, 'fireSeconds': fire_seconds}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(run: Dict[str, Any], simulator_stats: Optional[Dict[str, Any]]) -> None:
+    attempts = run['attempts']
+    succeeded = [attempt for attempt in attempts if attempt.success]
+    print(f"\n사용자 {len(attempts)}명: 성공 {len(succeeded)} ({len(succeeded) / len(attempts):.1%})")
+    for message, count in Counter(attempt.message for attempt in attempts if not attempt.success).most_common():
+        print(f"  실패 {count:4d}  {message}")
+    print(f"prepare {run['prepareSeconds']:.2f}s, fire {run['fireSeconds']:.2f}s "
+          f"({len(succeeded) / max(run['fireSeconds'], 1e-9):.1f} 예약/s)")
+
+    # 사용자별 단계 합계 → 단계별 분포
+    per_phase: Dict[str, List[float]] = defaultdict(list)
+    for attempt in attempts:
+        totals: Dict[str, float] = defaultdict(float)
+        for phase in attempt.details.get('phases', []):
+            totals[phase['phase']] += phase['ms']
+        for name, ms in totals.items():
+            per_phase[name].append(ms)
+    print("\n단계별 지연 (ms, 사용자별 합계)")
+    print(f"  {'phase':<22}{'n':>6}{'p50':>10}{'p95':>10}{'max':>10}")
+    for name, values in per_phase.items():
+        print(f"  {name:<22}{len(values):>6}{statistics.median(values):>10.1f}"
+              f"{percentile(values, 0.95):>10.1f}{max(values):>10.1f}")
+
+    if simulator_stats:
+        print("\n시뮬레이터 집계")
+        print(json.dumps({key: simulator_stats[key] for key in ('requests', 'statuses', 'orders', 'reservedByCorner')},
+                         ensure_ascii=False, indent=2))
+
+
+def fetch_stats(base_url: str) -> Optional[Dict[str, Any]]:
+    import requests
+
+    try:
+        return requests.get(f'{base_url}/_sim/stats', timeout=5).json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def main() -> None:
+    options = parse_options(sys.argv[1:])
+    users_count = int(options.get('users', '100'))
+    concurrency = int(options.get('concurrency', '16'))
+    menus = [menu.strip() for menu in options.get('menus', '샐,샌,빵').split(',') if menu.strip()]
+
+    simulator = None
+    base_url = options.get('base-url')
+    if not base_url:
+        options.setdefault('open-in', '3')
+        simulator = HcafeSimulator(config_from_options(options)).start()
+        base_url = simulator.url
+    os.environ['HCAFE_BASE_URL'] = base_url
+
+    from core import ConfigStore, ReservationClient, ReservationService
+
+    stats = fetch_stats(base_url) or {}
+    opens_at = float(stats.get('opensAt') or 0)
+    floors = simulator.config.floors if simulator else int(options.get('floors', '10'))
+    target_date = date.today() + timedelta(days=1)
+
+    # ConfigStore 는 기본값(config.default.yaml)만 사용: 프로필/층 정보는 미리 만들어 둠
+    store = ConfigStore(region_name=os.environ.get('AWS_REGION', 'ap-northeast-2'))
+    users = build_users(users_count, menus, floors, store._load_default_config())
+    attach_floor_descriptors(users, base_url, target_date)
+    service = ReservationService(
+        config_store=store,
+        reservation_client=ReservationClient(),
+        reservation_client_factory=ReservationClient,
+    )
+
+    mode = 'asyncio' if 'async' in options else 'threads'
+    print(f"{base_url}: 사용자 {users_count}명, 동시 {concurrency} ({mode}), 메뉴 {','.join(menus)}")
+    if mode == 'asyncio':
+        run = asyncio.run(run_async(service, users, target_date, concurrency, opens_at))
+    else:
+        run = run_threads(service, users, target_date, concurrency, opens_at)
+
+    report(run, fetch_stats(base_url))
+    if simulator:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,20 @@
 
 from __future__ import annotations
 
-import base64
-import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
 
-import boto3
+from core.http import Route, Router, json_body, json_response
 
-from core import (
-    ConfigStore,
-    HolidayService,
-    ReservationClient,
-    ReservationService,
-    SesNotifier,
-)
+if TYPE_CHECKING:
+    from core import PreparedReservation, ReservationService, RunContext
+
+# The API routes only need their own handler module; core (requests, aiohttp,
+# asyncio, ...) is imported inside the worker/holiday functions that use it,
+# so the API Lambda's cold start does not pay for it. See check_import_time.py.
 
 LOGGER = logging.getLogger()
 if not LOGGER.handlers:
@@ -26,19 +24,31 @@ LOGGER.setLevel(logging.INFO)
 
 _SERVICE: Optional[ReservationService] = None
 
+DEFAULT_WORKER_CONCURRENCY = 8
+# Never sleep longer than this waiting for the window (guards manual invocations).
+DEFAULT_MAX_WINDOW_WAIT_SECONDS = 600
+
 
 def _build_service() -> ReservationService:
     global _SERVICE
     if _SERVICE:
         return _SERVICE
 
+    from core import ConfigStore, HolidayService, ReservationClient, ReservationService, SesNotifier, SessionStore
+
     config_store = ConfigStore()
 
     holiday_endpoint = os.environ.get(
         "HOLIDAY_API_ENDPOINT",
         "http://apis.data.go.kr/B090041/openapi/service/SpcdeInfoService/getRestDeInfo",
     )
-    holiday_service = HolidayService(endpoint=holiday_endpoint, config_store=config_store)
+    holiday_service = HolidayService(
+        endpoint=holiday_endpoint,
+        config_store=config_store,
+        # The worker only reads holidays stored by the scheduler (no data.go.kr
+        # call around the reservation window).
+        fetch_missing=os.environ.get("HOLIDAY_FETCH_MISSING", "true").lower() != "false",
+    )
 
     notifier = None
     if os.environ.get("SES_SENDER_EMAIL"):
@@ -52,101 +62,79 @@ def _build_service() -> ReservationService:
         holiday_service=holiday_service,
         notifier=notifier,
         timezone=timezone,
+        reservation_client_factory=ReservationClient,
+        session_store=SessionStore(config_store),
     )
     return _SERVICE
 
 
-def api_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
-    LOGGER.info("Received API event: %s", event.get("routeKey") or event.get("httpMethod") or event.get("rawPath"))
-    
-    route = event.get("resource") or event.get("rawPath") or ""
-
-    if route == "/register":
-        from register_user import register_user_handler
-        return register_user_handler(event, _context)
-
-    if route == "/register/status":
-        from get_registration_status import get_registration_status_handler
-        return get_registration_status_handler(event, _context)
-    
-    if route == "/check-reservation":
-        from check_reservation import check_reservation_handler
-        return check_reservation_handler(event, _context)
-
-    if route == "/reservations":
-        from list_reservations import list_reservations_handler
-        return list_reservations_handler(event, _context)
-    
-    if route == "/auth/send-code":
-        from auth_handler import send_verification_code_handler
-        return send_verification_code_handler(event, _context)
-    
-    if route == "/auth/verify-code":
-        from auth_handler import verify_code_handler
-        return verify_code_handler(event, _context)
-    
-    if route == "/auth/check-device":
-        from auth_handler import check_device_handler
-        return check_device_handler(event, _context)
-    
-    if route == "/auth/logout":
-        from logout_handler import logout_handler
-        return logout_handler(event, _context)
-    
-    if route == "/user/toggle-auto-reservation":
-        from toggle_auto_reservation import toggle_auto_reservation_handler
-        return toggle_auto_reservation_handler(event, _context)
+def _worker_concurrency(event: Dict[str, Any]) -> int:
+    value = event.get("concurrency") or os.environ.get("WORKER_CONCURRENCY") or DEFAULT_WORKER_CONCURRENCY
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        LOGGER.warning("Invalid worker concurrency %r, falling back to %d", value, DEFAULT_WORKER_CONCURRENCY)
+        return DEFAULT_WORKER_CONCURRENCY
+
+
+def _worker_async_enabled(event: Dict[str, Any]) -> bool:
+    value = event.get("async", os.environ.get("WORKER_ASYNC", "false"))
+    return str(value).lower() in ("true", "1", "yes")
+
+
+ROUTES = (
+    Route(
+        "/register", "register_user", "register_user_handler",
+        required=("userId", "password", "menuSeq", "floorNm", "email"),
+    ),
+    Route("/register/status", "get_registration_status", "get_registration_status_handler"),
+    Route("/check-reservation", "check_reservation", "check_reservation_handler"),
+    Route("/reservations", "list_reservations", "list_reservations_handler"),
+    Route("/auth/send-code", "auth_handler", "send_verification_code_handler"),
+    Route("/auth/verify-code", "auth_handler", "verify_code_handler"),
+    Route("/auth/check-device", "auth_handler", "check_device_handler"),
+    Route("/auth/logout", "logout_handler", "logout_handler"),
+    Route("/user/toggle-auto-reservation", "toggle_auto_reservation", "toggle_auto_reservation_handler"),
+    Route("/user/delete-account", "delete_account", "delete_account_handler"),
+    Route("/user/get-settings", "get_user_settings", "get_user_settings_handler"),
+    Route("/user/update-settings", "update_user_settings", "update_user_settings_handler"),
+    Route("/user/update-exclusion-dates", "update_exclusion_dates", "update_exclusion_dates_handler"),
+    Route("/reservation/make-immediate", "immediate_reservation", "immediate_reservation_handler"),
+    Route("/admin/update-holidays", __name__, "update_holidays_handler"),
+)
 
-    if route == "/user/delete-account":
-        from delete_account import delete_account_handler
-        return delete_account_handler(event, _context)
 
-    if route == "/user/get-settings":
-        from get_user_settings import get_user_settings_handler
-        return get_user_settings_handler(event, _context)
+def _run_reservation(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
+    """Paths without a route: one reservation run for the posted (or default) user."""
+    payload = json_body(event)
+    user_id = payload.get("userId") or os.environ.get("DEFAULT_USER_ID")
+    if not user_id:
+        return json_response(400, {"message": "userId is required"})
 
-    if route == "/user/update-settings":
-        from update_user_settings import update_user_settings_handler
-        return update_user_settings_handler(event, _context)
-    
-    if route == "/user/update-exclusion-dates":
-        from update_exclusion_dates import update_exclusion_dates_handler
-        return update_exclusion_dates_handler(event, _context)
+    service_date = _parse_service_date(payload.get("serviceDate"))
 
-    if route == "/reservation/make-immediate":
-        from immediate_reservation import immediate_reservation_handler
-        return immediate_reservation_handler(event, _context)
+    service = _build_service()
+    result = service.run(user_id=user_id, service_date=service_date)
+
+    return json_response(
+        200,
+        {
+            "success": result.success,
+            "message": result.message,
+            "targetDate": result.target_date.isoformat(),
+            "attemptedMenus": result.attempted_menus,
+            "details": result.details,
+        },
+    )
 
-    if route == "/admin/update-holidays":
-        return update_holidays_handler(event, _context)
 
-    try:
-        payload = _parse_body(event)
-        user_id = payload.get("userId") or os.environ.get("DEFAULT_USER_ID")
-        if not user_id:
-            return _response(400, {"message": "userId is required"})
+# Parses the body once, checks required fields, maps errors to 400/500 and
+# logs one latency line per request; ROUTER.stats() has per-route histograms.
+ROUTER = Router(ROUTES, fallback=_run_reservation)
 
-        service_date = _parse_service_date(payload.get("serviceDate"))
 
-        service = _build_service()
-        result = service.run(user_id=user_id, service_date=service_date)
-
-        return _response(
-            200,
-            {
-                "success": result.success,
-                "message": result.message,
-                "targetDate": result.target_date.isoformat(),
-                "attemptedMenus": result.attempted_menus,
-                "details": result.details,
-            },
-        )
-    except ValueError as error:
-        LOGGER.warning("Client error: %s", error)
-        return _response(400, {"message": str(error)})
-    except Exception as error:  # pylint: disable=broad-except
-        LOGGER.exception("API error: %s", error)
-        return _response(500, {"message": str(error)})
+def api_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    return ROUTER.dispatch(event, context)
 
 
 def worker_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
@@ -154,56 +142,83 @@ def worker_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
     LOGGER.info("=== WORKER HANDLER STARTED ===")
     LOGGER.info("Received worker event: %s", event)
     
+    import asyncio
+
+    from core import RunContext, governor_stats, hedging_stats, holiday_cache_stats, run_deadline
+
     try:
         service = _build_service()
+        # All stored holiday months in one Query; warm containers pick up
+        # months the scheduler stored since the last run.
+        service.holiday_service.hydrate(force=True)
+        service.calendar.clear()
         
-        # Get all users from DynamoDB instead of using DEFAULT_USER_ID
-        LOGGER.info("Fetching all user profiles from DynamoDB...")
-        user_profiles = service.config_store.get_all_user_profiles()
-        LOGGER.info(f"Found {len(user_profiles)} total user profiles")
+        # Auto-reservation enabled users only (sparse ActiveUsersIndex), with
+        # just the attributes the run reads
+        LOGGER.info("Fetching active user profiles from DynamoDB...")
+        user_profiles = service.config_store.get_active_user_profiles(site=os.environ.get("WORKER_SITE") or None)
+        LOGGER.info(f"Found {len(user_profiles)} active user profiles")
         
-        # Extract user IDs and log them
-        user_ids = []
+        # Keep the scanned items: preferences are built from them directly,
+        # so the run needs no further profile reads.
+        profiles = []
         for profile in user_profiles:
             user_id = profile.get("userId")
             if user_id:
-                user_ids.append(user_id)
+                profiles.append(profile)
                 # Log user info for processing order visibility
                 auto_enabled = profile.get("autoReservationEnabled", True)
                 menu_seq = profile.get("menuSeq", "N/A")
                 floor_nm = profile.get("floorNm", "N/A")
                 LOGGER.info(f"User found: {user_id}, AutoReserve: {auto_enabled}, MenuSeq: {menu_seq}, Floor: {floor_nm}")
+        user_ids = [profile["userId"] for profile in profiles]
         
         LOGGER.info(f"Processing {len(user_ids)} users in order: {user_ids}")
         
-        results = []
-        for idx, user_id in enumerate(user_ids, 1):
-            LOGGER.info(f"[{idx}/{len(user_ids)}] Processing user: {user_id}")
-            try:
-                preferences = service.config_store.get_user_preferences(user_id)
-                if not preferences.auto_reservation_enabled:
-                    LOGGER.info("Auto-reservation disabled for user %s, skipping", user_id)
-                    results.append({
-                        "userId": user_id,
-                        "success": False,
-                        "message": "Auto-reservation is disabled",
-                        "skipped": True
-                    })
-                    continue
-                
-                outcome = service.run(user_id=user_id)
-                results.append(
-                    {
-                        "userId": user_id,
-                        "success": outcome.success,
-                        "message": outcome.message,
-                        "targetDate": outcome.target_date.isoformat(),
-                    }
-                )
-            except Exception as error:  # pylint: disable=broad-except
-                LOGGER.exception("Reservation attempt failed for %s", user_id)
-                results.append({"userId": user_id, "success": False, "message": str(error)})
+        concurrency = min(_worker_concurrency(event), max(1, len(user_ids)))
+        context = RunContext()
+        fire_immediately = bool(event.get("fireImmediately"))
+
+        if _worker_async_enabled(event):
+            LOGGER.info("Running reservations on asyncio with %d concurrent user(s)", concurrency)
+            results = asyncio.run(_run_async(service, profiles, concurrency, context, fire_immediately))
+            LOGGER.info("Shared upstream reads: %s", context.async_cache.stats())
+            LOGGER.info("Hedged reads: %s", hedging_stats())
+            LOGGER.info("Outbound governor: %s", governor_stats())
+            LOGGER.info("Holiday cache: %s", holiday_cache_stats())
+            LOGGER.info("Worker completed: %s", results)
+            return {"results": results}
+
+        LOGGER.info("Running reservations with %d worker(s)", concurrency)
+
+        # Phase 1: everything except the order POST, ahead of the window.
+        # Menu list / delivery info reads are shared by all users of this run.
+        total = len(user_ids)
+        prepared = _fan_out(
+            lambda idx, profile: _prepare_user(service, profile, idx, total, context),
+            profiles,
+            concurrency,
+        )
+
+        if not fire_immediately:
+            _wait_for_window(service)
+        context.deadline = run_deadline()
+
+        # Phase 2: only insertReservationOrder.do per user.
+        results = _fan_out(
+            lambda idx, user_id: _fire_user(service, user_id, prepared[idx - 1]),
+            user_ids,
+            concurrency,
+        )
+
+        # Phase 3: off the critical path, send the queued result emails and
+        # refresh outdated floor descriptors with the sessions already logged in.
+        _flush_notifications(service, context)
+        _fan_out(lambda _idx, item: _refresh_floor_descriptor(service, item), prepared, concurrency)
 
+        LOGGER.info("Shared upstream reads: %s", context.cache.stats())
+        LOGGER.info("Outbound governor: %s", governor_stats())
+        LOGGER.info("Holiday cache: %s", holiday_cache_stats())
         LOGGER.info("Worker completed: %s", results)
         return {"results": results}
     except Exception as error:  # pylint: disable=broad-except
@@ -211,22 +226,204 @@ def worker_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
         return {"results": [{"success": False, "message": str(error)}]}
 
 
+def _fan_out(task: Callable[[int, Any], Any], items: List[Any], concurrency: int) -> List[Any]:
+    """Run task(idx, item) for every item, preserving the input order of results."""
+    if concurrency <= 1:
+        return [task(idx, item) for idx, item in enumerate(items, 1)]
+    # Each run builds its own ReservationClient (see _build_service), so
+    # logins and cookie jars never leak between users running in parallel;
+    # ConfigStore gives every thread its own DynamoDB resource.
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reserve") as executor:
+        futures = [executor.submit(task, idx, item) for idx, item in enumerate(items, 1)]
+        return [future.result() for future in futures]
+
+
+def _prepare_user(
+    service: ReservationService, profile: Dict[str, Any], idx: int, total: int, context: RunContext
+) -> Union[PreparedReservation, Dict[str, Any]]:
+    user_id = profile["userId"]
+    LOGGER.info(f"[{idx}/{total}] Preparing user: {user_id}")
+    try:
+        preferences = _enabled_preferences(service, profile)
+        if isinstance(preferences, dict):
+            return preferences
+        return service.prepare(preferences=preferences, context=context)
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.exception("Reservation preparation failed for %s", user_id)
+        return {"userId": user_id, "success": False, "message": str(error)}
+
+
+def _enabled_preferences(service: ReservationService, profile: Dict[str, Any]):
+    """Preferences of the profile, or the skipped result when auto-reservation is off."""
+    user_id = profile["userId"]
+    # Eligibility runs on plaintext attributes; prepare() decrypts only eligible users.
+    preferences = service.config_store.build_preferences(profile, decrypt=False)
+    if not preferences.auto_reservation_enabled:
+        LOGGER.info("Auto-reservation disabled for user %s, skipping", user_id)
+        return {
+            "userId": user_id,
+            "success": False,
+            "message": "Auto-reservation is disabled",
+            "skipped": True
+        }
+    return preferences
+
+
+def _fire_user(
+    service: ReservationService, user_id: str, prepared: Union[PreparedReservation, Dict[str, Any]]
+) -> Dict[str, Any]:
+    if isinstance(prepared, dict):
+        return prepared
+    try:
+        return _result_of(user_id, service.fire(prepared))
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.exception("Reservation attempt failed for %s", user_id)
+        return {"userId": user_id, "success": False, "message": str(error)}
+
+
+def _result_of(user_id: str, outcome) -> Dict[str, Any]:
+    result = {
+        "userId": user_id,
+        "success": outcome.success,
+        "message": outcome.message,
+        "targetDate": outcome.target_date.isoformat(),
+    }
+    if outcome.skipped:
+        result["skipped"] = True
+    return result
+
+
+async def _run_async(
+    service: ReservationService,
+    profiles: List[Dict[str, Any]],
+    concurrency: int,
+    context: RunContext,
+    fire_immediately: bool,
+) -> List[Dict[str, Any]]:
+    """The worker phases on one event loop, sharing one bounded hcafe connection pool.
+
+    Every user still gets its own AsyncReservationClient (own cookie jar).
+    """
+    import asyncio
+
+    from core import AsyncReservationClient, PreparedReservation, create_connector, run_deadline
+
+    connector = create_connector(limit=concurrency)
+    base_url = service.reservation_client.base_url
+    semaphore = asyncio.Semaphore(concurrency)
+    total = len(profiles)
+
+    async def prepare(idx: int, profile: Dict[str, Any]):
+        user_id = profile["userId"]
+        async with semaphore:
+            LOGGER.info(f"[{idx}/{total}] Preparing user: {user_id}")
+            try:
+                preferences = _enabled_preferences(service, profile)
+                if isinstance(preferences, dict):
+                    return preferences
+                client = AsyncReservationClient(base_url=base_url, connector=connector)
+                return await service.prepare_async(preferences=preferences, context=context, client=client)
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.exception("Reservation preparation failed for %s", user_id)
+                return {"userId": user_id, "success": False, "message": str(error)}
+
+    async def fire(user_id: str, prepared):
+        if isinstance(prepared, dict):
+            return prepared
+        try:
+            return _result_of(user_id, await service.fire_async(prepared))
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.exception("Reservation attempt failed for %s", user_id)
+            return {"userId": user_id, "success": False, "message": str(error)}
+
+    prepared: List[Any] = []
+    try:
+        prepared = await asyncio.gather(*(prepare(idx, profile) for idx, profile in enumerate(profiles, 1)))
+        if not fire_immediately:
+            await asyncio.to_thread(_wait_for_window, service)
+        context.deadline = run_deadline()
+        results = await asyncio.gather(*(fire(profile["userId"], item) for profile, item in zip(profiles, prepared)))
+    finally:
+        for item in prepared:
+            if isinstance(item, PreparedReservation) and item.client is not None:
+                await item.client.close()
+        await connector.close()
+
+    # Result emails and descriptor refreshes (synchronous client) are off the critical path.
+    await asyncio.gather(
+        asyncio.to_thread(_flush_notifications, service, context),
+        *(asyncio.to_thread(_refresh_floor_descriptor, service, item, False) for item in prepared),
+    )
+    return list(results)
+
+
+def _flush_notifications(service: ReservationService, context: RunContext) -> None:
+    """Send the result emails queued during the run (best effort)."""
+    try:
+        LOGGER.info("Notifications: %s", context.outbox.flush(service.notifier))
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.warning("Sending queued notifications failed: %s", error)
+
+
+def _refresh_floor_descriptor(
+    service: ReservationService, prepared: Union[PreparedReservation, Dict[str, Any]], reuse_session: bool = True
+) -> None:
+    if isinstance(prepared, dict) or prepared.client is None:
+        return
+    if not service.floor_descriptor_is_stale(prepared.preferences):
+        return
+    try:
+        client = prepared.client if reuse_session else None
+        service.refresh_floor_descriptor(prepared.preferences, prepared.target_date, client)
+    except Exception:  # pylint: disable=broad-except
+        LOGGER.exception("Floor descriptor refresh failed for %s", prepared.preferences.user_id)
+
+
+def _wait_for_window(service: ReservationService) -> None:
+    opens_at = service.window_opens_at()
+    local_delay = (opens_at - datetime.now(opens_at.tzinfo)).total_seconds()
+    max_wait = float(os.environ.get("RESERVATION_MAX_WAIT_SECONDS", DEFAULT_MAX_WINDOW_WAIT_SECONDS))
+    if local_delay > max_wait:
+        LOGGER.warning("Reservation window opens in %.1fs (> %.0fs), firing now", local_delay, max_wait)
+        return
+    if local_delay < -60:
+        LOGGER.info("Reservation window already open since %s, firing now", opens_at.isoformat())
+        return
+
+    from core import ServerClock
+
+    # Fire on the hcafe server's clock, not ours.
+    clock = ServerClock(base_url=service.reservation_client.base_url)
+    estimate = clock.estimate()
+    lead = float(os.environ.get("RESERVATION_LEAD_MS", "0")) / 1000
+    delay = opens_at.timestamp() - lead - estimate.server_now()
+    if delay <= 0:
+        LOGGER.info("Reservation window already open on server clock (%.3fs ago), firing now", -delay)
+        return
+    LOGGER.info(
+        "Prepared; waiting %.3fs for the reservation window at %s (server offset %+.3fs, lead %.3fs)",
+        delay, opens_at.isoformat(), estimate.offset, lead,
+    )
+    clock.wait_until(opens_at, estimate, lead)
+
+
 def update_holidays_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
     LOGGER.info("Received holiday update request")
     try:
-        payload = _parse_body(event)
+        payload = json_body(event)
         today = date.today()
         year = int(payload.get("year", today.year))
         month = int(payload.get("month", today.month))
         
         api_key = os.environ.get("HOLIDAY_API_KEY")
         if not api_key:
-             return _response(500, {"message": "Holiday API key not configured"})
+             return json_response(500, {"message": "Holiday API key not configured"})
 
         service = _build_service()
         holidays = service.holiday_service.fetch_and_save_holidays(year, month, api_key)
+        service.calendar.invalidate(year, month)
         
-        return _response(200, {
+        return json_response(200, {
             "message": "Holidays updated successfully",
             "year": year,
             "month": month,
@@ -234,42 +431,40 @@ def update_holidays_handler(event: Dict[str, Any], _context: Any) -> Dict[str, A
         })
     except Exception as error:
         LOGGER.exception("Failed to update holidays")
-        return _response(500, {"message": str(error)})
+        return json_response(500, {"message": str(error)})
 
 
 def holiday_scheduler_handler(event: Dict[str, Any], _context: Any) -> None:
+    """Store this year's and next year's holidays so reservation runs never fetch them."""
     LOGGER.info("Holiday scheduler triggered")
     today = date.today()
-    if today.month == 12:
-        next_year = today.year + 1
-        next_month = 1
-    else:
-        next_year = today.year
-        next_month = today.month + 1
-        
+
     api_key = os.environ.get("HOLIDAY_API_KEY")
     if not api_key:
         LOGGER.error("Holiday API key not configured")
         return
 
     service = _build_service()
-    try:
-        holidays = service.holiday_service.fetch_and_save_holidays(next_year, next_month, api_key)
-        LOGGER.info(f"Successfully updated holidays for {next_year}-{next_month}: {holidays}")
-    except Exception as error:
-        LOGGER.exception(f"Failed to update holidays for {next_year}-{next_month}")
-
-
-def _parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
-    body = event.get("body")
-    if not body:
-        return {}
-    if event.get("isBase64Encoded"):
-        body = base64.b64decode(body).decode()
-    try:
-        return json.loads(body)
-    except json.JSONDecodeError as error:
-        raise ValueError("Request body must be valid JSON") from error
+    for year in (today.year, today.year + 1):
+        try:
+            months = service.holiday_service.fetch_and_save_year(year, api_key)
+            holidays = sorted(date_str for dates in months.values() for date_str in dates)
+            LOGGER.info(f"Successfully updated holidays for {year}: {holidays}")
+        except Exception:
+            LOGGER.exception(f"Failed to update holidays for {year}")
+    service.calendar.clear()
+
+
+def user_count_reconciler_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
+    """Correct drift of the META/USER_COUNT counter against the stored profiles."""
+    from core import ConfigStore
+
+    result = ConfigStore().reconcile_user_count()
+    if result["previous"] != result["count"]:
+        LOGGER.warning("User count drifted: %s -> %s", result["previous"], result["count"])
+    else:
+        LOGGER.info("User count verified: %s", result["count"])
+    return result
 
 
 def _parse_service_date(value: Optional[str]) -> Optional[date]:
@@ -280,18 +475,3 @@ def _parse_service_date(value: Optional[str]) -> Optional[date]:
         return parsed.date()
     except ValueError as error:
         raise ValueError("serviceDate must be formatted as YYYY-MM-DD") from error
-
-
-def _response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*",
-        },
-        "body": json.dumps(body, ensure_ascii=False),
-    }
-
-
@@ -1,27 +1,23 @@
 """Email authentication and device fingerprint management"""
 import os
-import json
 import logging
-import base64
 import secrets
 import hashlib
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
-import boto3
 from botocore.exceptions import ClientError
 
+from core import ConfigStore, aws_clients
+from core.http import json_body, json_response
+
 LOGGER = logging.getLogger()
 if not LOGGER.handlers:
     logging.basicConfig(level=logging.INFO)
 LOGGER.setLevel(logging.INFO)
 
-# DynamoDB client
-dynamodb = boto3.resource('dynamodb')
+# DynamoDB / SES clients come from the shared registry on first use
 table_name = os.environ.get('CONFIG_TABLE_NAME', 'HGreenFoodAutoReserve')
-table = dynamodb.Table(table_name)
-
-# SES client
-ses = boto3.client('ses', region_name=os.environ.get('AWS_REGION', 'ap-northeast-2'))
+ses_region = os.environ.get('AWS_REGION', 'ap-northeast-2')
 
 
 def send_verification_code_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
@@ -29,11 +25,11 @@ def send_verification_code_handler(event: Dict[str, Any], _context: Any) -> Dict
     LOGGER.info("Received send verification code event")
     
     try:
-        body = _parse_body(event)
+        body = json_body(event)
         email = body.get("email")
         
         if not email:
-            return _response(400, {"message": "Email is required"})
+            return json_response(400, {"message": "Email is required"})
         
         # 6자리 인증 코드 생성
         verification_code = ''.join([str(secrets.randbelow(10)) for _ in range(6)])
@@ -42,7 +38,7 @@ def send_verification_code_handler(event: Dict[str, Any], _context: Any) -> Dict
         expiry_time = int((datetime.utcnow() + timedelta(minutes=10)).timestamp())
         
         try:
-            table.put_item(Item={
+            _table().put_item(Item={
                 "PK": f"VERIFY#{email}",
                 "SK": "CODE",
                 "code": verification_code,
@@ -52,7 +48,7 @@ def send_verification_code_handler(event: Dict[str, Any], _context: Any) -> Dict
             })
         except ClientError as e:
             LOGGER.error(f"DynamoDB error: {e}")
-            return _response(500, {"message": "Failed to store verification code"})
+            return json_response(500, {"message": "Failed to store verification code"})
         
         # SES로 이메일 발송
         sender = os.environ.get('SES_SENDER_EMAIL', 'no-reply@example.com')
@@ -75,7 +71,7 @@ HGreenFood 자동 예약 서비스 가입을 위한 인증 코드입니다.
 """
         
         try:
-            ses.send_email(
+            aws_clients.client("ses", ses_region).send_email(
                 Source=sender,
                 Destination={'ToAddresses': [email]},
                 Message={
@@ -85,14 +81,14 @@ HGreenFood 자동 예약 서비스 가입을 위한 인증 코드입니다.
             )
         except ClientError as e:
             LOGGER.error(f"SES error: {e}")
-            return _response(500, {"message": "Failed to send email"})
+            return json_response(500, {"message": "Failed to send email"})
         
         LOGGER.info(f"Verification code sent to {email}")
-        return _response(200, {"message": "Verification code sent", "email": email})
+        return json_response(200, {"message": "Verification code sent", "email": email})
         
     except Exception as error:
         LOGGER.exception("Error sending verification code")
-        return _response(500, {"message": str(error)})
+        return json_response(500, {"message": str(error)})
 
 
 def verify_code_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
@@ -100,40 +96,35 @@ def verify_code_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
     LOGGER.info("Received verify code event")
     
     try:
-        body = _parse_body(event)
+        body = json_body(event)
         email = body.get("email")
         code = body.get("code")
         device_fingerprint = body.get("deviceFingerprint")
         
         if not email or not code:
-            return _response(400, {"message": "Email and code are required"})
+            return json_response(400, {"message": "Email and code are required"})
         
         # DynamoDB에서 인증 코드 조회
         try:
-            response = table.get_item(Key={"PK": f"VERIFY#{email}", "SK": "CODE"})
+            response = _table().get_item(Key={"PK": f"VERIFY#{email}", "SK": "CODE"})
             item = response.get("Item")
             
             if not item:
-                return _response(401, {"message": "Invalid or expired verification code"})
+                return json_response(401, {"message": "Invalid or expired verification code"})
             
             # 코드 검증
             if item.get("code") != code:
-                return _response(401, {"message": "Invalid verification code"})
+                return json_response(401, {"message": "Invalid verification code"})
             
             # 만료 시간 확인
             if int(item.get("expiresAt", 0)) < int(datetime.utcnow().timestamp()):
-                return _response(401, {"message": "Verification code expired"})
+                return json_response(401, {"message": "Verification code expired"})
             
             # 인증 성공 - 코드 삭제
-            table.delete_item(Key={"PK": f"VERIFY#{email}", "SK": "CODE"})
-            
-            # 기존 사용자 확인
-            user_response = table.scan(
-                FilterExpression="email = :email AND SK = :sk",
-                ExpressionAttributeValues={":email": email, ":sk": "PROFILE"}
-            )
+            _table().delete_item(Key={"PK": f"VERIFY#{email}", "SK": "CODE"})
             
-            existing_user = user_response.get("Items", [])
+            # 기존 사용자 확인 (EMAIL# 포인터 조회)
+            user_id = _find_user_id_by_email(email)
             
             # 세션 토큰 생성 (디바이스 지문 기반)
             session_token = _generate_session_token(email, device_fingerprint)
@@ -142,26 +133,25 @@ def verify_code_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
                 "message": "Verification successful",
                 "email": email,
                 "sessionToken": session_token,
-                "hasAccount": len(existing_user) > 0
+                "hasAccount": user_id is not None
             }
             
-            if existing_user:
-                user = existing_user[0]
-                result["userId"] = user.get("userId")
+            if user_id:
+                result["userId"] = user_id
                 
                 # 디바이스 등록
                 if device_fingerprint:
-                    _register_device(user.get("userId"), device_fingerprint)
+                    _register_device(user_id, email, device_fingerprint)
             
-            return _response(200, result)
+            return json_response(200, result)
             
         except ClientError as e:
             LOGGER.error(f"DynamoDB error: {e}")
-            return _response(500, {"message": "Database error"})
+            return json_response(500, {"message": "Database error"})
         
     except Exception as error:
         LOGGER.exception("Error verifying code")
-        return _response(500, {"message": str(error)})
+        return json_response(500, {"message": str(error)})
 
 
 def check_device_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
@@ -169,142 +159,64 @@ def check_device_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]
     LOGGER.info("Received check device event")
     
     try:
-        body = _parse_body(event)
+        body = json_body(event)
         device_fingerprint = body.get("deviceFingerprint")
         
         if not device_fingerprint:
-            return _response(400, {"message": "Device fingerprint is required"})
+            return json_response(400, {"message": "Device fingerprint is required"})
         
-        # 모든 사용자의 디바이스 목록에서 검색
-        response = table.scan(
-            FilterExpression="attribute_exists(devices)"
-        )
+        # DEVICE#<fingerprint> 1회 조회 (lastAccessAt 갱신 포함)
+        device = _config_store().touch_device(device_fingerprint)
         
-        for item in response.get("Items", []):
-            devices = item.get("devices", [])
-            for device in devices:
-                if device.get("fingerprint") == device_fingerprint:
-                    # 디바이스 발견 - 자동 로그인
-                    user_id = item.get("userId")
-                    session_token = _generate_session_token(item.get("email"), device_fingerprint)
-                    
-                    # 마지막 접속 시간 업데이트
-                    _update_device_access(user_id, device_fingerprint)
-                    
-                    return _response(200, {
-                        "authenticated": True,
-                        "userId": user_id,
-                        "email": item.get("email"),
-                        "sessionToken": session_token
-                    })
+        if device:
+            # 디바이스 발견 - 자동 로그인
+            session_token = _generate_session_token(device.get("email"), device_fingerprint)
+            
+            return json_response(200, {
+                "authenticated": True,
+                "userId": device.get("userId"),
+                "email": device.get("email"),
+                "sessionToken": session_token
+            })
         
         # 디바이스 미등록
-        return _response(200, {"authenticated": False})
+        return json_response(200, {"authenticated": False})
         
     except Exception as error:
         LOGGER.exception("Error checking device")
-        return _response(500, {"message": str(error)})
+        return json_response(500, {"message": str(error)})
+
 
+def _find_user_id_by_email(email: str) -> Optional[str]:
+    """이메일로 가입된 사용자 ID 조회 (EMAIL#<email> 포인터 1회 GetItem)
 
-def _register_device(user_id: str, device_fingerprint: str) -> None:
-    """사용자에게 디바이스 등록"""
+    포인터가 없으면 None (기존 프로필의 포인터는 backfill_indexes.py 가 생성)
+    """
+    response = _table().get_item(Key=ConfigStore.email_index_key(email))
+    item = response.get("Item")
+    return item.get("userId") if item else None
+
+
+def _register_device(user_id: str, email: str, device_fingerprint: str) -> None:
+    """사용자에게 디바이스 등록 (DEVICE# 아이템 + 프로필 devices 맵, 1회 트랜잭션)"""
     try:
-        # 먼저 기존 devices 조회
-        response = table.get_item(Key={"PK": f"USER#{user_id}", "SK": "PROFILE"})
-        item = response.get("Item")
-        
-        if not item:
-            LOGGER.warning(f"User {user_id} not found for device registration")
-            return
-        
-        devices = item.get("devices", [])
-        
-        # 이미 등록된 디바이스인지 확인
-        for device in devices:
-            if device.get("fingerprint") == device_fingerprint:
-                LOGGER.info(f"Device already registered for user {user_id}, updating lastAccessAt")
-                device["lastAccessAt"] = datetime.utcnow().isoformat()
-                table.update_item(
-                    Key={"PK": f"USER#{user_id}", "SK": "PROFILE"},
-                    UpdateExpression="SET devices = :devices",
-                    ExpressionAttributeValues={":devices": devices}
-                )
-                return
-        
-        # 새 디바이스 정보 생성
-        device_info = {
-            "fingerprint": device_fingerprint,
-            "registeredAt": datetime.utcnow().isoformat(),
-            "lastAccessAt": datetime.utcnow().isoformat()
-        }
-        
-        # 기존 devices 배열에 추가
-        devices.append(device_info)
-        table.update_item(
-            Key={"PK": f"USER#{user_id}", "SK": "PROFILE"},
-            UpdateExpression="SET devices = :devices",
-            ExpressionAttributeValues={":devices": devices}
-        )
-        LOGGER.info(f"New device registered for user {user_id}")
-    except ClientError as e:
+        _config_store().register_device(user_id, email, device_fingerprint)
+        LOGGER.info(f"Device registered for user {user_id}")
+    except KeyError:
+        LOGGER.warning(f"User {user_id} not found for device registration")
+    except RuntimeError as e:
         LOGGER.error(f"Failed to register device: {e}")
 
 
+def _table():
+    return aws_clients.resource("dynamodb").Table(table_name)
 
-def _update_device_access(user_id: str, device_fingerprint: str) -> None:
-    """디바이스 마지막 접속 시간 업데이트"""
-    try:
-        response = table.get_item(Key={"PK": f"USER#{user_id}", "SK": "PROFILE"})
-        item = response.get("Item")
-        
-        if not item:
-            return
-        
-        devices = item.get("devices", [])
-        updated = False
-        
-        for device in devices:
-            if device.get("fingerprint") == device_fingerprint:
-                device["lastAccessAt"] = datetime.utcnow().isoformat()
-                updated = True
-                break
-        
-        if updated:
-            table.update_item(
-                Key={"PK": f"USER#{user_id}", "SK": "PROFILE"},
-                UpdateExpression="SET devices = :devices",
-                ExpressionAttributeValues={":devices": devices}
-            )
-    except ClientError as e:
-        LOGGER.error(f"Failed to update device access: {e}")
+
+def _config_store() -> ConfigStore:
+    return ConfigStore(table_name=table_name)
 
 
 def _generate_session_token(email: str, device_fingerprint: Optional[str]) -> str:
     """세션 토큰 생성"""
     data = f"{email}:{device_fingerprint}:{secrets.token_hex(16)}"
     return hashlib.sha256(data.encode()).hexdigest()
-
-
-def _parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
-    body = event.get("body")
-    if not body:
-        return {}
-    if event.get("isBase64Encoded"):
-        body = base64.b64decode(body).decode()
-    try:
-        return json.loads(body)
-    except json.JSONDecodeError:
-        return {}
-
-
-def _response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Methods": "GET,POST,OPTIONS"
-        },
-        "body": json.dumps(body, ensure_ascii=False)
-    }
@@ -1,18 +1,84 @@
-"""Shared business logic for AWS Lambda handlers and local runner."""
+"""Shared business logic for AWS Lambda handlers and local runner.
 
-from .config_store import ConfigStore  # noqa: F401
-from .holiday_service import HolidayService  # noqa: F401
-from .models import ReservationAttempt, UserPreferences  # noqa: F401
-from .reservation_client import ReservationClient  # noqa: F401
-from .reservation_service import ReservationService  # noqa: F401
-from .ses_notifier import SesNotifier  # noqa: F401
+Exports are imported on first attribute access (PEP 562), so ``from core
+import ConfigStore`` loads config_store without requests, aiohttp or the
+reservation stack.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+	from .async_reservation_client import AsyncReservationClient, create_connector  # noqa: F401
+	from .config_store import ConfigStore, EmailAlreadyRegistered, UserLimitReached  # noqa: F401
+	from .governor import governor_stats  # noqa: F401
+	from .hedging import hedging_stats  # noqa: F401
+	from .holiday_service import HolidayService, holiday_cache_stats  # noqa: F401
+	from .models import PreparedReservation, ReservationAttempt, UserPreferences  # noqa: F401
+	from .reservation_client import ReservationClient  # noqa: F401
+	from .reservation_service import ReservationService  # noqa: F401
+	from .retry import RetryPolicy, run_deadline  # noqa: F401
+	from .run_context import RunContext  # noqa: F401
+	from .server_clock import ServerClock  # noqa: F401
+	from .session_store import SessionStore  # noqa: F401
+	from .ses_notifier import SesNotifier  # noqa: F401
+
+# Exported name -> submodule defining it.
+_EXPORTS = {
+	"AsyncReservationClient": "async_reservation_client",
+	"ConfigStore": "config_store",
+	"create_connector": "async_reservation_client",
+	"EmailAlreadyRegistered": "config_store",
+	"governor_stats": "governor",
+	"hedging_stats": "hedging",
+	"holiday_cache_stats": "holiday_service",
+	"HolidayService": "holiday_service",
+	"PreparedReservation": "models",
+	"ReservationAttempt": "models",
+	"ReservationClient": "reservation_client",
+	"ReservationService": "reservation_service",
+	"RetryPolicy": "retry",
+	"run_deadline": "retry",
+	"RunContext": "run_context",
+	"ServerClock": "server_clock",
+	"SesNotifier": "ses_notifier",
+	"SessionStore": "session_store",
+	"UserLimitReached": "config_store",
+	"UserPreferences": "models",
+}
 
 __all__ = [
+	"AsyncReservationClient",
 	"ConfigStore",
+	"create_connector",
+	"EmailAlreadyRegistered",
 	"HolidayService",
+	"PreparedReservation",
 	"ReservationAttempt",
 	"UserPreferences",
 	"ReservationClient",
 	"ReservationService",
+	"RetryPolicy",
+	"RunContext",
+	"ServerClock",
+	"SessionStore",
 	"SesNotifier",
+	"UserLimitReached",
+	"governor_stats",
+	"hedging_stats",
+	"holiday_cache_stats",
+	"run_deadline",
 ]
+
+
+def __getattr__(name: str) -> Any:
+	module = _EXPORTS.get(name)
+	if module is None:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	value = getattr(import_module(f".{module}", __name__), name)
+	globals()[name] = value
+	return value
+
+
+def __dir__() -> List[str]:
+	return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,221 @@
+"""asyncio counterpart of ReservationClient built on aiohttp."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from email.utils import parsedate_to_datetime
+from http.cookies import Morsel, SimpleCookie
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from yarl import URL
+
+from .governor import GOVERNOR
+from .hedging import HEDGER, hedging_enabled
+from .models import ApiCallResult, LoginResult
+from .reservation_client import ReservationClient, default_base_url
+from .tracing import traced
+
+LOGGER = logging.getLogger()
+
+# Total seconds per endpoint. Reads are cheap and retried by the caller; the order
+# POST and login get the same budget as the synchronous client.
+ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "login": 10.0,
+    "reserve": 10.0,
+    "menuList": 5.0,
+    "deliveryInfo": 5.0,
+    "reservations": 5.0,
+    "cancel": 10.0,
+}
+CONNECT_TIMEOUT = 3.0
+
+
+def create_connector(limit: Optional[int] = None, keepalive_timeout: float = 30.0) -> aiohttp.TCPConnector:
+    """Bounded HTTP/1.1 keep-alive pool to hcafe, shared by the clients of one event loop.
+
+    Must be created (and closed) inside the loop that uses it. ``limit`` defaults
+    to ``HCAFE_POOL_SIZE`` (16).
+    """
+    limit = limit or int(os.environ.get("HCAFE_POOL_SIZE", "16"))
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=300,
+        ssl=False,  # same as verify=False in ReservationClient
+    )
+
+
+class AsyncReservationClient:
+    """Same method surface as ReservationClient, but every call is a coroutine.
+
+    Each client keeps its own cookie jar (one hcafe login per client) while the
+    TCP connections come from ``connector``, which several clients may share.
+    Without a connector the client creates and owns a private one.
+    """
+
+    MENU_CORNER_MAP = ReservationClient.MENU_CORNER_MAP
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        hedging: Optional[bool] = None,
+    ) -> None:
+        self.base_url = (base_url or default_base_url()).rstrip("/")
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.hedging = hedging_enabled() if hedging is None else hedging
+        self._connector = connector
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Same contract as ReservationClient.reauthenticate, as a coroutine.
+        self.reauthenticate: Optional[Callable[[], Awaitable[bool]]] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            owns_connector = self._connector is None
+            self._session = aiohttp.ClientSession(
+                connector=self._connector or create_connector(),
+                connector_owner=owns_connector,
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncReservationClient":
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:
+        await self.close()
+
+    @traced("login")
+    async def login(self, user_id: str, password: str, payload_defaults: Dict[str, str]) -> LoginResult:
+        payload = ReservationClient._login_payload(user_id, password, payload_defaults)
+        status, body, text = await self._send("login", "/api/com/login.do", payload, {"Content-Type": "application/json"})
+        return ReservationClient._login_result(status, body, text)
+
+    @traced("order")
+    async def reserve_menu(self, payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str, floor_name: Optional[str] = None) -> ApiCallResult:
+        payload = ReservationClient._reserve_payload(payload_template, coner_dv_cd, prvd_dt, floor_name)
+        LOGGER.info(f"Full Reserve Payload: {json.dumps(payload, ensure_ascii=False)}")
+        return await self._call("reserve", "/api/menu/reservation/insertReservationOrder.do", payload)
+
+    @traced("menuList")
+    async def fetch_reserve_menu_list(self, prvd_dt: str, bizplc_cd: str) -> ApiCallResult:
+        payload = ReservationClient._menu_list_payload(prvd_dt, bizplc_cd)
+        return await self._call("menuList", "/api/menu/reservation/selectReserveMenuList.do", payload)
+
+    @traced("deliveryInfo")
+    async def fetch_delivery_info_type_list(self, payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str) -> ApiCallResult:
+        payload = ReservationClient._delivery_info_payload(payload_template, coner_dv_cd, prvd_dt)
+        return await self._call("deliveryInfo", "/api/menu/reservation/selectDeliveryInfoTypeList.do", payload)
+
+    async def fetch_reservations(self, prvd_dt: str, bizplc_cd: str) -> ApiCallResult:
+        payload = {"prvdDt": prvd_dt, "bizplcCd": bizplc_cd}
+        return await self._call("reservations", "/api/menu/reservation/selectMenuReservationList.do", payload)
+
+    async def cancel_reservation(self, reservation_payload: Dict[str, str]) -> ApiCallResult:
+        return await self._call("cancel", "/api/menu/reservation/updateMenuReservationCancel.do", reservation_payload)
+
+    @traced("existingReservations")
+    async def check_existing_reservations(self, payload_defaults: Dict[str, Any], prvd_dt: str) -> list:
+        """Check existing reservations for a given date"""
+        payload = {"prvdDt": prvd_dt, "bizplcCd": payload_defaults.get("bizplcCd", "196274")}
+        _status, body, _text = await self._post(
+            "reservations", "/api/menu/reservation/selectMenuReservationList.do", payload, ReservationClient._json_headers()
+        )
+        return ReservationClient._active_reservations(body, prvd_dt)
+
+    def menu_code_for(self, initial: str) -> Optional[str]:
+        return self.MENU_CORNER_MAP.get(initial.strip())
+
+    # Cookie jar in ReservationClient's export format, so SessionStore serves both clients.
+
+    def export_cookies(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": morsel.key,
+                "value": morsel.value,
+                "domain": morsel["domain"],
+                "path": morsel["path"] or "/",
+                "expires": self._morsel_expiry(morsel),
+                "secure": bool(morsel["secure"]),
+            }
+            for morsel in self.session.cookie_jar
+        ]
+
+    def import_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        jar = SimpleCookie()
+        for cookie in cookies:
+            jar[cookie["name"]] = cookie["value"]
+            morsel = jar[cookie["name"]]
+            if cookie.get("domain"):
+                morsel["domain"] = cookie["domain"]
+            morsel["path"] = cookie.get("path") or "/"
+            if cookie.get("expires"):
+                morsel["max-age"] = str(max(0, int(cookie["expires"] - time.time())))
+            if cookie.get("secure"):
+                morsel["secure"] = True
+        self.session.cookie_jar.update_cookies(jar, URL(self.base_url))
+
+    def clear_cookies(self) -> None:
+        self.session.cookie_jar.clear()
+
+    @staticmethod
+    def _morsel_expiry(morsel: Morsel) -> Optional[int]:
+        """Epoch seconds of a cookie's Max-Age/Expires attribute (None for session cookies)."""
+        try:
+            if morsel["max-age"]:
+                return int(time.time()) + int(morsel["max-age"])
+            if morsel["expires"]:
+                return int(parsedate_to_datetime(morsel["expires"]).timestamp())
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    async def _call(self, endpoint: str, path: str, payload: Dict[str, Any]) -> ApiCallResult:
+        status, body, text = await self._post(endpoint, path, payload, ReservationClient._json_headers())
+        return ReservationClient._api_result(status, body, text)
+
+    async def _post(self, endpoint: str, path: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Dict[str, Any], str]:
+        """:meth:`_send` with one transparent re-login and retry when the session has expired."""
+        status, body, text = await self._send(endpoint, path, payload, headers)
+        if self.reauthenticate and ReservationClient._session_expired(status, body, text):
+            LOGGER.info("hcafe session expired (HTTP %s) for %s, logging in again", status, path.rsplit("/", 1)[-1])
+            if await self.reauthenticate():
+                status, body, text = await self._send(endpoint, path, payload, headers)
+        return status, body, text
+
+    async def _send(self, endpoint: str, path: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Dict[str, Any], str]:
+        timeout = aiohttp.ClientTimeout(total=self.timeouts[endpoint], sock_connect=CONNECT_TIMEOUT)
+
+        name = path.rsplit("/", 1)[-1]
+
+        async def post() -> Tuple[int, str]:
+            async with self.session.post(
+                f"{self.base_url}{path}", data=json.dumps(payload), headers=headers, timeout=timeout
+            ) as response:
+                return response.status, await response.text()
+
+        async def send() -> Tuple[int, str]:
+            return await GOVERNOR.call_async(name, post, lambda result: result[0])
+
+        if self.hedging:
+            # Only read-only endpoints are hedged (see core.hedging).
+            status, text = await HEDGER.call_async(name, send)
+        else:
+            status, text = await send()
+        try:
+            body = json.loads(text)
+        except ValueError:
+            body = {}
+        return status, body if isinstance(body, dict) else {}, text
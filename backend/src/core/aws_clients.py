@@ -0,0 +1,76 @@
+"""One boto3 client/resource per service per container (or per thread), created on first use."""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+_CLIENTS: Dict[Tuple[str, str, Optional[str]], Any] = {}
+_LOCK = threading.Lock()
+# Per-thread resources (see thread_resource), keyed like _CLIENTS.
+_LOCAL = threading.local()
+
+# Services whose endpoint can be overridden for local runs (DynamoDB Local).
+_ENDPOINT_ENV = {"dynamodb": "DYNAMODB_ENDPOINT_URL"}
+
+
+def client(service: str, region_name: Optional[str] = None) -> Any:
+    """Shared boto3 client (clients are thread safe)."""
+    return _get("client", service, region_name)
+
+
+def resource(service: str, region_name: Optional[str] = None) -> Any:
+    """Shared boto3 resource; share it across handlers, not across threads that mutate it."""
+    return _get("resource", service, region_name)
+
+
+def thread_resource(service: str, region_name: Optional[str] = None) -> Any:
+    """boto3 resource owned by the calling thread, created on its first use there.
+
+    Resources (and the default boto3 session they come from) are not thread
+    safe, so worker threads each build theirs from a private session.
+    """
+    resources = getattr(_LOCAL, "resources", None)
+    if resources is None:
+        resources = _LOCAL.resources = {}
+    key = ("resource", service, region_name)
+    value = resources.get(key)
+    if value is None:
+        import boto3
+
+        value = resources[key] = boto3.session.Session().resource(service, **_kwargs(service, region_name))
+    return value
+
+
+def clear() -> None:
+    """Drop every cached client (tests, or after changing credentials/endpoints).
+
+    Only the calling thread's thread_resource() entries are dropped.
+    """
+    with _LOCK:
+        _CLIENTS.clear()
+    _LOCAL.__dict__.clear()
+
+
+def _get(kind: str, service: str, region_name: Optional[str]) -> Any:
+    key = (kind, service, region_name)
+    value = _CLIENTS.get(key)
+    if value is None:
+        with _LOCK:
+            value = _CLIENTS.get(key)
+            if value is None:
+                # boto3 itself costs ~100ms to import; only pay for it on first use.
+                import boto3
+
+                value = getattr(boto3, kind)(service, **_kwargs(service, region_name))
+                _CLIENTS[key] = value
+    return value
+
+
+def _kwargs(service: str, region_name: Optional[str]) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"region_name": region_name}
+    endpoint_url = os.environ.get(_ENDPOINT_ENV.get(service, ""), "")
+    if endpoint_url:
+        kwargs["endpoint_url"] = endpoint_url
+    return kwargs
@@ -0,0 +1,123 @@
+"""Working-day index built from weekends and cached public holidays."""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Years to look ahead/back before giving up (a year without any workday is not real).
+MAX_YEAR_SPAN = 2
+
+
+class BusinessCalendar:
+    """Sorted working days per year, queried with bisect.
+
+    ``holidays_for(year, month)`` returns that month's holidays as ``YYYYMMDD``
+    strings, or None when they are not known (not stored, or the lookup failed).
+    It is called once per month when the month's year is first queried. An
+    unknown month only has weekends off and its year is not kept, so the next
+    query asks again. Built years expire after ``ttl`` seconds (the holiday
+    cache's TTL; None keeps them until :meth:`clear`). :meth:`invalidate`
+    recomputes a single month (e.g. after its holidays were refreshed) and
+    splices it into the year's index.
+    """
+
+    def __init__(
+        self,
+        holidays_for: Callable[[int, int], Optional[Iterable[str]]],
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._holidays_for = holidays_for
+        self.ttl = ttl
+        self._clock = clock
+        self._years: Dict[int, Tuple[float, List[date]]] = {}  # year -> (expires at, days)
+        self._lock = threading.Lock()
+
+    def is_workday(self, day: date) -> bool:
+        days = self._year(day.year)
+        index = bisect_left(days, day)
+        return index < len(days) and days[index] == day
+
+    def next_workday(self, day: date, inclusive: bool = False) -> date:
+        """First working day after ``day`` (or ``day`` itself when ``inclusive``)."""
+        search = bisect_left if inclusive else bisect_right
+        for year in range(day.year, day.year + MAX_YEAR_SPAN + 1):
+            days = self._year(year)
+            index = search(days, day) if year == day.year else 0
+            if index < len(days):
+                return days[index]
+        raise ValueError(f"No working day within {MAX_YEAR_SPAN} years after {day}")
+
+    def previous_workday(self, day: date, inclusive: bool = False) -> date:
+        """Last working day before ``day`` (or ``day`` itself when ``inclusive``)."""
+        search = bisect_right if inclusive else bisect_left
+        for year in range(day.year, day.year - MAX_YEAR_SPAN - 1, -1):
+            days = self._year(year)
+            index = search(days, day) if year == day.year else len(days)
+            if index > 0:
+                return days[index - 1]
+        raise ValueError(f"No working day within {MAX_YEAR_SPAN} years before {day}")
+
+    def nearest_workday(self, day: date) -> date:
+        """``day`` when it is a working day, otherwise the next one."""
+        return self.next_workday(day, inclusive=True)
+
+    def invalidate(self, year: int, month: int) -> None:
+        """Reload one month's holidays; years that were never built stay lazy."""
+        with self._lock:
+            if year not in self._years:
+                return
+        month_days, known = self._month(year, month)
+        start, end = self._month_bounds(year, month)
+        with self._lock:
+            entry = self._years.get(year)
+            if entry is None:
+                return
+            if not known:
+                del self._years[year]
+                return
+            expires_at, days = entry
+            days = list(days)
+            days[bisect_left(days, start):bisect_left(days, end)] = month_days
+            self._years[year] = (expires_at, days)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._years.clear()
+
+    def _year(self, year: int) -> List[date]:
+        now = self._clock()
+        with self._lock:
+            entry = self._years.get(year)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        days: List[date] = []
+        complete = True
+        for month in range(1, 13):
+            month_days, known = self._month(year, month)
+            days.extend(month_days)
+            complete = complete and known
+        if complete:
+            expires_at = now + self.ttl if self.ttl is not None else float("inf")
+            with self._lock:
+                self._years[year] = (expires_at, days)
+        return days
+
+    def _month(self, year: int, month: int) -> Tuple[List[date], bool]:
+        """The month's working days and whether its holidays were known."""
+        holidays = self._holidays_for(year, month)
+        known = holidays is not None
+        holidays = set(holidays or ())
+        start, end = self._month_bounds(year, month)
+        days = (start + timedelta(days=offset) for offset in range((end - start).days))
+        return [day for day in days if day.weekday() < 5 and day.strftime("%Y%m%d") not in holidays], known
+
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> Tuple[date, date]:
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return start, end
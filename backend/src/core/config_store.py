@@ -3,15 +3,20 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional, Set
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Set
 
-import boto3
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 import yaml
 
+from . import aws_clients
 from .crypto import decrypt, encrypt
 from .models import UserPreferences
+from .tracing import traced
 
 
 FALLBACK_DEFAULTS: Dict[str, Any] = {
@@ -36,6 +41,39 @@ FALLBACK_DEFAULTS: Dict[str, Any] = {
     "retry_interval": 5,
 }
 
+# Parsed default config by path (see ConfigStore._load_default_config).
+_DEFAULT_CONFIGS: Dict[str, Dict[str, Any]] = {}
+
+USER_COUNT_KEY: Dict[str, str] = {"PK": "META", "SK": "USER_COUNT"}
+# Written by backfill_indexes.py once every profile carries its activeSite key.
+ACTIVE_USERS_INDEXED_KEY: Dict[str, str] = {"PK": "META", "SK": "ACTIVE_USERS_INDEXED"}
+
+# Profile attributes build_preferences reads; the worker fetches only these.
+# Also the projection of the ActiveUsersIndex GSI (template.yaml).
+WORKER_PROFILE_ATTRIBUTES = (
+    "PK", "SK", "userId", "activeSite",
+    "userData_encrypted", "holidayApiKey_encrypted", "data.go.kr",
+    "menuSeq", "floorNm", "floor_name", "preferences",
+    "osDvCd", "userCurrAppVer", "mobiPhTrmlId", "timezone",
+    "notificationEmails", "notifications", "email",
+    "autoReservationEnabled", "exclusionDates",
+    "floorDescriptor", "floorDescriptorResolvedAt", "_salt", "salt",
+)
+# Items per parallel scan segment, and the most segments one enumeration uses.
+SCAN_SEGMENT_ITEMS = int(os.environ.get("SCAN_SEGMENT_ITEMS", "1000"))
+MAX_SCAN_SEGMENTS = 8
+# Table items per registered user (PROFILE, SESSION, EMAIL# and DEVICE# pointers),
+# to size a full-table scan from the META/USER_COUNT counter.
+TABLE_ITEMS_PER_USER = 4
+
+
+class UserLimitReached(RuntimeError):
+    """Raised by ConfigStore.save_profile when a new profile would exceed the user cap."""
+
+
+class EmailAlreadyRegistered(RuntimeError):
+    """Raised when the ``EMAIL#`` pointer of an email already belongs to another user."""
+
 
 class ConfigStore:
     """Loads encrypted per-user configuration from DynamoDB."""
@@ -51,40 +89,78 @@ class ConfigStore:
         if not self.table_name:
             raise ValueError("CONFIG_TABLE_NAME env var is required")
 
-        endpoint_url = os.environ.get("DYNAMODB_ENDPOINT_URL")
-        if endpoint_url:
-            self._dynamodb = dynamodb_resource or boto3.resource(
-                "dynamodb", region_name=region_name, endpoint_url=endpoint_url
-            )
-        else:
-            self._dynamodb = dynamodb_resource or boto3.resource("dynamodb", region_name=region_name)
-        self._table = self._dynamodb.Table(self.table_name)
+        # None: every thread uses its own resource (honours DYNAMODB_ENDPOINT_URL)
+        self._dynamodb = dynamodb_resource
+        self._region_name = region_name
+        self._local = threading.local()
 
         self._defaults = default_config or self._load_default_config()
 
+    @property
+    def _table(self) -> Any:
+        """The calling thread's Table; worker threads share one ConfigStore."""
+        table = getattr(self._local, "table", None)
+        if table is None:
+            dynamodb = self._dynamodb or aws_clients.thread_resource("dynamodb", region_name=self._region_name)
+            table = self._local.table = dynamodb.Table(self.table_name)
+        return table
+
     @staticmethod
     def _load_default_config() -> Dict[str, Any]:
+        """Defaults from DEFAULT_CONFIG_PATH, parsed once per path per container."""
         config_path = os.environ.get("DEFAULT_CONFIG_PATH", "config.default.yaml")
-        if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as handle:
-                loaded = yaml.safe_load(handle) or {}
-                return {**FALLBACK_DEFAULTS, **loaded}
-        return dict(FALLBACK_DEFAULTS)
+        defaults = _DEFAULT_CONFIGS.get(config_path)
+        if defaults is None:
+            defaults = dict(FALLBACK_DEFAULTS)
+            if os.path.exists(config_path):
+                with open(config_path, "r", encoding="utf-8") as handle:
+                    defaults.update(yaml.safe_load(handle) or {})
+            _DEFAULT_CONFIGS[config_path] = defaults
+        return dict(defaults)
 
-    def get_user_preferences(self, user_id: str) -> UserPreferences:
+    @traced("loadProfile")
+    def get_user_preferences(self, user_id: str, decrypt: bool = True) -> UserPreferences:
         item = self._fetch_profile_item(user_id)
         if not item:
             raise KeyError(f"Profile not found for user {user_id}")
 
-        return self._build_preferences(item, user_id)
+        return self._build_preferences(item, user_id, decrypt)
+
+    def build_preferences(self, item: Dict[str, Any], decrypt: bool = True) -> UserPreferences:
+        """Build preferences from an already loaded profile item (e.g. from get_all_user_profiles).
 
-    def _build_preferences(self, item: Dict[str, Any], user_id: str) -> UserPreferences:
-        password = self._decrypt_secret(item, "userData_encrypted")
+        With ``decrypt=False`` no KMS call is made; the ciphertexts are kept on the
+        result until :meth:`decrypt_secrets` is called.
+        """
+        return self._build_preferences(item, item.get("userId", ""), decrypt)
+
+    @traced("decrypt")
+    def decrypt_secrets(self, preferences: UserPreferences) -> UserPreferences:
+        """Decrypt secrets deferred by ``decrypt=False``. No-op when already loaded."""
+        encrypted = preferences.encrypted_secrets
+        if "password" in encrypted:
+            preferences.password = decrypt(encrypted["password"])
+        if "holiday_api_key" in encrypted:
+            preferences.holiday_api_key = decrypt(encrypted["holiday_api_key"])
+        preferences.encrypted_secrets = {}
+        return preferences
+
+    def _build_preferences(self, item: Dict[str, Any], user_id: str, decrypt_secrets: bool = True) -> UserPreferences:
+        encrypted_secrets: Dict[str, str] = {}
+        if decrypt_secrets:
+            password = self._decrypt_secret(item, "userData_encrypted")
+            holiday_api_key = self._extract_holiday_api_key(item)
+        else:
+            password = ""
+            holiday_api_key = None
+            encrypted_secrets["password"] = self._encrypted_value(item, "userData_encrypted")
+            encrypted_holiday_key = self._encrypted_holiday_api_key(item)
+            if encrypted_holiday_key:
+                encrypted_secrets["holiday_api_key"] = encrypted_holiday_key
         menu_seq = item.get("menuSeq", "").split(",")
         menu_sequence = [entry.strip() for entry in menu_seq if entry.strip()]
         floor_name = item.get("floorNm") or item.get("floor_name")
         payload = self._build_payload(item)
-        holiday_api_key = self._extract_holiday_api_key(item)
         timezone = item.get("timezone") or os.environ.get("DEFAULT_TIMEZONE", "Asia/Seoul")
         notifications = item.get("notificationEmails") or item.get("notifications") or []
         if isinstance(notifications, str):
@@ -95,16 +171,8 @@ class ConfigStore:
         if not notifications and item.get("email"):
             notifications = [item.get("email")]
         
-        # Auto-reservation toggle (default: True)
-        auto_reservation_enabled = item.get("autoReservationEnabled", True)
-        if isinstance(auto_reservation_enabled, str):
-            auto_reservation_enabled = auto_reservation_enabled.lower() in ('true', '1', 'yes')
-        
-        # Load exclusion dates
-        exclusion_dates = item.get("exclusionDates", [])
-        if isinstance(exclusion_dates, str):
-            exclusion_dates = [exclusion_dates]
-        exclusion_dates = [d for d in exclusion_dates if d]
+        auto_reservation_enabled = self.is_auto_reservation_enabled(item)
+        exclusion_dates = self.exclusion_dates_of(item)
 
         return UserPreferences(
             user_id=item.get("userId", user_id),
@@ -118,8 +186,38 @@ class ConfigStore:
             notification_emails=notifications,
             auto_reservation_enabled=auto_reservation_enabled,
             exclusion_dates=exclusion_dates,
+            encrypted_secrets=encrypted_secrets,
+            floor_descriptor=self._plain(item.get("floorDescriptor")) or None,
+            floor_descriptor_resolved_at=item.get("floorDescriptorResolvedAt"),
         )
 
+    @staticmethod
+    def is_auto_reservation_enabled(item: Dict[str, Any]) -> bool:
+        """Plaintext auto-reservation toggle of a profile item (default: True)."""
+        enabled = item.get("autoReservationEnabled", True)
+        if isinstance(enabled, str):
+            enabled = enabled.lower() in ('true', '1', 'yes')
+        return bool(enabled)
+
+    @staticmethod
+    def exclusion_dates_of(item: Dict[str, Any]) -> List[str]:
+        """Plaintext exclusion dates (YYYY-MM-DD) of a profile item."""
+        exclusion_dates = item.get("exclusionDates", [])
+        if isinstance(exclusion_dates, str):
+            exclusion_dates = [exclusion_dates]
+        return [d for d in exclusion_dates if d]
+
+    @staticmethod
+    def _plain(value: Any) -> Any:
+        """DynamoDB returns numbers as Decimal; turn them back into int/float for JSON payloads."""
+        if isinstance(value, Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        if isinstance(value, dict):
+            return {key: ConfigStore._plain(entry) for key, entry in value.items()}
+        if isinstance(value, list):
+            return [ConfigStore._plain(entry) for entry in value]
+        return value
+
     def _fetch_profile_item(self, user_id: str) -> Optional[Dict[str, Any]]:
         key = {
             "PK": f"USER#{user_id}",
@@ -144,75 +242,491 @@ class ConfigStore:
         return payload
 
     def _decrypt_secret(self, item: Dict[str, Any], key: str) -> str:
+        # Salt is no longer used for decryption with KMS but might be present in legacy items
+        return decrypt(self._encrypted_value(item, key))
+
+    @staticmethod
+    def _encrypted_value(item: Dict[str, Any], key: str) -> str:
         encrypted = item.get(key)
         if not encrypted:
             raise KeyError(f"Missing encrypted payload '{key}'")
-        # Salt is no longer used for decryption with KMS but might be present in legacy items
-        return decrypt(encrypted)
+        return encrypted
 
     def _extract_holiday_api_key(self, item: Dict[str, Any]) -> Optional[str]:
+        encrypted_key = self._encrypted_holiday_api_key(item)
+        if not encrypted_key:
+            return None
+        return decrypt(encrypted_key)
+
+    @staticmethod
+    def _encrypted_holiday_api_key(item: Dict[str, Any]) -> Optional[str]:
         holiday_node = (
             item.get("data.go.kr", {})
             .get("api", {})
         )
-        encrypted_key = holiday_node.get("key_encrypted") or item.get("holidayApiKey_encrypted")
-        if not encrypted_key:
-            return None
-        return decrypt(encrypted_key)
+        return holiday_node.get("key_encrypted") or item.get("holidayApiKey_encrypted")
 
     # Convenience helpers for potential future writes ---------------------
 
-    def save_profile(self, item: Dict[str, Any]) -> None:
+    def save_profile(self, item: Dict[str, Any], max_users: Optional[int] = None) -> None:
+        """Write the profile and its ``EMAIL#`` pointer in one transaction.
+
+        A new profile also increments the ``META/USER_COUNT`` counter in the
+        same transaction; with ``max_users`` the increment is conditional and
+        UserLimitReached is raised once the cap is reached. EmailAlreadyRegistered
+        is raised (and nothing written) when the email belongs to another user.
+        An existing profile keeps its stored ``devices``: they are owned by
+        :meth:`register_device` / :meth:`remove_device` and their ``DEVICE#`` items.
+        """
         import logging
         logger = logging.getLogger()
+        user_id = item.get("userId")
+        email = item.get("email")
         try:
-            logger.info("Saving profile for user: %s", item.get("userId"))
-            self._table.put_item(Item=item)
-            logger.info("Successfully saved profile for user: %s", item.get("userId"))
+            logger.info("Saving profile for user: %s", user_id)
+            previous = self._fetch_profile_item(user_id)
+            item = {key: value for key, value in item.items() if key != "activeSite"}
+            if previous is not None and "devices" in previous:
+                item["devices"] = previous["devices"]
+            site = self.active_site_of(item)
+            if site:
+                item["activeSite"] = site
+            profile_put: Dict[str, Any] = {"TableName": self.table_name, "Item": item}
+            transact_items: List[Dict[str, Any]] = [{"Put": profile_put}]
+            if previous is None:
+                profile_put["ConditionExpression"] = "attribute_not_exists(PK)"
+                transact_items.append({"Update": self._user_count_update(1, max_users)})
+            email_index = None
+            if email:
+                email_index = len(transact_items)
+                transact_items.append({"Put": {
+                    "TableName": self.table_name,
+                    "Item": self._email_index_item(email, user_id),
+                    **self._email_index_condition(user_id),
+                }})
+            for attempt in range(2):
+                try:
+                    self._table.meta.client.transact_write_items(TransactItems=transact_items)
+                    break
+                except ClientError as error:
+                    if email_index is not None and self._cancelled_by(error, email_index):
+                        raise EmailAlreadyRegistered(f"{email} is already registered") from error
+                    if previous is not None or not self._cancelled_by(error, 1):
+                        raise
+                    if self.get_user_count() is None and attempt == 0:
+                        # Counter not created yet: seed it from the profiles and retry
+                        self.reconcile_user_count()
+                        continue
+                    raise UserLimitReached(f"User limit of {max_users} reached") from error
+            old_email = (previous or {}).get("email")
+            if email and old_email and self.email_index_key(old_email) != self.email_index_key(email):
+                self._delete_email_index(old_email, user_id)
+            logger.info("Successfully saved profile for user: %s", user_id)
+        except ClientError as error:
+            logger.error("Failed to persist profile for %s: %s", user_id, error)
+            raise RuntimeError(f"Failed to persist profile for {user_id}: {error}") from error
+
+    def _user_count_update(self, delta: int, max_users: Optional[int] = None) -> Dict[str, Any]:
+        update: Dict[str, Any] = {
+            "TableName": self.table_name,
+            "Key": USER_COUNT_KEY,
+            "UpdateExpression": "ADD #count :delta",
+            "ExpressionAttributeNames": {"#count": "count"},
+            "ExpressionAttributeValues": {":delta": delta},
+        }
+        if delta > 0 and max_users is not None:
+            update["ConditionExpression"] = "#count < :max"
+            update["ExpressionAttributeValues"][":max"] = max_users
+        elif delta > 0:
+            update["ConditionExpression"] = "attribute_exists(#count)"
+        else:
+            update["ConditionExpression"] = "#count > :zero"
+            update["ExpressionAttributeValues"][":zero"] = 0
+        return update
+
+    @staticmethod
+    def _cancelled_by(error: ClientError, index: int) -> bool:
+        """Whether a cancelled transaction failed the condition of item ``index``."""
+        if error.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+            return False
+        reasons = error.response.get("CancellationReasons") or []
+        return index < len(reasons) and reasons[index].get("Code") == "ConditionalCheckFailed"
+
+    def get_user_count(self) -> Optional[int]:
+        """Registered users according to the counter item (None before it exists)."""
+        try:
+            result = self._table.get_item(Key=USER_COUNT_KEY)
+        except ClientError as error:
+            raise RuntimeError(f"Failed to read user count: {error}") from error
+        item = result.get("Item")
+        return int(item["count"]) if item and "count" in item else None
+
+    def count_user_profiles(self) -> int:
+        """Count ``USER#``/``PROFILE`` items with a paginated COUNT scan."""
+        scan_kwargs: Dict[str, Any] = {
+            "FilterExpression": "begins_with(PK, :pk) AND SK = :sk",
+            "ExpressionAttributeValues": {":pk": "USER#", ":sk": "PROFILE"},
+            "Select": "COUNT",
+            # Must see every profile committed before the counter was read
+            "ConsistentRead": True,
+        }
+        count = 0
+        try:
+            while True:
+                response = self._table.scan(**scan_kwargs)
+                count += response.get("Count", 0)
+                if "LastEvaluatedKey" not in response:
+                    return count
+                scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except ClientError as error:
+            raise RuntimeError(f"Failed to count user profiles: {error}") from error
+
+    def reconcile_user_count(self, attempts: int = 3) -> Dict[str, Optional[int]]:
+        """Reset the counter to the number of stored profiles; returns old and new values.
+
+        The Put only succeeds while the counter still holds the value read before
+        counting (or is still absent), so a registration or deletion committed
+        during the scan is not overwritten; the profiles are counted again then.
+        """
+        for attempt in range(attempts):
+            previous = self.get_user_count()
+            count = self.count_user_profiles()
+            if previous is None:
+                condition: Dict[str, Any] = {"ConditionExpression": "attribute_not_exists(#count)"}
+            else:
+                condition = {
+                    "ConditionExpression": "#count = :previous",
+                    "ExpressionAttributeValues": {":previous": previous},
+                }
+            try:
+                self._table.put_item(
+                    Item={
+                        **USER_COUNT_KEY,
+                        "count": count,
+                        "reconciledAt": datetime.utcnow().isoformat(),
+                    },
+                    ExpressionAttributeNames={"#count": "count"},
+                    **condition,
+                )
+                return {"previous": previous, "count": count}
+            except ClientError as error:
+                code = error.response.get("Error", {}).get("Code")
+                if code != "ConditionalCheckFailedException":
+                    raise RuntimeError(f"Failed to store user count: {error}") from error
+        raise RuntimeError(f"User count kept changing during {attempts} reconcile attempts")
+
+    @staticmethod
+    def email_index_key(email: str) -> Dict[str, str]:
+        """Key of the ``EMAIL#<email>`` pointer item mapping a login email to its user."""
+        return {"PK": f"EMAIL#{email.strip().lower()}", "SK": "USER"}
+
+    def _email_index_item(self, email: str, user_id: str) -> Dict[str, Any]:
+        return {**self.email_index_key(email), "userId": user_id, "email": email}
+
+    @staticmethod
+    def _email_index_condition(user_id: str) -> Dict[str, Any]:
+        """Only write a pointer that is new or already points at ``user_id``."""
+        return {
+            "ConditionExpression": "attribute_not_exists(PK) OR userId = :uid",
+            "ExpressionAttributeValues": {":uid": user_id},
+        }
+
+    def find_user_id_by_email(self, email: str) -> Optional[str]:
+        """The user registered with ``email`` (one GetItem on the pointer item)."""
+        try:
+            result = self._table.get_item(Key=self.email_index_key(email))
+        except ClientError as error:
+            raise RuntimeError(f"Failed to look up {email}: {error}") from error
+        item = result.get("Item")
+        return item.get("userId") if item else None
+
+    def save_email_index(self, email: str, user_id: str) -> None:
+        try:
+            self._table.put_item(Item=self._email_index_item(email, user_id), **self._email_index_condition(user_id))
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                raise EmailAlreadyRegistered(f"{email} is already registered") from error
+            raise RuntimeError(f"Failed to index email for {user_id}: {error}") from error
+
+    def _delete_email_index(self, email: str, user_id: str) -> None:
+        self._delete_pointer(self.email_index_key(email), user_id)
+
+    def _delete_pointer(self, key: Dict[str, str], user_id: str) -> None:
+        """Remove a pointer item unless it already belongs to another user."""
+        try:
+            self._table.delete_item(
+                Key=key,
+                ConditionExpression="userId = :uid",
+                ExpressionAttributeValues={":uid": user_id},
+            )
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+
+    @staticmethod
+    def device_index_key(fingerprint: str) -> Dict[str, str]:
+        """Key of the ``DEVICE#<fingerprint>`` item registering a device to its user."""
+        return {"PK": f"DEVICE#{fingerprint}", "SK": "USER"}
+
+    def touch_device(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Stamp ``lastAccessAt`` and return the device item, or None if unknown.
+
+        A single conditional UpdateItem, so an auto-login costs one round trip.
+        """
+        try:
+            result = self._table.update_item(
+                Key=self.device_index_key(fingerprint),
+                UpdateExpression="SET lastAccessAt = :now",
+                ConditionExpression="attribute_exists(PK)",
+                ExpressionAttributeValues={":now": datetime.utcnow().isoformat()},
+                ReturnValues="ALL_NEW",
+            )
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return None
+            raise RuntimeError(f"Failed to look up device: {error}") from error
+        return result.get("Attributes")
+
+    def register_device(self, user_id: str, email: Optional[str], fingerprint: str) -> None:
+        """Point ``DEVICE#<fingerprint>`` at the user and add it to the profile's device map.
+
+        Both writes go in one transaction. Profiles still holding the legacy
+        ``devices`` list are converted first (see :meth:`adopt_legacy_devices`).
+        """
+        now = datetime.utcnow().isoformat()
+        try:
+            self._table.meta.client.transact_write_items(TransactItems=[
+                {"Update": {
+                    "TableName": self.table_name,
+                    "Key": self.device_index_key(fingerprint),
+                    "UpdateExpression": "SET userId = :uid, email = :email, lastAccessAt = :now, "
+                                        "registeredAt = if_not_exists(registeredAt, :now)",
+                    "ExpressionAttributeValues": {":uid": user_id, ":email": email or "", ":now": now},
+                }},
+                {"Update": {
+                    "TableName": self.table_name,
+                    "Key": {"PK": f"USER#{user_id}", "SK": "PROFILE"},
+                    "UpdateExpression": "SET devices.#fp = if_not_exists(devices.#fp, :now)",
+                    "ConditionExpression": "attribute_exists(PK) AND attribute_type(devices, :map)",
+                    "ExpressionAttributeNames": {"#fp": fingerprint},
+                    "ExpressionAttributeValues": {":now": now, ":map": "M"},
+                }},
+            ])
+            return
         except ClientError as error:
-            logger.error("Failed to persist profile for %s: %s", item.get("userId"), error)
-            raise RuntimeError(f"Failed to persist profile for {item.get('userId')}: {error}") from error
+            if error.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+                raise RuntimeError(f"Failed to register device for {user_id}: {error}") from error
+
+        # Missing profile or a legacy ``devices`` list
+        profile = self._fetch_profile_item(user_id)
+        if not profile:
+            raise KeyError(f"Profile not found for user {user_id}")
+        devices = profile.get("devices")
+        if not isinstance(devices, dict):
+            devices = list(devices or [])
+            devices.append({"fingerprint": fingerprint, "registeredAt": now, "lastAccessAt": now})
+            self.adopt_legacy_devices({**profile, "devices": devices})
+
+    def adopt_legacy_devices(self, profile: Dict[str, Any]) -> int:
+        """Move a profile's legacy ``devices`` list to ``DEVICE#`` items.
+
+        The profile keeps ``devices`` as a ``{fingerprint: registeredAt}`` map so
+        :meth:`delete_profile` can clean the items up. Returns the number of
+        devices moved (0 when the profile already has the map).
+        """
+        devices = profile.get("devices")
+        if isinstance(devices, dict):
+            return 0
+        user_id = profile["userId"]
+        now = datetime.utcnow().isoformat()
+        registered: Dict[str, str] = {}
+        try:
+            with self._table.batch_writer() as batch:
+                for device in devices or []:
+                    fingerprint = device.get("fingerprint")
+                    if not fingerprint:
+                        continue
+                    registered[fingerprint] = device.get("registeredAt") or now
+                    batch.put_item(Item={
+                        **self.device_index_key(fingerprint),
+                        "userId": user_id,
+                        "email": profile.get("email") or "",
+                        "registeredAt": registered[fingerprint],
+                        "lastAccessAt": device.get("lastAccessAt") or registered[fingerprint],
+                    })
+            self._table.update_item(
+                Key={"PK": f"USER#{user_id}", "SK": "PROFILE"},
+                UpdateExpression="SET devices = :devices",
+                ConditionExpression="attribute_exists(PK)",
+                ExpressionAttributeValues={":devices": registered},
+            )
+        except ClientError as error:
+            raise RuntimeError(f"Failed to convert devices for {user_id}: {error}") from error
+        return len(registered)
+
+    def remove_device(self, user_id: str, fingerprint: str) -> bool:
+        """Unregister a device of ``user_id`` in one transaction; False if it was not theirs."""
+        try:
+            self._table.meta.client.transact_write_items(TransactItems=[
+                {"Delete": {
+                    "TableName": self.table_name,
+                    "Key": self.device_index_key(fingerprint),
+                    "ConditionExpression": "userId = :uid",
+                    "ExpressionAttributeValues": {":uid": user_id},
+                }},
+                {"Update": {
+                    "TableName": self.table_name,
+                    "Key": {"PK": f"USER#{user_id}", "SK": "PROFILE"},
+                    "UpdateExpression": "REMOVE devices.#fp",
+                    "ConditionExpression": "attribute_type(devices, :map)",
+                    "ExpressionAttributeNames": {"#fp": fingerprint},
+                    "ExpressionAttributeValues": {":map": "M"},
+                }},
+            ])
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") == "TransactionCanceledException":
+                return False
+            raise RuntimeError(f"Failed to remove device for {user_id}: {error}") from error
+        return True
 
     def list_users(self) -> List[str]:
         """Get list of all user IDs (legacy method for compatibility)"""
         profiles = self.get_all_user_profiles()
         return [profile.get("userId") for profile in profiles if profile.get("userId")]
     
-    def get_all_user_profiles(self) -> List[Dict[str, Any]]:
-        """Get all user profiles from DynamoDB with USER# PK"""
+    def get_all_user_profiles(self, attributes: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get all user profiles from DynamoDB with USER# PK
+
+        ``attributes`` limits the returned attributes (ProjectionExpression).
+        Large tables are read with parallel scan segments.
+        """
         import logging
         logger = logging.getLogger()
         
         try:
             # Scan for all items with PK starting with "USER#" and SK="PROFILE"
-            response = self._table.scan(
-                FilterExpression="begins_with(PK, :pk) AND SK = :sk",
-                ExpressionAttributeValues={
+            scan_kwargs: Dict[str, Any] = {
+                "FilterExpression": "begins_with(PK, :pk) AND SK = :sk",
+                "ExpressionAttributeValues": {
                     ":pk": "USER#",
                     ":sk": "PROFILE"
-                }
-            )
-            
-            profiles = response.get("Items", [])
-            
-            # Handle pagination if necessary
-            while 'LastEvaluatedKey' in response:
-                response = self._table.scan(
-                    FilterExpression="begins_with(PK, :pk) AND SK = :sk",
-                    ExpressionAttributeValues={
-                        ":pk": "USER#",
-                        ":sk": "PROFILE"
-                    },
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                profiles.extend(response.get("Items", []))
-                
+                },
+            }
+            scan_kwargs.update(self._projection(attributes))
+            # The counter is one GetItem; Table.item_count would add a DescribeTable
+            # call and lags by up to six hours.
+            profiles = self._scan(scan_kwargs, (self.get_user_count() or 0) * TABLE_ITEMS_PER_USER)
             logger.info(f"Found {len(profiles)} user profiles in DynamoDB")
             return profiles
             
         except ClientError as error:
             logger.error(f"Failed to scan user profiles: {error}")
             raise RuntimeError(f"Failed to scan user profiles: {error}") from error
+
+    def get_active_user_profiles(self, site: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Auto-reservation enabled profiles with the attributes the worker needs.
+
+        With ``ACTIVE_USERS_INDEX`` set they come from that sparse GSI (only
+        enabled profiles carry its ``activeSite`` key), so the cost follows the
+        number of active users; ``site`` (``<bizplcCd>#<timezone>``) narrows it
+        to one partition. Without the index, or until backfill_indexes.py has
+        marked it complete, the table is scanned and filtered.
+        """
+        index_name = os.environ.get("ACTIVE_USERS_INDEX")
+        if index_name and not self.active_users_indexed():
+            import logging
+            logging.getLogger().warning("%s is not backfilled yet (run backfill_indexes.py); scanning profiles", index_name)
+            index_name = None
+        if not index_name:
+            profiles = self.get_all_user_profiles(attributes=WORKER_PROFILE_ATTRIBUTES)
+            return [profile for profile in profiles if self.is_auto_reservation_enabled(profile)]
+        try:
+            if site:
+                query_kwargs: Dict[str, Any] = {
+                    "IndexName": index_name,
+                    "KeyConditionExpression": Key("activeSite").eq(site),
+                }
+                profiles = []
+                while True:
+                    response = self._table.query(**query_kwargs)
+                    profiles.extend(response.get("Items", []))
+                    if "LastEvaluatedKey" not in response:
+                        return profiles
+                    query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            return self._scan({"IndexName": index_name}, self.get_user_count() or 0)
+        except ClientError as error:
+            raise RuntimeError(f"Failed to read active user profiles: {error}") from error
+
+    def active_users_indexed(self) -> bool:
+        """Whether every stored profile carries its ``activeSite`` key."""
+        try:
+            return "Item" in self._table.get_item(Key=ACTIVE_USERS_INDEXED_KEY)
+        except ClientError as error:
+            raise RuntimeError(f"Failed to read index state: {error}") from error
+
+    def mark_active_users_indexed(self) -> None:
+        try:
+            self._table.put_item(Item={**ACTIVE_USERS_INDEXED_KEY, "backfilledAt": datetime.utcnow().isoformat()})
+        except ClientError as error:
+            raise RuntimeError(f"Failed to store index state: {error}") from error
+
+    def active_site_of(self, item: Dict[str, Any]) -> Optional[str]:
+        """``activeSite`` key of a profile (``<bizplcCd>#<timezone>``), None when disabled."""
+        if not self.is_auto_reservation_enabled(item):
+            return None
+        site = self._build_payload(item).get("bizplcCd")
+        timezone = item.get("timezone") or os.environ.get("DEFAULT_TIMEZONE", "Asia/Seoul")
+        return f"{site}#{timezone}"
+
+    def sync_active_site(self, item: Dict[str, Any]) -> bool:
+        """Align a stored profile's ``activeSite`` with its toggle; True if it changed."""
+        site = self.active_site_of(item)
+        if item.get("activeSite") == site:
+            return False
+        key = {"PK": item["PK"], "SK": item["SK"]}
+        try:
+            if site:
+                self._table.update_item(
+                    Key=key,
+                    UpdateExpression="SET activeSite = :site",
+                    ConditionExpression="attribute_exists(PK)",
+                    ExpressionAttributeValues={":site": site},
+                )
+            else:
+                self._table.update_item(
+                    Key=key, UpdateExpression="REMOVE activeSite", ConditionExpression="attribute_exists(PK)"
+                )
+        except ClientError as error:
+            raise RuntimeError(f"Failed to index profile {item.get('userId')}: {error}") from error
+        return True
+
+    @staticmethod
+    def _projection(attributes: Optional[Sequence[str]]) -> Dict[str, Any]:
+        if not attributes:
+            return {}
+        names = {f"#p{index}": name for index, name in enumerate(attributes)}
+        return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+    def _scan(self, scan_kwargs: Dict[str, Any], estimated_items: int) -> List[Dict[str, Any]]:
+        """Run a paginated scan, split into parallel segments for large inputs."""
+        segments = min(MAX_SCAN_SEGMENTS, int(estimated_items) // SCAN_SEGMENT_ITEMS + 1)
+
+        def scan_segment(segment: int) -> List[Dict[str, Any]]:
+            kwargs = dict(scan_kwargs)
+            if segments > 1:
+                kwargs.update(Segment=segment, TotalSegments=segments)
+            items: List[Dict[str, Any]] = []
+            while True:
+                response = self._table.scan(**kwargs)
+                items.extend(response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    return items
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        if segments == 1:
+            return scan_segment(0)
+        with ThreadPoolExecutor(max_workers=segments) as pool:
+            return [item for items in pool.map(scan_segment, range(segments)) for item in items]
     
     def save_exclusion_dates(self, user_id: str, dates: List[str]) -> None:
         """Save user exclusion dates with auto-cleanup of old dates (> 1 month ago)"""
@@ -264,6 +778,88 @@ class ConfigStore:
         dates = item.get("dates", [])
         return set(dates)
 
+    def save_holidays_batch(self, holidays_by_month: Dict[str, Set[str]]) -> None:
+        """Store several months (``YYYYMM`` -> dates) with one batch write."""
+        try:
+            with self._table.batch_writer() as batch:
+                for month_key, dates in holidays_by_month.items():
+                    batch.put_item(Item={
+                        "PK": "HOLIDAY",
+                        "SK": month_key,
+                        "dates": list(dates) if dates else [],
+                    })
+        except ClientError as error:
+            raise RuntimeError(f"Failed to save holidays: {error}") from error
+
+    def get_all_holidays(self) -> Dict[str, Set[str]]:
+        """Every stored month (``YYYYMM`` -> dates) from a single Query on ``PK=HOLIDAY``."""
+        holidays: Dict[str, Set[str]] = {}
+        kwargs: Dict[str, Any] = {"KeyConditionExpression": Key("PK").eq("HOLIDAY")}
+        try:
+            while True:
+                response = self._table.query(**kwargs)
+                for item in response.get("Items", []):
+                    holidays[item["SK"]] = set(item.get("dates", []))
+                if "LastEvaluatedKey" not in response:
+                    return holidays
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except ClientError as error:
+            raise RuntimeError(f"Failed to load holidays: {error}") from error
+
+    @traced("saveFloorDescriptor")
+    def save_floor_descriptor(self, user_id: str, descriptor: Dict[str, Any]) -> str:
+        """Store the resolved floor descriptor on the profile; returns the resolvedAt timestamp."""
+        key = {
+            "PK": f"USER#{user_id}",
+            "SK": "PROFILE",
+        }
+        resolved_at = datetime.utcnow().isoformat()
+        try:
+            self._table.update_item(
+                Key=key,
+                UpdateExpression="SET floorDescriptor = :descriptor, floorDescriptorResolvedAt = :resolvedAt",
+                ConditionExpression="attribute_exists(PK)",
+                ExpressionAttributeValues={
+                    # boto3 rejects floats; DynamoDB numbers go in as Decimal.
+                    ":descriptor": {
+                        field: Decimal(str(value)) if isinstance(value, float) else value
+                        for field, value in descriptor.items()
+                    },
+                    ":resolvedAt": resolved_at,
+                },
+            )
+        except ClientError as error:
+            raise RuntimeError(f"Failed to save floor descriptor for {user_id}: {error}") from error
+        return resolved_at
+
+    def get_session(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Stored hcafe session item (``USER#<id>/SESSION``), if any."""
+        try:
+            result = self._table.get_item(Key={"PK": f"USER#{user_id}", "SK": "SESSION"})
+        except ClientError as error:
+            raise RuntimeError(f"Failed to load session for {user_id}: {error}") from error
+        return result.get("Item")
+
+    def save_session(self, user_id: str, cookies_encrypted: str, expires_at: int) -> None:
+        item = {
+            "PK": f"USER#{user_id}",
+            "SK": "SESSION",
+            "userId": user_id,
+            "cookies_encrypted": cookies_encrypted,
+            "expiresAt": expires_at,  # epoch seconds
+            "savedAt": datetime.utcnow().isoformat(),
+        }
+        try:
+            self._table.put_item(Item=item)
+        except ClientError as error:
+            raise RuntimeError(f"Failed to save session for {user_id}: {error}") from error
+
+    def delete_session(self, user_id: str) -> None:
+        try:
+            self._table.delete_item(Key={"PK": f"USER#{user_id}", "SK": "SESSION"})
+        except ClientError as error:
+            raise RuntimeError(f"Failed to delete session for {user_id}: {error}") from error
+
     def update_auto_reservation_status(self, user_id: str, enabled: bool) -> None:
         """Update the auto-reservation enabled status for a user"""
         import logging
@@ -274,11 +870,21 @@ class ConfigStore:
         }
         try:
             logger.info("Updating auto-reservation status for user %s to %s", user_id, enabled)
-            self._table.update_item(
-                Key=key,
-                UpdateExpression="SET autoReservationEnabled = :enabled",
-                ExpressionAttributeValues={":enabled": enabled}
-            )
+            profile = self._fetch_profile_item(user_id) or {}
+            site = self.active_site_of({**profile, "autoReservationEnabled": enabled})
+            # activeSite is the ActiveUsersIndex key: present only while enabled
+            if site:
+                self._table.update_item(
+                    Key=key,
+                    UpdateExpression="SET autoReservationEnabled = :enabled, activeSite = :site",
+                    ExpressionAttributeValues={":enabled": enabled, ":site": site}
+                )
+            else:
+                self._table.update_item(
+                    Key=key,
+                    UpdateExpression="SET autoReservationEnabled = :enabled REMOVE activeSite",
+                    ExpressionAttributeValues={":enabled": enabled}
+                )
             logger.info("Successfully updated auto-reservation status for user %s", user_id)
         except ClientError as error:
             logger.error("Failed to update auto-reservation status for %s: %s", user_id, error)
@@ -294,12 +900,33 @@ class ConfigStore:
         }
         try:
             logger.info("Deleting profile for user: %s", user_id)
-            self._table.delete_item(Key=key)
+            deleted = self._fetch_profile_item(user_id) or {}
+            if deleted:
+                self._delete_counted_profile(key)
+            self._table.delete_item(Key={"PK": f"USER#{user_id}", "SK": "SESSION"})
+            if deleted.get("email"):
+                self._delete_email_index(deleted["email"], user_id)
+            devices = deleted.get("devices") or {}
+            for fingerprint in devices if isinstance(devices, dict) else ():
+                self._delete_pointer(self.device_index_key(fingerprint), user_id)
             logger.info("Successfully deleted profile for user: %s", user_id)
         except ClientError as error:
             logger.error("Failed to delete profile for %s: %s", user_id, error)
             raise RuntimeError(f"Failed to delete profile for {user_id}: {error}") from error
 
+    def _delete_counted_profile(self, key: Dict[str, str]) -> None:
+        """Delete a profile and decrement the user counter in one transaction."""
+        try:
+            self._table.meta.client.transact_write_items(TransactItems=[
+                {"Delete": {"TableName": self.table_name, "Key": key, "ConditionExpression": "attribute_exists(PK)"}},
+                {"Update": self._user_count_update(-1)},
+            ])
+        except ClientError as error:
+            if not self._cancelled_by(error, 1):
+                raise
+            # Counter missing or already zero; the reconciliation job corrects it
+            self._table.delete_item(Key=key)
+
     def update_user_settings(self, user_id: str, menu_sequence: list = None, floor_name: str = None, 
                             hg_user_id: str = None, hg_user_pw: str = None) -> None:
         """Update user settings (menu sequence, floor, and optionally HGreen credentials)"""
@@ -338,6 +965,9 @@ class ConfigStore:
             return
         
         update_expression = "SET " + ", ".join(update_parts)
+        if floor_name is not None:
+            # The stored descriptor belongs to the old floor; the next worker run resolves the new one.
+            update_expression += " REMOVE floorDescriptor, floorDescriptorResolvedAt"
         
         try:
             logger.info("Updating settings for user %s: %s", user_id, update_expression)
@@ -1,37 +1,74 @@
-"""KMS based crypto helpers."""
+"""KMS based crypto helpers.
+
+New values use envelope encryption: one KMS ``GenerateDataKey`` per key epoch,
+AES-GCM locally for every field, and a bounded TTL cache of unwrapped data keys,
+so decrypting many profiles costs a handful of KMS calls. Values written before
+(plain KMS ciphertext blobs) are still decrypted directly with KMS.
+"""
 
 import base64
 import os
 import logging
+import struct
+import threading
+import time
 from typing import Optional, Tuple
 
-import boto3
 from botocore.exceptions import ClientError
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from . import aws_clients
+from .ttl_cache import TtlCache
 
 LOGGER = logging.getLogger()
 
+ENVELOPE_PREFIX = "env1:"
+_NONCE_SIZE = 12
+
+# Unwrapped data keys by wrapped (KMS ciphertext) key.
+_DATA_KEY_CACHE = TtlCache(
+    maxsize=int(os.environ.get("KMS_DATA_KEY_CACHE_SIZE", "32")),
+    ttl=float(os.environ.get("KMS_DATA_KEY_CACHE_TTL", "3600")),
+)
+# (plaintext key, wrapped key, created at) used for encryption in the current epoch.
+_current_data_key: Optional[Tuple[bytes, bytes, float]] = None
+_DATA_KEY_LOCK = threading.Lock()
+_UNWRAP_LOCK = threading.Lock()
+
+
 def _get_kms_client():
-    return boto3.client('kms')
+    """Process-wide KMS client (boto3 clients are thread safe)."""
+    return aws_clients.client('kms')
 
 def _get_key_id():
     return os.environ.get("KMS_KEY_ID", "alias/hgreenfood-key")
 
+def _envelope_enabled() -> bool:
+    return os.environ.get("KMS_ENVELOPE_ENCRYPTION", "true").lower() in ("true", "1", "yes")
+
+def _key_epoch_seconds() -> float:
+    return float(os.environ.get("KMS_DATA_KEY_EPOCH_SECONDS", "3600"))
+
 def decrypt(encrypted_value: str, _password: Optional[str] = None, _salt_b64: Optional[str] = None) -> str:
     """
-    Decrypts a value using AWS KMS.
-    The password and salt arguments are kept for backward compatibility with the signature 
+    Decrypts a value produced by :func:`encrypt`.
+    Envelope values (``env1:`` prefix) are decrypted locally with a cached data key,
+    anything else is treated as a legacy KMS ciphertext blob.
+    The password and salt arguments are kept for backward compatibility with the signature
     but are ignored as KMS handles key management.
     """
     try:
-        # If the value is not base64 encoded, it might be legacy or plain text (shouldn't happen if flow is strict)
-        # But we assume input is the base64 encoded ciphertext blob
+        if encrypted_value.startswith(ENVELOPE_PREFIX):
+            return _envelope_decrypt(encrypted_value[len(ENVELOPE_PREFIX):])
+
+        # Legacy: the value is the base64 encoded KMS ciphertext blob
         ciphertext_blob = base64.b64decode(encrypted_value)
-        
+
         kms = _get_kms_client()
         response = kms.decrypt(
             CiphertextBlob=ciphertext_blob
         )
-        
+
         return response['Plaintext'].decode('utf-8')
     except Exception as e:
         LOGGER.error(f"KMS decryption failed: {e}")
@@ -39,24 +76,72 @@ def decrypt(encrypted_value: str, _password: Optional[str] = None, _salt_b64: Op
 
 def encrypt(value: str, _password: Optional[str] = None, _salt_b64: Optional[str] = None) -> Tuple[str, str]:
     """
-    Encrypts a value using AWS KMS.
+    Encrypts a value with envelope encryption (or directly with KMS when
+    ``KMS_ENVELOPE_ENCRYPTION`` is disabled).
     Returns (encrypted_value_b64, dummy_salt).
     The password and salt arguments are kept for backward compatibility but ignored.
     """
     try:
+        if _envelope_enabled():
+            return ENVELOPE_PREFIX + _envelope_encrypt(value), "kms_managed"
+
         kms = _get_kms_client()
         key_id = _get_key_id()
-        
+
         response = kms.encrypt(
             KeyId=key_id,
             Plaintext=value.encode('utf-8')
         )
-        
+
         ciphertext_blob = response['CiphertextBlob']
         encrypted_b64 = base64.b64encode(ciphertext_blob).decode('utf-8')
-        
+
         # Return dummy salt to maintain tuple signature expected by callers for now
         return encrypted_b64, "kms_managed"
     except Exception as e:
         LOGGER.error(f"KMS encryption failed: {e}")
         raise
+
+
+# Envelope format: base64( u16 len(wrapped key) | wrapped key | 12 byte nonce | AES-GCM ciphertext+tag )
+
+def _envelope_encrypt(value: str) -> str:
+    data_key, wrapped_key = _epoch_data_key()
+    nonce = os.urandom(_NONCE_SIZE)
+    ciphertext = AESGCM(data_key).encrypt(nonce, value.encode('utf-8'), None)
+    blob = struct.pack(">H", len(wrapped_key)) + wrapped_key + nonce + ciphertext
+    return base64.b64encode(blob).decode('utf-8')
+
+def _envelope_decrypt(encoded: str) -> str:
+    blob = base64.b64decode(encoded)
+    (key_len,) = struct.unpack(">H", blob[:2])
+    wrapped_key = blob[2:2 + key_len]
+    nonce = blob[2 + key_len:2 + key_len + _NONCE_SIZE]
+    ciphertext = blob[2 + key_len + _NONCE_SIZE:]
+    data_key = _unwrap_data_key(wrapped_key)
+    return AESGCM(data_key).decrypt(nonce, ciphertext, None).decode('utf-8')
+
+def _epoch_data_key() -> Tuple[bytes, bytes]:
+    global _current_data_key
+    with _DATA_KEY_LOCK:
+        now = time.monotonic()
+        if _current_data_key is None or now - _current_data_key[2] >= _key_epoch_seconds():
+            response = _get_kms_client().generate_data_key(KeyId=_get_key_id(), KeySpec="AES_256")
+            _current_data_key = (response['Plaintext'], response['CiphertextBlob'], now)
+            _DATA_KEY_CACHE.set(response['CiphertextBlob'], response['Plaintext'])
+        return _current_data_key[0], _current_data_key[1]
+
+def _unwrap_data_key(wrapped_key: bytes) -> bytes:
+    data_key = _DATA_KEY_CACHE.get(wrapped_key)
+    if data_key is not None:
+        return data_key
+    # Serialise misses so concurrent workers unwrap a shared key only once.
+    with _UNWRAP_LOCK:
+        data_key = _DATA_KEY_CACHE.get(wrapped_key)
+        if data_key is None:
+            try:
+                data_key = _get_kms_client().decrypt(CiphertextBlob=wrapped_key)['Plaintext']
+            except ClientError as error:
+                raise RuntimeError(f"Failed to unwrap data key: {error}") from error
+            _DATA_KEY_CACHE.set(wrapped_key, data_key)
+    return data_key
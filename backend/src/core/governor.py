@@ -0,0 +1,254 @@
+"""Outbound governor for hcafe: per-class token buckets and a circuit breaker.
+
+Every request of ReservationClient/AsyncReservationClient goes through the
+process-wide ``GOVERNOR``. Requests are rate limited per endpoint class
+(login / read / order) so a concurrent worker cannot flood the site, and one
+circuit breaker fails calls fast while hcafe keeps answering 5xx or timing out.
+Limits are per Lambda container (there is no cross-container coordination).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import requests
+
+LOGGER = logging.getLogger()
+
+T = TypeVar("T")
+
+LOGIN = "login"
+READ = "read"
+ORDER = "order"
+
+ORDER_ENDPOINTS = frozenset({"insertReservationOrder.do", "updateMenuReservationCancel.do"})
+
+# (requests per second, burst) per endpoint class
+DEFAULT_RATES = {
+    LOGIN: (5.0, 10),
+    READ: (20.0, 40),
+    ORDER: (20.0, 40),
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """hcafe is considered down; raised instead of sending the request.
+
+    Subclasses ConnectionError so callers treat it like an unreachable host
+    (the retry policy backs off and tries again once the breaker half-opens).
+    """
+
+    request_sent = False  # never ambiguous, see retry.may_have_reached_server
+
+
+def endpoint_class(endpoint: str) -> str:
+    if endpoint == "login.do":
+        return LOGIN
+    if endpoint in ORDER_ENDPOINTS:
+        return ORDER
+    return READ
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers queue by taking tokens on credit."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller has to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "acquired": self.acquired,
+                "avgQueueMs": round(self.total_wait / self.acquired * 1000, 1) if self.acquired else 0.0,
+                "maxQueueMs": round(self.max_wait * 1000, 1),
+            }
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; after ``reset_timeout``
+    lets ``half_open_probes`` requests through and closes again on success."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Raise CircuitOpenError unless a request may be sent now.
+
+        Returns True when the request takes a half-open probe slot; its outcome
+        must then be recorded, or the slot given back with :meth:`release_probe`.
+        """
+        with self._lock:
+            if self.state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probes = 0
+                LOGGER.info("hcafe circuit half-open, probing")
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.rejected += 1
+        raise CircuitOpenError("hcafe circuit is open after repeated failures")
+
+    def release_probe(self) -> None:
+        """Give back a probe slot whose request ended without telling anything about hcafe."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                LOGGER.info("hcafe circuit closed")
+            self.state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                if self.state == CLOSED:
+                    LOGGER.warning("hcafe circuit opened after %d consecutive failures", self._failures)
+                self.state = OPEN
+                self._opened_at = self._clock()
+                self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutiveFailures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class Governor:
+    def __init__(self, rates: Optional[Dict[str, tuple]] = None, breaker: Optional[CircuitBreaker] = None) -> None:
+        rates = {**DEFAULT_RATES, **(rates or {})}
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in rates.items()}
+        self.breaker = breaker or CircuitBreaker()
+
+    @classmethod
+    def from_env(cls) -> "Governor":
+        rates = {}
+        for name, (rate, burst) in DEFAULT_RATES.items():
+            prefix = f"HCAFE_RATE_{name.upper()}"
+            rates[name] = (
+                float(os.environ.get(prefix, rate)),
+                int(os.environ.get(f"{prefix}_BURST", burst)),
+            )
+        breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get("HCAFE_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.environ.get("HCAFE_BREAKER_RESET_SECONDS", "10")),
+        )
+        return cls(rates, breaker)
+
+    def call(self, endpoint: str, send: Callable[[], T], status_of: Callable[[T], int]) -> T:
+        """Send one request through the breaker and the endpoint class' bucket.
+
+        Every request that passed the breaker records an outcome: any exception
+        (timeout, broken response, unreadable body, ...) counts as a failure,
+        while a cancellation only gives back a half-open probe slot. Otherwise a
+        lost probe would keep the process-wide breaker half-open for good.
+        """
+        probe = self.breaker.allow()
+        try:
+            wait = self.buckets[endpoint_class(endpoint)].reserve()
+            if wait > 0:
+                time.sleep(wait)
+            response = send()
+            status = status_of(response)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            if probe:
+                self.breaker.release_probe()
+            raise
+        self._record_status(status)
+        return response
+
+    async def call_async(self, endpoint: str, send: Callable[[], Awaitable[T]], status_of: Callable[[T], int]) -> T:
+        probe = self.breaker.allow()
+        try:
+            wait = self.buckets[endpoint_class(endpoint)].reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await send()
+            status = status_of(response)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, e.g. the losing copy of a hedged read or a timed-out run.
+            if probe:
+                self.breaker.release_probe()
+            raise
+        self._record_status(status)
+        return response
+
+    def _record_status(self, status: int) -> None:
+        if status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            **{name: bucket.stats() for name, bucket in self.buckets.items()},
+        }
+
+
+GOVERNOR = Governor.from_env()
+
+
+def governor_stats() -> Dict[str, Any]:
+    return GOVERNOR.stats()
@@ -0,0 +1,148 @@
+"""Hedged requests for idempotent hcafe reads.
+
+When a read has not answered within the endpoint's recent p90 latency, the same
+request is sent once more and whichever response arrives first is used. Only
+endpoints listed in ``HEDGEABLE_ENDPOINTS`` are ever hedged; orders, cancels
+and logins are not idempotent and always go out exactly once.
+
+Only AsyncReservationClient hedges: the slower aiohttp request is cancelled,
+whereas a requests.Session is not safe to share between threads and a
+blocking request cannot be cancelled (it would keep a thread busy until its
+timeout).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+LOGGER = logging.getLogger()
+
+T = TypeVar("T")
+
+HEDGEABLE_ENDPOINTS = frozenset({
+    "selectReserveMenuList.do",
+    "selectDeliveryInfoTypeList.do",
+    "selectMenuReservationList.do",
+})
+
+DEFAULT_HEDGE_DELAY_MS = 1000  # used until enough samples exist
+MIN_HEDGE_DELAY_MS = 50
+MIN_SAMPLES = 20
+WINDOW_SIZE = 200
+
+
+def hedging_enabled() -> bool:
+    return os.environ.get("HCAFE_HEDGING", "false").lower() in ("true", "1", "yes")
+
+
+class LatencyTracker:
+    """Rolling per-endpoint latency samples with a p90 estimate."""
+
+    def __init__(self, window: int = WINDOW_SIZE, min_samples: int = MIN_SAMPLES) -> None:
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def p90(self, endpoint: str) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < self._min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(0.9 * len(samples)) - 1)]
+
+
+class Hedger:
+    """Sends a second copy of a slow read and keeps the first answer.
+
+    Counters per endpoint: ``requests``, ``hedged`` (second copy sent), ``won``
+    (the copy answered first) and ``lost`` (the original still answered first).
+    """
+
+    def __init__(self, tracker: Optional[LatencyTracker] = None) -> None:
+        self.tracker = tracker or LatencyTracker()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def threshold(self, endpoint: str) -> float:
+        p90 = self.tracker.p90(endpoint)
+        if p90 is None:
+            p90 = float(os.environ.get("HCAFE_HEDGE_DELAY_MS", DEFAULT_HEDGE_DELAY_MS)) / 1000
+        return max(p90, MIN_HEDGE_DELAY_MS / 1000)
+
+    async def call_async(self, endpoint: str, send: Callable[[], Awaitable[T]]) -> T:
+        """Await ``send`` (idempotent), hedging it after the p90 threshold; the slower copy is cancelled."""
+        if endpoint not in HEDGEABLE_ENDPOINTS:
+            return await send()
+        self._count(endpoint, "requests")
+        primary = asyncio.ensure_future(self._timed_async(endpoint, send))
+        done, _ = await asyncio.wait({primary}, timeout=self.threshold(endpoint))
+        if done:
+            return primary.result()
+
+        self._count(endpoint, "hedged")
+        LOGGER.info("Hedging %s after %.0f ms", endpoint, self.threshold(endpoint) * 1000)
+        hedge = asyncio.ensure_future(self._timed_async(endpoint, send))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._count(endpoint, "won" if task is hedge else "lost")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            counters = {endpoint: dict(values) for endpoint, values in self._counters.items()}
+        for endpoint, values in counters.items():
+            requests = values.get("requests", 0)
+            values["hedgeRate"] = values.get("hedged", 0) / requests if requests else 0.0
+            p90 = self.tracker.p90(endpoint)
+            values["p90Ms"] = round(p90 * 1000, 1) if p90 is not None else None
+        return counters
+
+    async def _timed_async(self, endpoint: str, send: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        try:
+            result = await send()
+        except asyncio.CancelledError:
+            raise  # a cancelled loser says nothing about latency
+        except BaseException:
+            self.tracker.record(endpoint, time.monotonic() - started)
+            raise
+        self.tracker.record(endpoint, time.monotonic() - started)
+        return result
+
+    def _count(self, endpoint: str, name: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(endpoint, {"requests": 0, "hedged": 0, "won": 0, "lost": 0})
+            counters[name] += 1
+
+
+# Process-wide so warm containers keep their latency history across runs.
+HEDGER = Hedger()
+
+
+def hedging_stats() -> Dict[str, Dict[str, Any]]:
+    return HEDGER.stats()
@@ -2,12 +2,39 @@
 
 from __future__ import annotations
 
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from typing import Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import requests
 import xml.etree.ElementTree as ET
 
+from .tracing import traced
+from .ttl_cache import TtlCache
+
+LOGGER = logging.getLogger()
+
+# A year has ~15-20 holiday rows (including substitute holidays); one page fits all.
+YEAR_PAGE_SIZE = 100
+
+# Months (``YYYYMM`` -> dates) shared by every HolidayService of the container,
+# so handlers that build a new service per request still hit memory. Not size
+# bounded: hydrate() loads every stored month, and evicting some of them would
+# mean re-Querying (or wrongly assuming no holidays) on every lookup.
+HOLIDAY_CACHE = TtlCache(
+    maxsize=None,
+    ttl=float(os.environ.get("HOLIDAY_CACHE_TTL_SECONDS", "21600")),
+    negative_ttl=float(os.environ.get("HOLIDAY_CACHE_NEGATIVE_TTL_SECONDS", "60")),
+)
+# Present while the cache reflects a recent DynamoDB Query (expires with negative_ttl).
+_HYDRATED = "hydrated"
+
+
+def holiday_cache_stats() -> Dict[str, Any]:
+    return HOLIDAY_CACHE.stats()
+
 
 class HolidayService:
     def __init__(
@@ -16,55 +43,154 @@ class HolidayService:
         session: Optional[requests.Session] = None,
         timeout: int = 10,
         config_store: Optional[Any] = None,  # Avoid circular import type hint if possible, or use Any
+        fetch_missing: bool = True,
+        cache: Optional[TtlCache] = None,
     ) -> None:
         self.endpoint = endpoint
         self.session = session or requests.Session()
         self.timeout = timeout
         self.config_store = config_store
-        self._cache: Dict[str, Set[str]] = {}
+        # False on the reservation path: a month missing from DynamoDB is treated
+        # as having no holidays instead of calling data.go.kr.
+        self.fetch_missing = fetch_missing
+        self._cache = HOLIDAY_CACHE if cache is None else cache
 
+    @property
+    def cache_ttl(self) -> float:
+        """Seconds a cached month stays fresh (also used by BusinessCalendar)."""
+        return self._cache.ttl
+
+    @traced("holidayCheck")
     def is_holiday(self, target: date, api_key: Optional[str]) -> bool:
         if not api_key:
             return False
-        
-        # 1. Check local memory cache
-        key = target.strftime("%Y%m")
-        if key in self._cache:
-            return target.strftime("%Y%m%d") in self._cache[key]
+        return target.strftime("%Y%m%d") in self.holidays_for_month(target.year, target.month, api_key)
 
-        # 2. Check DynamoDB (ConfigStore)
-        if self.config_store:
-            stored_holidays = self.config_store.get_holidays(target.year, target.month)
-            if stored_holidays is not None:
-                self._cache[key] = stored_holidays
-                return target.strftime("%Y%m%d") in stored_holidays
-
-        # 3. Fetch from API
-        month_cache = self._fetch_month(target.year, target.month, api_key)
-        self._cache[key] = month_cache
-        
-        # 4. Save to DynamoDB
+    def holidays_for_month(self, year: int, month: int, api_key: str) -> Set[str]:
+        """The month's holidays (``YYYYMMDD``) from memory, DynamoDB or the API.
+
+        Raises CachedFailure (a RuntimeError) while a recent API failure for the
+        month is cached.
+        """
+        holidays = self._lookup(year, month, api_key)
+        if holidays is None:
+            LOGGER.warning("Holidays for %d%02d are not stored; assuming none", year, month)
+            return set()
+        return holidays
+
+    def known_holidays_for_month(self, year: int, month: int, api_key: str) -> Optional[Set[str]]:
+        """:meth:`holidays_for_month`, but None when the month's holidays are not
+        known (not stored while ``fetch_missing`` is off, or the API failed)."""
+        try:
+            return self._lookup(year, month, api_key)
+        except (requests.RequestException, RuntimeError) as error:
+            LOGGER.warning("Holidays for %d%02d unavailable: %s", year, month, error)
+            return None
+
+    def _lookup(self, year: int, month: int, api_key: str) -> Optional[Set[str]]:
+        # 1. Check the shared memory cache (hydrated from DynamoDB with one Query)
+        key = f"{year}{month:02d}"
+        holidays = self._cache.get(key)
+        if holidays is None and _HYDRATED not in self._cache:
+            self.hydrate(force=True)
+            holidays = self._cache.get(key)
+        if holidays is not None:
+            return holidays
+
+        if not self.fetch_missing:
+            return None
+
+        # 2. Fetch the whole year from the API and store it
+        try:
+            months = self.fetch_year(year, api_key)
+        except (requests.RequestException, RuntimeError) as error:
+            # Briefly remembered so a flaky data.go.kr is not called on every check
+            for month_key in self._month_keys(year):
+                self._cache.set_failure(month_key, error)
+            raise
+        self._remember(months)
         if self.config_store:
             try:
-                self.config_store.save_holidays(target.year, target.month, month_cache)
-            except Exception:
-                # Log error but don't fail the check
-                pass
-                
-        return target.strftime("%Y%m%d") in month_cache
+                self.config_store.save_holidays_batch(months)
+            except RuntimeError as error:
+                LOGGER.warning("Failed to store holidays for %s: %s", year, error)
+        return months[key]
+
+    def hydrate(self, force: bool = False) -> None:
+        """Load every stored month into memory (a single DynamoDB Query)."""
+        if (not force and _HYDRATED in self._cache) or not self.config_store:
+            return
+        try:
+            stored = self.config_store.get_all_holidays()
+        except RuntimeError as error:
+            LOGGER.warning("Could not load stored holidays: %s", error)
+            return
+        self._remember(stored)
+        self._cache.set(_HYDRATED, True, ttl=self._cache.negative_ttl)
+
+    def fetch_and_save_year(self, year: int, api_key: str) -> Dict[str, Set[str]]:
+        """Fetch all twelve months of ``year`` and store them with one batch write."""
+        months = self.fetch_year(year, api_key)
+        self._remember(months)
+        if self.config_store:
+            self.config_store.save_holidays_batch(months)
+        return months
+
+    def fetch_year(self, year: int, api_key: str) -> Dict[str, Set[str]]:
+        """``YYYYMM`` -> holidays for every month of ``year``.
+
+        One request for the whole year; falls back to twelve parallel month
+        requests if the API rejects it or does not return the full year.
+        """
+        months: Dict[str, Set[str]] = {month_key: set() for month_key in self._month_keys(year)}
+        try:
+            locdates, total = self._fetch({
+                "serviceKey": api_key,
+                "solYear": str(year),
+                "numOfRows": str(YEAR_PAGE_SIZE),
+            })
+        except (requests.HTTPError, RuntimeError) as error:
+            # API-level errors only; a connection failure would hit the months too
+            LOGGER.warning("Yearly holiday request failed (%s), fetching months", error)
+            locdates, total = None, None
+        if locdates is not None and (total is None or total <= len(locdates)):
+            for locdate in locdates:
+                if locdate[:6] in months:
+                    months[locdate[:6]].add(locdate)
+            return months
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            results = pool.map(lambda month: self._fetch_month(year, month, api_key), range(1, 13))
+            for month, holidays in zip(range(1, 13), results):
+                months[f"{year}{month:02d}"] = holidays
+        return months
 
     def fetch_and_save_holidays(self, year: int, month: int, api_key: str) -> Set[str]:
         holidays = self._fetch_month(year, month, api_key)
+        self._cache.set(f"{year}{month:02d}", holidays)
         if self.config_store:
             self.config_store.save_holidays(year, month, holidays)
         return holidays
 
+    def _remember(self, months: Dict[str, Set[str]]) -> None:
+        for month_key, holidays in months.items():
+            self._cache.set(month_key, holidays)
+
+    @staticmethod
+    def _month_keys(year: int) -> List[str]:
+        return [f"{year}{month:02d}" for month in range(1, 13)]
+
     def _fetch_month(self, year: int, month: int, api_key: str) -> Set[str]:
         params = {
             "serviceKey": api_key,
             "solYear": str(year),
             "solMonth": f"{month:02d}",
         }
+        locdates, _total = self._fetch(params)
+        return locdates
+
+    def _fetch(self, params: Dict[str, str]) -> Tuple[Set[str], Optional[int]]:
+        """Holiday dates of one API page and the API's ``totalCount``."""
         response = self.session.get(self.endpoint, params=params, timeout=self.timeout)
         response.raise_for_status()
         try:
@@ -78,4 +204,5 @@ class HolidayService:
             raise RuntimeError(f"Holiday API error {result_code}: {result_msg}")
 
         locdates = {node.text for node in root.findall(".//item/locdate") if node.text}
-        return locdates
+        total = root.findtext(".//totalCount")
+        return locdates, int(total) if total and total.isdigit() else None
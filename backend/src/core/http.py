@@ -0,0 +1,178 @@
+"""API Gateway plumbing shared by the HTTP handlers: body parsing, responses, routing."""
+
+from __future__ import annotations
+
+import base64
+import importlib
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger()
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+RESPONSE_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Allow-Methods": "*",
+}
+# json_body caches the parsed body on the event under this key.
+PARSED_BODY_KEY = "parsedBody"
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def json_body(event: Dict[str, Any]) -> Dict[str, Any]:
+    """The request's JSON object body (``{}`` when empty), decoded once per event.
+
+    Raises ValueError for a body that is not a JSON object.
+    """
+    cached = event.get(PARSED_BODY_KEY)
+    if cached is not None:
+        return cached
+    body = event.get("body")
+    if not body:
+        payload: Any = {}
+    else:
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body).decode()
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as error:
+            raise ValueError("Request body must be valid JSON") from error
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+    event[PARSED_BODY_KEY] = payload
+    return payload
+
+
+def json_response(status_code: int, body: Any) -> Dict[str, Any]:
+    return {
+        "statusCode": status_code,
+        "headers": dict(RESPONSE_HEADERS),
+        "body": json.dumps(body, ensure_ascii=False),
+    }
+
+
+class LatencyHistogram:
+    """Bucketed latencies of one route for the life of the container."""
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect_left(self.bounds, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile (max for the open bucket)."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(self.bounds[index]) if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avgMs": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50Ms": self.percentile(0.5),
+            "p90Ms": self.percentile(0.9),
+            "p99Ms": self.percentile(0.99),
+            "maxMs": round(self.max_ms, 1),
+            "buckets": dict(zip([f"le{bound}" for bound in self.bounds] + ["inf"], self.counts)),
+        }
+
+
+@dataclass(frozen=True)
+class Route:
+    """``path`` is served by ``module.handler``, imported on the route's first request."""
+
+    path: str
+    module: str
+    handler: str
+    required: Tuple[str, ...] = ()  # body fields that must be present and non-empty
+
+
+class Router:
+    """Dispatches API Gateway events by path through one pipeline.
+
+    Every request: parse the body once (400 if invalid), check the route's
+    required fields, call the handler, turn uncaught errors into 400/500
+    responses, and record the route's latency with a cold/warm marker.
+    Paths without a route go to ``fallback``.
+    """
+
+    def __init__(self, routes: Iterable[Route], fallback: Optional[Handler] = None) -> None:
+        self._routes = {route.path: route for route in routes}
+        self._fallback = fallback
+        self._handlers: Dict[str, Handler] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._cold = True
+
+    def __call__(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        return self.dispatch(event, context)
+
+    def dispatch(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        path = event.get("resource") or event.get("rawPath") or ""
+        route = self._routes.get(path)
+        with self._lock:
+            cold, self._cold = self._cold, False
+        started = time.perf_counter()
+        result = self._run(route, event, context)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        label = route.path if route else "fallback"
+        with self._lock:
+            self._histograms.setdefault(label, LatencyHistogram()).observe(elapsed_ms)
+        LOGGER.info(
+            "route=%s status=%s latencyMs=%.1f coldStart=%s",
+            label, result.get("statusCode"), elapsed_ms, cold,
+        )
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency histogram per route for this container."""
+        with self._lock:
+            return {label: histogram.stats() for label, histogram in self._histograms.items()}
+
+    def _run(self, route: Optional[Route], event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        try:
+            if route is None:
+                if self._fallback is None:
+                    return json_response(404, {"message": "Not found"})
+                return self._fallback(event, context)
+            payload = json_body(event)
+            missing = [field for field in route.required if not payload.get(field)]
+            if missing:
+                return json_response(400, {"message": f"Missing fields: {', '.join(missing)}"})
+            return self._handler(route)(event, context)
+        except ValueError as error:
+            LOGGER.warning("Client error: %s", error)
+            return json_response(400, {"message": str(error)})
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.exception("API error: %s", error)
+            return json_response(500, {"message": str(error)})
+
+    def _handler(self, route: Route) -> Handler:
+        handler = self._handlers.get(route.path)
+        if handler is None:
+            handler = getattr(importlib.import_module(route.module), route.handler)
+            self._handlers[route.path] = handler
+        return handler
@@ -18,6 +18,15 @@ class UserPreferences:
     notification_emails: List[str] = field(default_factory=list)
     auto_reservation_enabled: bool = True
     exclusion_dates: List[str] = field(default_factory=list)  # ISO format dates (YYYY-MM-DD)
+    # Ciphertexts kept when built with decrypt=False; ConfigStore.decrypt_secrets fills them in.
+    encrypted_secrets: Dict[str, str] = field(default_factory=dict)
+    # Floor fields of deliveryInfoTypeList resolved when the settings were saved.
+    floor_descriptor: Optional[Dict[str, Any]] = None
+    floor_descriptor_resolved_at: Optional[str] = None  # ISO timestamp (UTC)
+
+    @property
+    def secrets_loaded(self) -> bool:
+        return not self.encrypted_secrets
 
 
 @dataclass
@@ -29,6 +38,39 @@ class ReservationAttempt:
     target_date: date
     attempted_menus: List[str] = field(default_factory=list)
     details: Dict[str, Any] = field(default_factory=dict)
+    skipped: bool = False  # decided by eligibility checks, nothing was sent upstream
+
+
+@dataclass
+class ReservationOrder:
+    """Ready-to-send insertReservationOrder payload for one preferred corner."""
+
+    menu_initial: str
+    coner_dv_cd: str
+    payload: Dict[str, Any]
+    floor_source: str = "live"  # "stored" when built from the profile's floor descriptor
+
+
+@dataclass
+class PreparedReservation:
+    """State handed from the prepare phase to the fire phase of a reservation."""
+
+    preferences: UserPreferences
+    target_date: date
+    client: Any = None  # logged-in ReservationClient
+    orders: List[ReservationOrder] = field(default_factory=list)
+    outcome: Optional[ReservationAttempt] = None  # set once the run is decided
+    context: Any = None  # RunContext shared with the other users of the run
+    trace: Any = None  # core.tracing.Trace of this run, spans prepare and fire
+
+
+@dataclass
+class Notification:
+    """One result email, queued during a run and sent after the order phase."""
+
+    subject: str
+    body: str
+    recipients: List[str]
 
 
 @dataclass
@@ -3,15 +3,33 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Optional
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
 
 import requests
 import urllib3
 
+from .governor import GOVERNOR
 from .models import ApiCallResult, LoginResult
+from .tracing import traced
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+LOGGER = logging.getLogger()
+
+DEFAULT_BASE_URL = "https://hcafe.hgreenfood.com"
+
+# hcafe does not always answer an expired session with 401/403: it may return
+# HTTP 200 with a non-zero errorCode (see the desktop check_session) whose
+# message asks for a login, or the HTML login page instead of JSON.
+SESSION_EXPIRED_MARKERS = ("로그인", "세션")
+
+
+def default_base_url() -> str:
+    """``HCAFE_BASE_URL`` (e.g. a local hcafe_simulator.py) or the real hcafe host."""
+    return os.environ.get("HCAFE_BASE_URL") or DEFAULT_BASE_URL
+
 
 class ReservationClient:
     MENU_CORNER_MAP = {
@@ -24,32 +42,157 @@ class ReservationClient:
 
     def __init__(
         self,
-        base_url: str = "https://hcafe.hgreenfood.com",
+        base_url: Optional[str] = None,
         session: Optional[requests.Session] = None,
         timeout: int = 10,
     ) -> None:
-        self.base_url = base_url.rstrip("/")
+        self.base_url = (base_url or default_base_url()).rstrip("/")
         self.session = session or requests.Session()
         self.timeout = timeout
+        # Called when the session turns out to be expired (see _session_expired)
+        # to log in again, e.g. after reusing a stored session; returns True when
+        # the request should be retried.
+        self.reauthenticate: Optional[Callable[[], bool]] = None
 
+    @traced("login")
     def login(self, user_id: str, password: str, payload_defaults: Dict[str, str]) -> LoginResult:
         url = f"{self.base_url}/api/com/login.do"
+        payload = self._login_payload(user_id, password, payload_defaults)
+        response = GOVERNOR.call(
+            "login.do",
+            lambda: self.session.post(url, data=json.dumps(payload), headers={"Content-Type": "application/json"}, timeout=self.timeout, verify=False),
+            self._status_of,
+        )
+        return self._login_result(response.status_code, self._safe_json(response), response.text)
+
+    @traced("order")
+    def reserve_menu(self, payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str, floor_name: Optional[str] = None) -> ApiCallResult:
+        url = f"{self.base_url}/api/menu/reservation/insertReservationOrder.do"
+        payload = self._reserve_payload(payload_template, coner_dv_cd, prvd_dt, floor_name)
+        
+        # Debug logging for payload
+        LOGGER.info(f"Full Reserve Payload: {json.dumps(payload, ensure_ascii=False)}")
+        
+        response = self._post(url, payload)
+        return self._wrap_response(response)
+
+    @traced("menuList")
+    def fetch_reserve_menu_list(self, prvd_dt: str, bizplc_cd: str) -> ApiCallResult:
+        url = f"{self.base_url}/api/menu/reservation/selectReserveMenuList.do"
+        payload = self._menu_list_payload(prvd_dt, bizplc_cd)
+        response = self._post(url, payload)
+        return self._wrap_response(response)
+
+    @traced("deliveryInfo")
+    def fetch_delivery_info_type_list(self, payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str) -> ApiCallResult:
+        url = f"{self.base_url}/api/menu/reservation/selectDeliveryInfoTypeList.do"
+        payload = self._delivery_info_payload(payload_template, coner_dv_cd, prvd_dt)
+        response = self._post(url, payload)
+        return self._wrap_response(response)
+
+    def fetch_reservations(self, prvd_dt: str, bizplc_cd: str) -> ApiCallResult:
+        url = f"{self.base_url}/api/menu/reservation/selectMenuReservationList.do"
         payload = {
+            "prvdDt": prvd_dt,
+            "bizplcCd": bizplc_cd,
+        }
+        response = self._post(url, payload)
+        return self._wrap_response(response)
+
+    def cancel_reservation(self, reservation_payload: Dict[str, str]) -> ApiCallResult:
+        url = f"{self.base_url}/api/menu/reservation/updateMenuReservationCancel.do"
+        response = self._post(url, reservation_payload)
+        return self._wrap_response(response)
+
+    @traced("existingReservations")
+    def check_existing_reservations(self, payload_defaults: Dict[str, Any], prvd_dt: str) -> list:
+        """Check existing reservations for a given date"""
+        url = f"{self.base_url}/api/menu/reservation/selectMenuReservationList.do"
+        bizplc_cd = payload_defaults.get("bizplcCd", "196274")
+        payload = {"prvdDt": prvd_dt, "bizplcCd": bizplc_cd}
+        response = self._post(url, payload)
+        return self._active_reservations(self._safe_json(response), prvd_dt)
+
+    def menu_code_for(self, initial: str) -> Optional[str]:
+        return self.MENU_CORNER_MAP.get(initial.strip())
+
+    def export_cookies(self) -> List[Dict[str, Any]]:
+        """The session cookie jar as plain dicts (see SessionStore)."""
+        return [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "expires": cookie.expires,
+                "secure": cookie.secure,
+            }
+            for cookie in self.session.cookies
+        ]
+
+    def clear_cookies(self) -> None:
+        self.session.cookies.clear()
+
+    def import_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain") or "",
+                path=cookie.get("path") or "/",
+                expires=cookie.get("expires"),
+                secure=bool(cookie.get("secure")),
+            )
+
+    def _post(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """POST with the XHR headers; one transparent re-login and retry when the
+        session has expired.
+
+        Every request passes the outbound governor (rate limit and circuit
+        breaker, see core.governor). Reads are not hedged here (see core.hedging).
+        """
+        endpoint = url.rsplit("/", 1)[-1]
+
+        def send() -> requests.Response:
+            return GOVERNOR.call(endpoint, lambda: self.session.post(
+                url,
+                data=json.dumps(payload),
+                headers=self._json_headers(),
+                timeout=self.timeout,
+                verify=False,
+            ), self._status_of)
+
+        response = send()
+        if self.reauthenticate and self._session_expired(response.status_code, self._safe_json(response), response.text):
+            LOGGER.info("hcafe session expired (HTTP %s) for %s, logging in again", response.status_code, endpoint)
+            if self.reauthenticate():
+                response = send()
+        return response
+
+    def _wrap_response(self, response: requests.Response) -> ApiCallResult:
+        return self._api_result(response.status_code, self._safe_json(response), response.text)
+
+    # Request payloads and response handling shared with AsyncReservationClient.
+
+    @staticmethod
+    def _login_payload(user_id: str, password: str, payload_defaults: Dict[str, str]) -> Dict[str, Any]:
+        return {
             "userId": user_id,
             "userData": password,
             "osDvCd": payload_defaults.get("osDvCd", ""),
             "userCurrAppVer": payload_defaults.get("userCurrAppVer", "1.2.3"),
             "mobiPhTrmlId": payload_defaults.get("mobiPhTrmlId", ""),
         }
-        response = self.session.post(url, data=json.dumps(payload), headers={"Content-Type": "application/json"}, timeout=self.timeout, verify=False)
-        json_body = self._safe_json(response)
-        if response.status_code == 200 and json_body.get("errorCode") == 0:
+
+    @staticmethod
+    def _login_result(status_code: int, json_body: Dict[str, Any], text: str) -> LoginResult:
+        if status_code == 200 and json_body.get("errorCode") == 0:
             return LoginResult(True, "Login succeeded", json_body)
-        message = json_body.get("errorMsg") if json_body else response.text
+        message = json_body.get("errorMsg") if json_body else text
         return LoginResult(False, message or "Login failed", json_body)
 
-    def reserve_menu(self, payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str, floor_name: Optional[str] = None) -> ApiCallResult:
-        url = f"{self.base_url}/api/menu/reservation/insertReservationOrder.do"
+    @staticmethod
+    def _reserve_payload(payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str, floor_name: Optional[str]) -> Dict[str, Any]:
         payload = dict(payload_template)
         
         # If payload_template is just the login session data, we add defaults.
@@ -73,95 +216,29 @@ class ReservationClient:
 
         if floor_name:
             payload["floorNm"] = floor_name
-        
-        # Debug logging for payload
-        import logging
-        logger = logging.getLogger()
-        logger.info(f"Full Reserve Payload: {json.dumps(payload, ensure_ascii=False)}")
-        
-        response = self.session.post(
-            url,
-            data=json.dumps(payload),
-            headers=self._json_headers(),
-            timeout=self.timeout,
-            verify=False,
-        )
-        return self._wrap_response(response)
+        return payload
 
-    def fetch_reserve_menu_list(self, prvd_dt: str, bizplc_cd: str) -> ApiCallResult:
-        url = f"{self.base_url}/api/menu/reservation/selectReserveMenuList.do"
-        payload = {
+    @staticmethod
+    def _menu_list_payload(prvd_dt: str, bizplc_cd: str) -> Dict[str, Any]:
+        return {
             "prvdDt": prvd_dt,
             "bizplcCd": bizplc_cd,
             "clcoMvicoYn": "Y",
             "reseFgCd": "3",
         }
-        response = self.session.post(
-            url,
-            data=json.dumps(payload),
-            headers=self._json_headers(),
-            timeout=self.timeout,
-            verify=False,
-        )
-        return self._wrap_response(response)
 
-    def fetch_delivery_info_type_list(self, payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str) -> ApiCallResult:
-        url = f"{self.base_url}/api/menu/reservation/selectDeliveryInfoTypeList.do"
-        payload = {
+    @staticmethod
+    def _delivery_info_payload(payload_template: Dict[str, Any], coner_dv_cd: str, prvd_dt: str) -> Dict[str, Any]:
+        return {
             "conerDvCd": coner_dv_cd,
             "mealDvCd": "0002", # Assuming lunch
             "bizbrCd": payload_template.get("bizbrCd", "50856"), # Default or from payload
             "bizplcCd": payload_template.get("bizplcCd", "196274"),
             "prvdDt": prvd_dt,
         }
-        response = self.session.post(
-            url,
-            data=json.dumps(payload),
-            headers=self._json_headers(),
-            timeout=self.timeout,
-            verify=False,
-        )
-        return self._wrap_response(response)
-
-    def fetch_reservations(self, prvd_dt: str, bizplc_cd: str) -> ApiCallResult:
-        url = f"{self.base_url}/api/menu/reservation/selectMenuReservationList.do"
-        payload = {
-            "prvdDt": prvd_dt,
-            "bizplcCd": bizplc_cd,
-        }
-        response = self.session.post(
-            url,
-            data=json.dumps(payload),
-            headers=self._json_headers(),
-            timeout=self.timeout,
-            verify=False,
-        )
-        return self._wrap_response(response)
-
-    def cancel_reservation(self, reservation_payload: Dict[str, str]) -> ApiCallResult:
-        url = f"{self.base_url}/api/menu/reservation/updateMenuReservationCancel.do"
-        response = self.session.post(
-            url,
-            data=json.dumps(reservation_payload),
-            headers=self._json_headers(),
-            timeout=self.timeout,
-            verify=False,
-        )
-        return self._wrap_response(response)
 
-    def check_existing_reservations(self, payload_defaults: Dict[str, Any], prvd_dt: str) -> list:
-        """Check existing reservations for a given date"""
-        url = f"{self.base_url}/api/menu/reservation/selectMenuReservationList.do"
-        bizplc_cd = payload_defaults.get("bizplcCd", "196274")
-        payload = {"prvdDt": prvd_dt, "bizplcCd": bizplc_cd}
-        response = self.session.post(
-            url,
-            data=json.dumps(payload),
-            headers=self._json_headers(),
-            timeout=self.timeout,
-            verify=False,
-        )
-        result = self._safe_json(response)
+    @staticmethod
+    def _active_reservations(result: Dict[str, Any], prvd_dt: str) -> list:
         if result.get("errorCode") == 0:
             # Response structure: dataSets.reserveList
             data_sets = result.get("dataSets", {})
@@ -170,15 +247,12 @@ class ReservationClient:
             return [r for r in reservations if r.get("prvdDt") == prvd_dt and r.get("rsvStatCd") == "A"]
         return []
 
-    def menu_code_for(self, initial: str) -> Optional[str]:
-        return self.MENU_CORNER_MAP.get(initial.strip())
-
-    def _wrap_response(self, response: requests.Response) -> ApiCallResult:
-        payload = self._safe_json(response)
+    @staticmethod
+    def _api_result(status_code: int, payload: Dict[str, Any], text: str) -> ApiCallResult:
         if not payload:
-            return ApiCallResult(False, None, response.text, {"statusCode": response.status_code, "body": response.text})
+            return ApiCallResult(False, None, text, {"statusCode": status_code, "body": text})
         success = payload.get("errorCode") == 0
-        payload.setdefault("statusCode", response.status_code)
+        payload.setdefault("statusCode", status_code)
         return ApiCallResult(success, payload.get("errorCode"), payload.get("errorMsg"), payload)
 
     @staticmethod
@@ -191,6 +265,24 @@ class ReservationClient:
             "Origin": "https://hcafe.hgreenfood.com",
         }
 
+    @staticmethod
+    def _session_expired(status_code: int, body: Dict[str, Any], text: str) -> bool:
+        """True when hcafe rejected the request because the session is no longer logged in."""
+        if status_code in (401, 403):
+            return True
+        if status_code != 200 or not isinstance(body, dict):
+            return False
+        if not body:
+            return bool(text and text.strip())  # login page instead of JSON
+        if body.get("errorCode") in (0, None):
+            return False
+        message = str(body.get("errorMsg") or "")
+        return any(marker in message for marker in SESSION_EXPIRED_MARKERS)
+
+    @staticmethod
+    def _status_of(response: requests.Response) -> int:
+        return response.status_code
+
     @staticmethod
     def _safe_json(response: requests.Response) -> Dict[str, Any]:
         try:
@@ -2,17 +2,46 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
 from datetime import date, datetime, timedelta
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
 
 import pytz
 
 from .config_store import ConfigStore
+from .business_calendar import BusinessCalendar
 from .holiday_service import HolidayService
-from .models import ReservationAttempt
+from .models import Notification, PreparedReservation, ReservationAttempt, ReservationOrder, UserPreferences
 from .reservation_client import ReservationClient
+from .retry import TERMINAL, RetryOutcome, RetryPolicy, is_duplicate, run_deadline
+from .run_context import NotificationOutbox, RunContext
+from .session_store import SessionStore
 from .ses_notifier import SesNotifier
+from . import tracing
+
+if TYPE_CHECKING:
+    # Imported where used: aiohttp is only needed by the asyncio worker path
+    from .async_reservation_client import AsyncReservationClient
+
+LOGGER = logging.getLogger()
+
+# Regular menu codes (Sandwich, Salad, Bakery, Healthy, Chicken)
+REGULAR_MENU_CODES = ["0005", "0006", "0007", "0009", "0010"]
+
+# deliveryInfoTypeList fields that describe a floor and are stored on the profile
+FLOOR_DESCRIPTOR_FIELDS = (
+    "floorNm",
+    "rownum",
+    "dlvrPlcFloorNo",
+    "alphabetSeq",
+    "dlvrPlcFloorSeq",
+    "dlvrPlcNm",
+    "totalCount",
+    "maxDelvQty",
+    "dlvrPlcSeq",
+)
 
 
 class ReservationService:
@@ -23,193 +52,748 @@ class ReservationService:
         holiday_service: Optional[HolidayService] = None,
         notifier: Optional[SesNotifier] = None,
         timezone: str = "Asia/Seoul",
+        reservation_client_factory: Optional[Callable[[], ReservationClient]] = None,
+        session_store: Optional[SessionStore] = None,
     ) -> None:
         self.config_store = config_store
         self.reservation_client = reservation_client
         self.holiday_service = holiday_service
         self.notifier = notifier
         self.timezone = timezone
+        # When set, every run gets its own client (and therefore its own
+        # requests.Session / cookie jar) so runs can execute concurrently.
+        self.reservation_client_factory = reservation_client_factory
+        # When set, stored hcafe sessions are reused instead of logging in.
+        self.session_store = session_store
+        # Weekends plus public holidays (when HOLIDAY_API_KEY is configured),
+        # rebuilt as often as the holiday cache refreshes.
+        self.calendar = BusinessCalendar(
+            self._holidays_for, ttl=holiday_service.cache_ttl if holiday_service else None
+        )
 
-    def run(self, user_id: str, service_date: Optional[date] = None) -> ReservationAttempt:
-        preferences = self.config_store.get_user_preferences(user_id)
-        tz_name = preferences.timezone or self.timezone
-        tz = pytz.timezone(tz_name)
-        holiday_api_key = os.environ.get("HOLIDAY_API_KEY")
-        target_date = service_date or self._next_service_date(tz, holiday_api_key)
+    def _client_for_run(self) -> ReservationClient:
+        if self.reservation_client_factory:
+            return self.reservation_client_factory()
+        return self.reservation_client
+
+    def _login(self, client: ReservationClient, preferences: UserPreferences):
+        if self.session_store:
+            return self.session_store.login(client, preferences)
+        if not preferences.secrets_loaded:
+            self.config_store.decrypt_secrets(preferences)
+        return client.login(preferences.user_id, preferences.password, preferences.raw_payload)
+
+    async def _login_async(self, client: AsyncReservationClient, preferences: UserPreferences):
+        if self.session_store:
+            return await self.session_store.login_async(client, preferences)
+        if not preferences.secrets_loaded:
+            await asyncio.to_thread(self.config_store.decrypt_secrets, preferences)
+        return await client.login(preferences.user_id, preferences.password, preferences.raw_payload)
+
+    def run(
+        self,
+        user_id: Optional[str] = None,
+        service_date: Optional[date] = None,
+        preferences: Optional[UserPreferences] = None,
+        context: Optional[RunContext] = None,
+    ) -> ReservationAttempt:
+        """Prepare and immediately fire a reservation (no waiting for the window).
+
+        Pass ``preferences`` when the profile is already loaded to skip the lookup.
+        """
+        return self.fire(self.prepare(user_id, service_date, preferences, context))
+
+    def prepare(
+        self,
+        user_id: Optional[str] = None,
+        service_date: Optional[date] = None,
+        preferences: Optional[UserPreferences] = None,
+        context: Optional[RunContext] = None,
+    ) -> PreparedReservation:
+        """Do everything that does not have to happen inside the reservation window.
+
+        Loads preferences, checks holidays/exclusions, logs in, checks existing
+        reservations and resolves the menu and floor descriptors into ready-to-send
+        order payloads. When the run can already be decided here (holiday, login
+        failure, existing reservation, ...), ``outcome`` is set and notified.
+        ``context`` shares upstream reads between users of the same worker run.
+        Every phase of the run is timed into ``prepared.trace`` (see core.tracing).
+        """
+        with tracing.activate(tracing.Trace()):
+            return self._prepare(user_id, service_date, preferences, context)
+
+    def _prepare(
+        self,
+        user_id: Optional[str],
+        service_date: Optional[date],
+        preferences: Optional[UserPreferences],
+        context: Optional[RunContext],
+    ) -> PreparedReservation:
+        prepared = self._start(user_id, service_date, preferences, context)
+        if prepared.outcome:
+            return prepared
+        preferences = prepared.preferences
+        target_date = prepared.target_date
+
+        client = self._client_for_run()
+        prepared.client = client
+        login_result = self._login(client, preferences)
+        if not login_result.success:
+            self._settle(prepared, self._login_failure(login_result, target_date), success=False)
+            return prepared
+
+        # 기존 예약 확인
+        target_prvd_dt = target_date.strftime("%Y%m%d")
+        existing_reservations = client.check_existing_reservations(preferences.raw_payload, target_prvd_dt)
+        existing = self._existing_reservation_outcome(existing_reservations, target_date)
+        if existing:
+            self._settle(prepared, existing, success=True)
+            return prepared
+
+        prepared.orders = self._resolve_orders(client, preferences, target_prvd_dt, context)
+        return prepared
+
+    async def run_async(
+        self,
+        user_id: Optional[str] = None,
+        service_date: Optional[date] = None,
+        preferences: Optional[UserPreferences] = None,
+        context: Optional[RunContext] = None,
+        client: Optional[AsyncReservationClient] = None,
+    ) -> ReservationAttempt:
+        """asyncio variant of :meth:`run` driving an :class:`AsyncReservationClient`.
+
+        Pass ``client`` to share a connection pool; a client created here is closed
+        before returning.
+        """
+        owns_client = client is None
+        if client is None:
+            from .async_reservation_client import AsyncReservationClient
+
+            client = AsyncReservationClient(base_url=self.reservation_client.base_url)
+        try:
+            prepared = await self.prepare_async(user_id, service_date, preferences, context, client)
+            return await self.fire_async(prepared)
+        finally:
+            if owns_client:
+                await client.close()
+
+    async def prepare_async(
+        self,
+        user_id: Optional[str] = None,
+        service_date: Optional[date] = None,
+        preferences: Optional[UserPreferences] = None,
+        context: Optional[RunContext] = None,
+        client: Optional[AsyncReservationClient] = None,
+    ) -> PreparedReservation:
+        """asyncio variant of :meth:`prepare`; the existing-reservation check and the
+        menu list read run concurrently. DynamoDB/KMS/SES work runs in threads."""
+        with tracing.activate(tracing.Trace()):
+            return await self._prepare_async(user_id, service_date, preferences, context, client)
+
+    async def _prepare_async(
+        self,
+        user_id: Optional[str],
+        service_date: Optional[date],
+        preferences: Optional[UserPreferences],
+        context: Optional[RunContext],
+        client: Optional[AsyncReservationClient],
+    ) -> PreparedReservation:
+        prepared = await asyncio.to_thread(self._start, user_id, service_date, preferences, context)
+        if prepared.outcome:
+            return prepared
+        preferences = prepared.preferences
+        target_date = prepared.target_date
+
+        if client is None:
+            from .async_reservation_client import AsyncReservationClient
+
+            client = AsyncReservationClient(base_url=self.reservation_client.base_url)
+        prepared.client = client
+        login_result = await self._login_async(client, preferences)
+        if not login_result.success:
+            await asyncio.to_thread(self._settle, prepared, self._login_failure(login_result, target_date), False)
+            return prepared
+
+        target_prvd_dt = target_date.strftime("%Y%m%d")
+        existing_reservations, menu_list_result = await asyncio.gather(
+            client.check_existing_reservations(preferences.raw_payload, target_prvd_dt),
+            self._fetch_menu_list_async(client, preferences, target_prvd_dt, context),
+        )
+        existing = self._existing_reservation_outcome(existing_reservations, target_date)
+        if existing:
+            await asyncio.to_thread(self._settle, prepared, existing, True)
+            return prepared
+
+        prepared.orders = await self._resolve_orders_async(client, preferences, target_prvd_dt, context, menu_list_result)
+        return prepared
+
+    def _start(
+        self,
+        user_id: Optional[str],
+        service_date: Optional[date],
+        preferences: Optional[UserPreferences],
+        context: Optional[RunContext],
+    ) -> PreparedReservation:
+        """Everything before talking to hcafe: preferences and eligibility.
+
+        Secrets stay encrypted until a login actually needs them.
+        """
+        if preferences is None:
+            if not user_id:
+                raise ValueError("user_id or preferences is required")
+            # Secrets are decrypted only once the user turns out to be eligible.
+            preferences = self.config_store.get_user_preferences(user_id, decrypt=False)
+        target_date = service_date or self.target_date_for(preferences)
+        trace = tracing.current()
+        if trace is not None:
+            trace.annotations["userId"] = preferences.user_id
+        prepared = PreparedReservation(preferences=preferences, target_date=target_date, context=context, trace=trace)
+
+        with tracing.span("eligibility"):
+            skip = self.check_eligibility(preferences, target_date)
+        if skip:
+            self._settle(prepared, skip, success=False)
+        return prepared
+
+    @staticmethod
+    def _login_failure(login_result, target_date: date) -> ReservationAttempt:
+        return ReservationAttempt(False, login_result.message, target_date, [], {"login": login_result.response_payload})
+
+    @staticmethod
+    def _existing_reservation_outcome(existing_reservations: list, target_date: date) -> Optional[ReservationAttempt]:
+        if not existing_reservations:
+            return None
+        # If a regular menu is already reserved we already have a main meal and stop.
+        # If only special menus (not in REGULAR_MENU_CODES) are reserved, we continue
+        # so that a regular menu can still be booked.
+        has_regular_reservation = any(r.get('conerDvCd') in REGULAR_MENU_CODES for r in existing_reservations)
+        if not has_regular_reservation:
+            return None
+        reservation_details = existing_reservations[0]
+        return ReservationAttempt(
+            True,
+            f"Reservation already exists: {reservation_details.get('dispNm', 'Unknown')}",
+            target_date,
+            [],
+            {"existingReservation": reservation_details}
+        )
+
+    def target_date_for(self, preferences: UserPreferences) -> date:
+        tz = pytz.timezone(preferences.timezone or self.timezone)
+        return self._next_service_date(tz)
+
+    def check_eligibility(self, preferences: UserPreferences, target_date: date) -> Optional[ReservationAttempt]:
+        """Cheap checks on plaintext profile data only (no KMS, no hcafe).
+
+        Returns a skipped attempt when the user must not be reserved for ``target_date``.
+        """
+        holidays = self._holidays_for(target_date.year, target_date.month) or set()
+        if target_date.strftime("%Y%m%d") in holidays:
+            return ReservationAttempt(False, "Skipped due to public holiday", target_date, [], skipped=True)
 
-        if self.holiday_service and holiday_api_key:
-            if self.holiday_service.is_holiday(target_date, holiday_api_key):
-                attempt = ReservationAttempt(False, "Skipped due to public holiday", target_date, [])
-                self._notify(preferences, attempt, success=False)
-                return attempt
-        
         # Check user exclusion dates
         target_date_str = target_date.isoformat()
         if target_date_str in preferences.exclusion_dates:
-            attempt = ReservationAttempt(False, f"Skipped due to user exclusion date: {target_date_str}", target_date, [])
-            self._notify(preferences, attempt, success=False)
-            return attempt
+            return ReservationAttempt(False, f"Skipped due to user exclusion date: {target_date_str}", target_date, [], skipped=True)
+        return None
 
-        login_result = self.reservation_client.login(preferences.user_id, preferences.password, preferences.raw_payload)
-        if not login_result.success:
-            attempt = ReservationAttempt(False, login_result.message, target_date, [], {"login": login_result.response_payload})
-            self._notify(preferences, attempt, success=False)
-            return attempt
+    def fire(self, prepared: PreparedReservation) -> ReservationAttempt:
+        """Send the prepared orders in preference order; only POSTs inside the window."""
+        if prepared.outcome:
+            return prepared.outcome
+        with tracing.activate(prepared.trace):
+            return self._fire(prepared)
 
-        # 기존 예약 확인
+    def _fire(self, prepared: PreparedReservation) -> ReservationAttempt:
+        preferences = prepared.preferences
+        target_date = prepared.target_date
         target_prvd_dt = target_date.strftime("%Y%m%d")
-        existing_reservations = self.reservation_client.check_existing_reservations(preferences.raw_payload, target_prvd_dt)
-        
-        # Regular menu codes (Sandwich, Salad, Bakery, Healthy, Chicken)
-        REGULAR_MENU_CODES = ["0005", "0006", "0007", "0009", "0010"]
-        
-        if existing_reservations:
-            # Check if any existing reservation is a "Regular Menu"
-            # If so, we skip because we already have a main meal.
-            # If all existing reservations are "Special Menus" (not in REGULAR_MENU_CODES),
-            # we proceed to allow booking a regular menu (or another special one, though logic implies we want to ensure at least one regular).
-            # Actually, the requirement is: "If menu_corner_map doesn't have it (or it's special), duplicate is allowed."
-            # But here we are checking if we SHOULD reserve.
-            # If we have a regular menu reserved, we stop.
-            # If we only have special menus reserved, we continue (to potentially reserve a regular one).
-            
-            has_regular_reservation = any(r.get('conerDvCd') in REGULAR_MENU_CODES for r in existing_reservations)
-            
-            if has_regular_reservation:
-                reservation_details = existing_reservations[0]
-                attempt = ReservationAttempt(
-                    True,
-                    f"Reservation already exists: {reservation_details.get('dispNm', 'Unknown')}",
-                    target_date,
-                    [],
-                    {"existingReservation": reservation_details}
-                )
-                self._notify(preferences, attempt, success=True)
-                return attempt
+        client = prepared.client or self._client_for_run()
+
+        orders = prepared.orders
+        if not orders:
+            # The menu list may not be published yet while preparing; resolve it live
+            # (not from reads shared during prepare, which may predate the window).
+            orders = self._resolve_orders(client, preferences, target_prvd_dt, prepared.context, phase="fire")
+
+        attempted = []
+        last_error = None
+        policy = self._retry_policy(prepared)
+        timings: List[Dict[str, Any]] = []
+
+        for order in orders:
+            if attempted and policy.expired():
+                break
+            attempted.append(order.menu_initial)
+            LOGGER.info(f"Reserving menu {order.menu_initial} for user {preferences.user_id} with floor: {preferences.floor_name}")
             
-            # If we are here, it means we only have special menus (or none, but 'if existing_reservations' covers that).
-            # We proceed to try to reserve.
+            outcome = policy.run(
+                lambda: client.reserve_menu(order.payload, order.coner_dv_cd, target_prvd_dt, preferences.floor_name),
+                order.menu_initial,
+                timings,
+            )
+            result = outcome.result
+            if self._floor_may_be_stale(order, outcome):
+                result = self._retry_with_live_floor(client, prepared, order, target_prvd_dt) or result
+            attempt = self._order_attempt(order, outcome, result, target_date, attempted, timings)
+            if attempt:
+                return self._settle(prepared, attempt, success=True)
+            last_error = result
+            # DUPLICATE_RESERVATION_MESSAGE means this specific item cannot be
+            # reserved; we still move on to the next preference.
+
+        return self._settle(prepared, self._failed_attempt(last_error, target_date, attempted, timings), success=False)
+
+    async def fire_async(self, prepared: PreparedReservation) -> ReservationAttempt:
+        """asyncio variant of :meth:`fire` for prepare_async results."""
+        if prepared.outcome:
+            return prepared.outcome
+        with tracing.activate(prepared.trace):
+            return await self._fire_async(prepared)
+
+    async def _fire_async(self, prepared: PreparedReservation) -> ReservationAttempt:
+        preferences = prepared.preferences
+        target_date = prepared.target_date
+        target_prvd_dt = target_date.strftime("%Y%m%d")
+        client = prepared.client
+
+        orders = prepared.orders
+        if not orders:
+            menu_list_result = await self._fetch_menu_list_async(client, preferences, target_prvd_dt, prepared.context, phase="fire")
+            orders = await self._resolve_orders_async(
+                client, preferences, target_prvd_dt, prepared.context, menu_list_result, phase="fire"
+            )
 
         attempted = []
         last_error = None
+        policy = self._retry_policy(prepared)
+        timings: List[Dict[str, Any]] = []
+
+        for order in orders:
+            if attempted and policy.expired():
+                break
+            attempted.append(order.menu_initial)
+            LOGGER.info(f"Reserving menu {order.menu_initial} for user {preferences.user_id} with floor: {preferences.floor_name}")
+
+            outcome = await policy.run_async(
+                lambda: client.reserve_menu(order.payload, order.coner_dv_cd, target_prvd_dt, preferences.floor_name),
+                order.menu_initial,
+                timings,
+            )
+            result = outcome.result
+            if self._floor_may_be_stale(order, outcome):
+                result = await self._retry_with_live_floor_async(client, prepared, order, target_prvd_dt) or result
+            attempt = self._order_attempt(order, outcome, result, target_date, attempted, timings)
+            if attempt:
+                return await asyncio.to_thread(self._settle, prepared, attempt, True)
+            last_error = result
+
+        attempt = self._failed_attempt(last_error, target_date, attempted, timings)
+        return await asyncio.to_thread(self._settle, prepared, attempt, False)
+
+    def _retry_policy(self, prepared: PreparedReservation) -> RetryPolicy:
+        # The worker sets one deadline for the whole run once the window opens.
+        context = prepared.context
+        deadline = context.deadline if context is not None and context.deadline else run_deadline()
+        return RetryPolicy.from_payload(prepared.preferences.raw_payload, deadline)
+
+    @staticmethod
+    def _floor_may_be_stale(order: ReservationOrder, outcome: RetryOutcome) -> bool:
+        return order.floor_source == "stored" and outcome.verdict == TERMINAL and not is_duplicate(outcome.result)
+
+    @staticmethod
+    def _order_attempt(
+        order: ReservationOrder,
+        outcome: RetryOutcome,
+        result,
+        target_date: date,
+        attempted: List[str],
+        timings: List[Dict[str, Any]],
+    ) -> Optional[ReservationAttempt]:
+        """The successful attempt for this order, or None to move on to the next preference."""
+        if result.success:
+            details = {**result.raw, "attempts": timings}
+            return ReservationAttempt(True, f"Reserved for menu {order.menu_initial}", target_date, attempted.copy(), details)
+        if outcome.ambiguous and is_duplicate(result):
+            # An earlier attempt timed out or hit a 5xx but still went through.
+            LOGGER.info("Order for menu %s confirmed by duplicate response after retry", order.menu_initial)
+            details = {**result.raw, "attempts": timings}
+            return ReservationAttempt(True, f"Reserved for menu {order.menu_initial}", target_date, attempted.copy(), details)
+        return None
+
+    @staticmethod
+    def _failed_attempt(
+        last_error, target_date: date, attempted: List[str], timings: Optional[List[Dict[str, Any]]] = None
+    ) -> ReservationAttempt:
+        message = last_error.error_message if last_error else "Reservation attempt failed"
+        details = dict(last_error.raw) if last_error else {}
+        if timings:
+            details["attempts"] = timings
+        return ReservationAttempt(False, message or "Reservation attempt failed", target_date, attempted, details)
+
+    def _retry_with_live_floor(
+        self, client: ReservationClient, prepared: PreparedReservation, order: ReservationOrder, target_prvd_dt: str
+    ):
+        """The stored floor descriptor may be outdated: look the floor up live and resend once."""
+        preferences = prepared.preferences
+        LOGGER.info("Order with stored floor descriptor rejected for %s, retrying with a live lookup", preferences.user_id)
+        floor_info = self._lookup_floor(client, preferences, order.coner_dv_cd, target_prvd_dt, prepared.context, phase="fire")
+        payload = self._payload_with_new_floor(order, floor_info)
+        if payload is None:
+            return None
+        result = client.reserve_menu(payload, order.coner_dv_cd, target_prvd_dt, preferences.floor_name)
+        if result.success:
+            # The live descriptor worked; keep it for the next runs.
+            self._remember_floor(preferences, floor_info)
+        return result
+
+    async def _retry_with_live_floor_async(
+        self, client: AsyncReservationClient, prepared: PreparedReservation, order: ReservationOrder, target_prvd_dt: str
+    ):
+        preferences = prepared.preferences
+        LOGGER.info("Order with stored floor descriptor rejected for %s, retrying with a live lookup", preferences.user_id)
+        floor_info = await self._lookup_floor_async(
+            client, preferences, order.coner_dv_cd, target_prvd_dt, prepared.context, phase="fire"
+        )
+        payload = self._payload_with_new_floor(order, floor_info)
+        if payload is None:
+            return None
+        result = await client.reserve_menu(payload, order.coner_dv_cd, target_prvd_dt, preferences.floor_name)
+        if result.success:
+            await asyncio.to_thread(self._remember_floor, preferences, floor_info)
+        return result
+
+    def _payload_with_new_floor(self, order: ReservationOrder, floor_info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Order payload with the live floor fields, or None when they change nothing."""
+        if not floor_info:
+            return None
+        if all(order.payload.get(key) == floor_info.get(key) for key in FLOOR_DESCRIPTOR_FIELDS):
+            return None  # descriptor is current; the rejection has another cause
+        payload = dict(order.payload)
+        self._apply_floor(payload, floor_info)
+        return payload
+
+    def _settle(self, prepared: PreparedReservation, attempt: ReservationAttempt, success: bool) -> ReservationAttempt:
+        prepared.outcome = attempt
+        outbox = prepared.context.outbox if prepared.context is not None else None
+        self._notify(prepared.preferences, attempt, success=success, outbox=outbox)
+        trace = prepared.trace
+        if trace is not None:
+            attempt.details["phases"] = trace.phases()
+            tracing.publish(trace, "skipped" if attempt.skipped else ("success" if success else "failure"))
+        return attempt
+
+    def _resolve_orders(
+        self,
+        client: ReservationClient,
+        preferences,
+        target_prvd_dt: str,
+        context: Optional[RunContext] = None,
+        phase: str = "prepare",
+    ) -> List[ReservationOrder]:
+        """Turn the preferred menu initials into ready-to-send order payloads.
+
+        ``phase`` ("prepare" or "fire") scopes the reads shared through ``context``.
+        """
+        # 메뉴 목록 조회 (same date/site for almost every user: shared within a run phase)
+        bizplc_cd = preferences.raw_payload.get("bizplcCd", "196274")
+        menu_list_result = self._shared_fetch(
+            context,
+            (phase, "menuList", target_prvd_dt, bizplc_cd),
+            lambda: client.fetch_reserve_menu_list(target_prvd_dt, bizplc_cd),
+        )
 
-        # 메뉴 목록 조회
+        stored_floor = self._stored_floor_descriptor(preferences)
+        orders: List[ReservationOrder] = []
+        for menu_initial, coner_dv_cd, menu_item in self._order_candidates(client, preferences, menu_list_result):
+            # Floor details: the descriptor stored with the settings, else a live lookup
+            floor_source = "stored"
+            floor_info = stored_floor
+            if not floor_info:
+                floor_source = "live"
+                floor_info = self._lookup_floor(client, preferences, coner_dv_cd, target_prvd_dt, context, phase)
+                if floor_info:
+                    stored_floor = self._remember_floor(preferences, floor_info)
+
+            if not floor_info:
+                 LOGGER.warning("Could not determine delivery info (floor details). Skipping.")
+                 continue
+            orders.append(self._build_order(
+                preferences, menu_initial, coner_dv_cd, menu_item, target_prvd_dt, floor_info, floor_source, phase
+            ))
+        return orders
+
+    async def _resolve_orders_async(
+        self,
+        client: AsyncReservationClient,
+        preferences,
+        target_prvd_dt: str,
+        context: Optional[RunContext],
+        menu_list_result,
+        phase: str = "prepare",
+    ) -> List[ReservationOrder]:
+        candidates = self._order_candidates(client, preferences, menu_list_result)
+        stored_floor = self._stored_floor_descriptor(preferences)
+        if stored_floor:
+            floors = [stored_floor] * len(candidates)
+            floor_source = "stored"
+        else:
+            # No usable descriptor: look the floor up for every corner at once.
+            floors = await asyncio.gather(*(
+                self._lookup_floor_async(client, preferences, coner_dv_cd, target_prvd_dt, context, phase)
+                for _menu_initial, coner_dv_cd, _menu_item in candidates
+            ))
+            floor_source = "live"
+            resolved = next((floor for floor in floors if floor), None)
+            if resolved:
+                await asyncio.to_thread(self._remember_floor, preferences, resolved)
+
+        orders: List[ReservationOrder] = []
+        for (menu_initial, coner_dv_cd, menu_item), floor_info in zip(candidates, floors):
+            if not floor_info:
+                LOGGER.warning("Could not determine delivery info (floor details). Skipping.")
+                continue
+            orders.append(self._build_order(
+                preferences, menu_initial, coner_dv_cd, menu_item, target_prvd_dt, floor_info, floor_source, phase
+            ))
+        return orders
+
+    async def _fetch_menu_list_async(
+        self,
+        client: AsyncReservationClient,
+        preferences,
+        target_prvd_dt: str,
+        context: Optional[RunContext],
+        phase: str = "prepare",
+    ):
         bizplc_cd = preferences.raw_payload.get("bizplcCd", "196274")
-        menu_list_result = self.reservation_client.fetch_reserve_menu_list(target_prvd_dt, bizplc_cd)
+        return await self._shared_fetch_async(
+            context,
+            (phase, "menuList", target_prvd_dt, bizplc_cd),
+            lambda: client.fetch_reserve_menu_list(target_prvd_dt, bizplc_cd),
+        )
+
+    @staticmethod
+    def _order_candidates(client, preferences, menu_list_result) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """(menu initial, corner code, menu item) for the preferred menus on offer, in preference order."""
         available_menus = []
         if menu_list_result.success:
             data_sets = menu_list_result.raw.get("dataSets", {})
             available_menus = data_sets.get("reserveList", [])
         else:
-            import logging
-            LOGGER = logging.getLogger()
             LOGGER.warning(f"Failed to fetch menu list: {menu_list_result.error_message}")
 
-        attempted = []
-        last_error = None
-
+        candidates = []
         for menu_initial in preferences.menu_sequence:
-            coner_dv_cd = self.reservation_client.menu_code_for(menu_initial)
+            coner_dv_cd = client.menu_code_for(menu_initial)
             if not coner_dv_cd:
                 continue
-            
-            # 1. Find matching menu item from available_menus (fetched earlier)
             menu_item = next((m for m in available_menus if m.get("conerDvCd") == coner_dv_cd), None)
             if not menu_item:
-                import logging
-                LOGGER = logging.getLogger()
                 LOGGER.warning(f"Menu {menu_initial} (code {coner_dv_cd}) not found in available menus")
                 continue
+            candidates.append((menu_initial, coner_dv_cd, menu_item))
+        return candidates
 
-            # 2. Fetch Delivery Info Type List to get floor details
-            delivery_info_result = self.reservation_client.fetch_delivery_info_type_list(preferences.raw_payload, coner_dv_cd, target_prvd_dt)
-            delivery_info_item = None
-            if delivery_info_result.success:
-                delivery_list = delivery_info_result.raw.get("dataSets", {}).get("deliveryInfoTypeList", [])
-                # Find item matching user's floor name
-                target_floor = preferences.floor_name
-                delivery_info_item = next((d for d in delivery_list if d.get("floorNm") == target_floor), None)
-                
-                if not delivery_info_item:
-                    import logging
-                    LOGGER = logging.getLogger()
-                    LOGGER.warning(f"Floor {target_floor} not found in delivery info list. Available: {[d.get('floorNm') for d in delivery_list]}")
-                    if not target_floor and delivery_list:
-                         delivery_info_item = delivery_list[0]
-            else:
-                import logging
-                LOGGER = logging.getLogger()
-                LOGGER.warning(f"Failed to fetch delivery info: {delivery_info_result.error_message}")
-
-            if not delivery_info_item:
-                 import logging
-                 LOGGER = logging.getLogger()
-                 LOGGER.warning("Could not determine delivery info (floor details). Skipping.")
-                 continue
+    def _build_order(
+        self,
+        preferences,
+        menu_initial: str,
+        coner_dv_cd: str,
+        menu_item: Dict[str, Any],
+        target_prvd_dt: str,
+        floor_info: Dict[str, Any],
+        floor_source: str,
+        phase: str = "prepare",
+    ) -> ReservationOrder:
+        reservation_payload = dict(preferences.raw_payload)
+        reservation_payload.update({
+            "bizplcCd": menu_item.get("bizplcCd"),
+            "conerDvCd": coner_dv_cd,
+            "mealDvCd": menu_item.get("mealDvCd", "0002"),
+            "prvdDt": target_prvd_dt,
+            "ordQty": 1,
+            "dlvrRsvDvCd": 1,
+            "dsppUseYn": "Y"
+        })
+        # A quantity read at prepare time is minutes old when the order is sent
+        self._apply_floor(reservation_payload, floor_info, live_quantity=phase == "fire")
+        return ReservationOrder(menu_initial, coner_dv_cd, reservation_payload, floor_source)
 
-            # 3. Build Payload
-            reservation_payload = dict(preferences.raw_payload)
-            reservation_payload.update({
-                "bizplcCd": menu_item.get("bizplcCd"),
-                "conerDvCd": coner_dv_cd,
-                "mealDvCd": menu_item.get("mealDvCd", "0002"),
-                "prvdDt": target_prvd_dt,
-                "rownum": delivery_info_item.get("rownum"),
-                "dlvrPlcFloorNo": delivery_info_item.get("dlvrPlcFloorNo"),
-                "alphabetSeq": delivery_info_item.get("alphabetSeq"),
-                "dlvrPlcFloorSeq": delivery_info_item.get("dlvrPlcFloorSeq"),
-                "remainDeliQty": delivery_info_item.get("remainDeliQty"),
-                "dlvrPlcNm": delivery_info_item.get("dlvrPlcNm"),
-                "ordQty": 1,
-                "totalCount": delivery_info_item.get("totalCount"),
-                "floorNm": delivery_info_item.get("floorNm"), # Use the one from API
-                "maxDelvQty": delivery_info_item.get("maxDelvQty"),
-                "dlvrPlcSeq": delivery_info_item.get("dlvrPlcSeq"),
-                "dlvrRsvDvCd": 1,
-                "dsppUseYn": "Y"
-            })
-            
-            attempted.append(menu_initial)
-            import logging
-            logger = logging.getLogger()
-            logger.info(f"Reserving menu {menu_initial} for user {preferences.user_id} with floor: {preferences.floor_name}")
-            
-            result = self.reservation_client.reserve_menu(reservation_payload, coner_dv_cd, target_prvd_dt, preferences.floor_name)
-            if result.success:
-                attempt = ReservationAttempt(True, f"Reserved for menu {menu_initial}", target_date, attempted.copy(), result.raw)
-                self._notify(preferences, attempt, success=True)
-                return attempt
-            last_error = result
-            if result.error_message == "동일날짜에 이미 등록된 예약이 존재합니다.":
-                # This might happen if we tried to reserve a regular menu but one was just added, or a special menu that conflicts?
-                # But our logic above says we only proceed if NO regular menu exists.
-                # If the API returns this, it means we really can't reserve this specific item.
-                # However, if we are here, it might be that we have a special menu and tried to add a regular one, but the system blocked it?
-                # Or we tried to add a special one and it blocked it?
-                # In any case, we treat it as "Reservation already exists" but since we explicitly tried to reserve, maybe we should continue to next preference?
-                # For now, let's assume if API says no, we stop for this item.
-                pass 
+    def _lookup_floor(
+        self,
+        client: ReservationClient,
+        preferences,
+        coner_dv_cd: str,
+        target_prvd_dt: str,
+        context: Optional[RunContext] = None,
+        phase: str = "prepare",
+    ) -> Optional[Dict[str, Any]]:
+        """Live deliveryInfoTypeList lookup of the user's floor."""
+        delivery_info_result = self._shared_fetch(
+            context,
+            self._delivery_info_key(preferences, coner_dv_cd, target_prvd_dt, phase),
+            lambda: client.fetch_delivery_info_type_list(preferences.raw_payload, coner_dv_cd, target_prvd_dt),
+        )
+        return self._match_floor(preferences, delivery_info_result)
 
-        message = last_error.error_message if last_error else "Reservation attempt failed"
-        details = last_error.raw if last_error else {}
-        attempt = ReservationAttempt(False, message or "Reservation attempt failed", target_date, attempted, details)
-        self._notify(preferences, attempt, success=False)
-        return attempt
+    async def _lookup_floor_async(
+        self,
+        client: AsyncReservationClient,
+        preferences,
+        coner_dv_cd: str,
+        target_prvd_dt: str,
+        context: Optional[RunContext] = None,
+        phase: str = "prepare",
+    ) -> Optional[Dict[str, Any]]:
+        delivery_info_result = await self._shared_fetch_async(
+            context,
+            self._delivery_info_key(preferences, coner_dv_cd, target_prvd_dt, phase),
+            lambda: client.fetch_delivery_info_type_list(preferences.raw_payload, coner_dv_cd, target_prvd_dt),
+        )
+        return self._match_floor(preferences, delivery_info_result)
+
+    @staticmethod
+    def _delivery_info_key(preferences, coner_dv_cd: str, target_prvd_dt: str, phase: str):
+        return (
+            phase,
+            "deliveryInfo",
+            target_prvd_dt,
+            preferences.raw_payload.get("bizplcCd", "196274"),
+            preferences.raw_payload.get("bizbrCd", "50856"),
+            coner_dv_cd,
+        )
+
+    @staticmethod
+    def _match_floor(preferences, delivery_info_result) -> Optional[Dict[str, Any]]:
+        if not delivery_info_result.success:
+            LOGGER.warning(f"Failed to fetch delivery info: {delivery_info_result.error_message}")
+            return None
+
+        delivery_list = delivery_info_result.raw.get("dataSets", {}).get("deliveryInfoTypeList", [])
+        # Find item matching user's floor name
+        target_floor = preferences.floor_name
+        delivery_info_item = next((d for d in delivery_list if d.get("floorNm") == target_floor), None)
+        if not delivery_info_item:
+            LOGGER.warning(f"Floor {target_floor} not found in delivery info list. Available: {[d.get('floorNm') for d in delivery_list]}")
+            if not target_floor and delivery_list:
+                delivery_info_item = delivery_list[0]
+        return delivery_info_item
+
+    def refresh_floor_descriptor(
+        self,
+        preferences: UserPreferences,
+        service_date: Optional[date] = None,
+        client: Optional[ReservationClient] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Resolve the user's floor against hcafe and store the descriptor on the profile.
+
+        Logs in (or reuses a stored session) unless a logged-in ``client`` is
+        given. Returns the stored descriptor, or None when the floor could not be
+        resolved (e.g. no menu published for the date yet).
+        """
+        if client is None:
+            client = self._client_for_run()
+            login_result = self._login(client, preferences)
+            if not login_result.success:
+                LOGGER.warning("Floor descriptor refresh for %s: login failed: %s", preferences.user_id, login_result.message)
+                return None
+
+        target_prvd_dt = (service_date or self.target_date_for(preferences)).strftime("%Y%m%d")
+        for menu_initial in preferences.menu_sequence:
+            coner_dv_cd = client.menu_code_for(menu_initial)
+            if not coner_dv_cd:
+                continue
+            floor_info = self._lookup_floor(client, preferences, coner_dv_cd, target_prvd_dt)
+            if floor_info:
+                return self._remember_floor(preferences, floor_info)
+        LOGGER.warning("Floor descriptor refresh for %s: floor %s not resolved", preferences.user_id, preferences.floor_name)
+        return None
+
+    def floor_descriptor_is_stale(self, preferences: UserPreferences, now: Optional[datetime] = None) -> bool:
+        """True when the stored descriptor is missing or older than FLOOR_DESCRIPTOR_MAX_AGE_DAYS."""
+        if not self._stored_floor_descriptor(preferences) or not preferences.floor_descriptor_resolved_at:
+            return True
+        max_age = timedelta(days=float(os.environ.get("FLOOR_DESCRIPTOR_MAX_AGE_DAYS", "7")))
+        try:
+            resolved_at = datetime.fromisoformat(preferences.floor_descriptor_resolved_at)
+        except ValueError:
+            return True
+        return (now or datetime.utcnow()) - resolved_at > max_age
+
+    @staticmethod
+    def _stored_floor_descriptor(preferences) -> Optional[Dict[str, Any]]:
+        descriptor = preferences.floor_descriptor
+        # A descriptor left over from a previous floor setting is ignored.
+        if descriptor and descriptor.get("floorNm") == preferences.floor_name:
+            return descriptor
+        return None
+
+    def _remember_floor(self, preferences, floor_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist the floor fields of a live lookup; failures only cost a lookup next time."""
+        descriptor = {key: floor_info[key] for key in FLOOR_DESCRIPTOR_FIELDS if key in floor_info}
+        if descriptor == preferences.floor_descriptor:
+            return descriptor
+        try:
+            preferences.floor_descriptor_resolved_at = self.config_store.save_floor_descriptor(preferences.user_id, descriptor)
+            preferences.floor_descriptor = descriptor
+            LOGGER.info("Stored floor descriptor for %s: %s", preferences.user_id, descriptor)
+        except RuntimeError as error:
+            LOGGER.warning("Could not store floor descriptor for %s: %s", preferences.user_id, error)
+        return descriptor
+
+    @staticmethod
+    def _apply_floor(payload: Dict[str, Any], floor_info: Dict[str, Any], live_quantity: bool = True) -> None:
+        for key in FLOOR_DESCRIPTOR_FIELDS:
+            payload[key] = floor_info.get(key)
+        # Remaining quantity changes all day long, so it is not part of the stored
+        # descriptor; the configured default is sent unless ``floor_info`` was read
+        # at fire time (``live_quantity``).
+        if live_quantity and "remainDeliQty" in floor_info:
+            payload["remainDeliQty"] = floor_info.get("remainDeliQty")
+
+    @staticmethod
+    def _shared_fetch(context: Optional[RunContext], key, fetch):
+        if context is None:
+            return fetch()
+        return context.cache.get_or_fetch(key, fetch)
 
-    def _next_service_date(self, tz, holiday_api_key: Optional[str]) -> date:
-        candidate = (datetime.now(tz) + timedelta(days=1)).date()
-        while True:
-            if candidate.weekday() < 5:
-                if not holiday_api_key or not self.holiday_service:
-                    return candidate
-                if not self.holiday_service.is_holiday(candidate, holiday_api_key):
-                    return candidate
-            candidate += timedelta(days=1)
-
-    def _notify(self, preferences, attempt: ReservationAttempt, success: bool) -> None:
+    @staticmethod
+    async def _shared_fetch_async(context: Optional[RunContext], key, fetch):
+        if context is None:
+            return await fetch()
+        return await context.async_cache.get_or_fetch(key, fetch)
+
+    def window_opens_at(self, now: Optional[datetime] = None) -> datetime:
+        """Today's reservation opening time (``RESERVATION_OPEN_TIME``, HH:MM[:SS]) as an aware datetime."""
+        tz = pytz.timezone(self.timezone)
+        now = now or datetime.now(tz)
+        parts = [int(part) for part in os.environ.get("RESERVATION_OPEN_TIME", "13:00:00").split(":")]
+        hour, minute, second = (parts + [0, 0])[:3]
+        return now.astimezone(tz).replace(hour=hour, minute=minute, second=second, microsecond=0)
+
+    def _next_service_date(self, tz) -> date:
+        return self.calendar.next_workday(datetime.now(tz).date())
+
+    def _holidays_for(self, year: int, month: int) -> Optional[Set[str]]:
+        holiday_api_key = os.environ.get("HOLIDAY_API_KEY")
+        if not holiday_api_key or not self.holiday_service:
+            return set()
+        # None (not stored / lookup failed): weekends only, and not cached by the calendar
+        return self.holiday_service.known_holidays_for_month(year, month, holiday_api_key)
+
+    def _notify(self, preferences, attempt: ReservationAttempt, success: bool, outbox: Optional[NotificationOutbox] = None) -> None:
+        """Email the result, or queue it in ``outbox`` for the run to send later."""
         if not self.notifier or not preferences.notification_emails:
             return
-        
+        notification = self._notification(preferences, attempt, success)
+        if outbox is not None:
+            outbox.add(notification)
+        else:
+            self.notifier.send(notification.subject, notification.body, notification.recipients)
+
+    def _notification(self, preferences, attempt: ReservationAttempt, success: bool) -> Notification:
         # Menu Name Map
         menu_name_map = {
             '샌': '샌드위치',
@@ -278,11 +862,10 @@ class ReservationService:
         if success:
              # Next reservation
              tz = pytz.timezone(preferences.timezone or self.timezone)
-             holiday_api_key = os.environ.get("HOLIDAY_API_KEY")
-             next_date = self._next_service_date(tz, holiday_api_key)
+             next_date = self._next_service_date(tz)
              next_weekday_kr = ["월", "화", "수", "목", "금", "토", "일"][next_date.weekday()]
              body_lines.append(f"+ 다음 예약 예정: {next_date.strftime('%Y-%m-%d')} ({next_weekday_kr}) 13시")
 
         body_lines.append(f"+ 예약 확인 및 설정 : https://hgreenfood-auto-salad.pages.dev/")
         
-        self.notifier.send(subject, "\n".join(body_lines), preferences.notification_emails)
+        return Notification(subject, "\n".join(body_lines), list(preferences.notification_emails))
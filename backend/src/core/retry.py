@@ -0,0 +1,258 @@
+"""Retry policy for hcafe calls: error classification and deadline-bounded backoff."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import requests
+import urllib3
+
+from .models import ApiCallResult
+
+LOGGER = logging.getLogger()
+
+SUCCESS = "success"
+RETRYABLE = "retryable"
+TERMINAL = "terminal"
+
+DUPLICATE_RESERVATION_MESSAGE = "동일날짜에 이미 등록된 예약이 존재합니다."
+
+# Upstream overload / gateway errors seen around the 13:00 spike.
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+RETRYABLE_EXCEPTIONS = (
+    requests.Timeout,
+    requests.ConnectionError,
+    asyncio.TimeoutError,
+)
+# Failures after which the request may still have been processed upstream. A 408,
+# 425, 429 or 503 turned the request away before it reached the application.
+AMBIGUOUS_STATUS_CODES = frozenset({500, 502, 504})
+
+DEFAULT_BASE_DELAY_MS = 200
+DEFAULT_DEADLINE_SECONDS = 60
+
+
+def is_duplicate(result: Optional[ApiCallResult]) -> bool:
+    return bool(result) and DUPLICATE_RESERVATION_MESSAGE in (result.error_message or "")
+
+
+def retryable_exceptions() -> Tuple[type, ...]:
+    """RETRYABLE_EXCEPTIONS plus aiohttp's connection errors once aiohttp is loaded.
+
+    Only async_reservation_client imports aiohttp, so synchronous handlers
+    never pay for importing it.
+    """
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is None:
+        return RETRYABLE_EXCEPTIONS
+    return RETRYABLE_EXCEPTIONS + (aiohttp.ClientConnectionError,)
+
+
+def may_have_reached_server(result: Optional[ApiCallResult], error: Optional[BaseException] = None) -> bool:
+    """True when a failed attempt may still have been processed by hcafe.
+
+    Only then does a later duplicate-reservation answer confirm the order
+    (see RetryOutcome.ambiguous).
+    """
+    if error is None:
+        return result is not None and result.raw.get("statusCode") in AMBIGUOUS_STATUS_CODES
+    return _request_was_sent(error)
+
+
+def _request_was_sent(error: BaseException) -> bool:
+    sent = getattr(error, "request_sent", None)  # e.g. governor.CircuitOpenError
+    if sent is not None:
+        return sent
+    if isinstance(error, requests.ConnectTimeout):
+        return False
+    if isinstance(error, requests.Timeout):
+        return True  # read timeout: sent, the answer never came
+    if isinstance(error, (requests.exceptions.SSLError, requests.exceptions.ProxyError)):
+        return False
+    if isinstance(error, requests.ConnectionError):
+        # Connect failures arrive wrapped in MaxRetryError(reason=NewConnectionError
+        # or ConnectTimeoutError); a reset while waiting for the answer is a
+        # ProtocolError.
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, "reason", reason)
+        return not isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None and isinstance(
+        error, (aiohttp.ClientConnectorError, getattr(aiohttp, "ConnectionTimeoutError", ()))
+    ):
+        return False  # connect failed or timed out (ConnectionTimeoutError: aiohttp >= 3.10)
+    # asyncio.TimeoutError (total timeout), ServerDisconnectedError, ClientOSError, ...
+    return True
+
+
+def run_deadline(seconds: Optional[float] = None) -> float:
+    """Monotonic deadline ``RESERVATION_DEADLINE_SECONDS`` from now."""
+    if seconds is None:
+        seconds = float(os.environ.get("RESERVATION_DEADLINE_SECONDS", DEFAULT_DEADLINE_SECONDS))
+    return time.monotonic() + seconds
+
+
+def _transient_error_codes() -> frozenset:
+    raw = os.environ.get("HCAFE_TRANSIENT_ERROR_CODES", "")
+    return frozenset(int(code) for code in raw.split(",") if code.strip().lstrip("-").isdigit())
+
+
+@dataclass
+class RetryOutcome:
+    result: ApiCallResult
+    verdict: str  # SUCCESS, TERMINAL or RETRYABLE (attempts or deadline exhausted)
+    attempts: int
+    # An earlier attempt may have been processed by the server (read timeout,
+    # reset after sending, 500/502/504; see may_have_reached_server), so a
+    # duplicate answer afterwards most likely means that attempt succeeded.
+    ambiguous: bool = False
+
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter") bounded by attempts and a deadline.
+
+    ``max_attempts`` and ``max_delay`` come from the profile's ``max_retry`` and
+    ``retry_interval``; ``deadline`` is a ``time.monotonic()`` value shared by the
+    whole run, after which no new attempt is started.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 10,
+        base_delay: float = DEFAULT_BASE_DELAY_MS / 1000,
+        max_delay: float = 5.0,
+        deadline: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._transient_codes = _transient_error_codes()
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any], deadline: Optional[float] = None) -> "RetryPolicy":
+        base_ms = float(os.environ.get("RESERVATION_RETRY_BASE_MS", DEFAULT_BASE_DELAY_MS))
+        return cls(
+            max_attempts=int(payload.get("max_retry", 10)),
+            base_delay=base_ms / 1000,
+            max_delay=float(payload.get("retry_interval", 5)),
+            deadline=deadline,
+        )
+
+    def classify(self, result: Optional[ApiCallResult], error: Optional[BaseException] = None) -> str:
+        if error is not None:
+            return RETRYABLE if isinstance(error, retryable_exceptions()) else TERMINAL
+        if result.success:
+            return SUCCESS
+        if is_duplicate(result):
+            return TERMINAL
+        if result.raw.get("statusCode") in RETRYABLE_STATUS_CODES:
+            return RETRYABLE
+        if result.error_code in self._transient_codes:
+            return RETRYABLE
+        return TERMINAL
+
+    def backoff(self, retry_number: int) -> float:
+        return self._rng() * min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+
+    def expired(self) -> bool:
+        return self.deadline is not None and self._clock() >= self.deadline
+
+    def run(self, send: Callable[[], ApiCallResult], label: str, log: List[Dict[str, Any]]) -> RetryOutcome:
+        """Call ``send`` until it succeeds, fails terminally or the budget is spent.
+
+        Every attempt is appended to ``log`` (label, attempt, outcome, elapsedMs, ...).
+        """
+        attempt = 0
+        ambiguous = False
+        while True:
+            attempt += 1
+            started = self._clock()
+            try:
+                result, error = send(), None
+            except retryable_exceptions() as exc:
+                result, error = None, exc
+            outcome = self._record(label, attempt, started, result, error, ambiguous, log)
+            if outcome:
+                return outcome
+            ambiguous = ambiguous or may_have_reached_server(result, error)
+            delay = self._next_delay(attempt)
+            if delay is None:
+                return self._exhausted(result, error, attempt, ambiguous)
+            self._sleep(delay)
+
+    async def run_async(
+        self, send: Callable[[], Awaitable[ApiCallResult]], label: str, log: List[Dict[str, Any]]
+    ) -> RetryOutcome:
+        """:meth:`run` for coroutines."""
+        attempt = 0
+        ambiguous = False
+        while True:
+            attempt += 1
+            started = self._clock()
+            try:
+                result, error = await send(), None
+            except retryable_exceptions() as exc:
+                result, error = None, exc
+            outcome = self._record(label, attempt, started, result, error, ambiguous, log)
+            if outcome:
+                return outcome
+            ambiguous = ambiguous or may_have_reached_server(result, error)
+            delay = self._next_delay(attempt)
+            if delay is None:
+                return self._exhausted(result, error, attempt, ambiguous)
+            await asyncio.sleep(delay)
+
+    def _record(self, label, attempt, started, result, error, ambiguous, log) -> Optional[RetryOutcome]:
+        """Log the attempt; returns the final outcome unless it should be retried."""
+        verdict = self.classify(result, error)
+        entry: Dict[str, Any] = {
+            "label": label,
+            "attempt": attempt,
+            "outcome": verdict,
+            "elapsedMs": round((self._clock() - started) * 1000, 1),
+        }
+        if result is not None:
+            entry["statusCode"] = result.raw.get("statusCode")
+            entry["errorCode"] = result.error_code
+            if not result.success:
+                entry["error"] = result.error_message
+        else:
+            entry["error"] = f"{type(error).__name__}: {error}"
+        log.append(entry)
+        if verdict == RETRYABLE:
+            LOGGER.warning("%s attempt %d failed (%s), retrying", label, attempt, entry.get("error"))
+            return None
+        return RetryOutcome(result, verdict, attempt, ambiguous)
+
+    def _next_delay(self, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None when attempts/deadline are used up."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and self._clock() + delay >= self.deadline:
+            LOGGER.warning("Run deadline reached, no further retries")
+            return None
+        return delay
+
+    @staticmethod
+    def _exhausted(
+        result: Optional[ApiCallResult], error: Optional[BaseException], attempts: int, ambiguous: bool
+    ) -> RetryOutcome:
+        if result is None:
+            message = f"{type(error).__name__}: {error}"
+            result = ApiCallResult(False, None, message, {"error": message})
+        return RetryOutcome(result, RETRYABLE, attempts, ambiguous)
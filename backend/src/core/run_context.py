@@ -0,0 +1,164 @@
+"""State shared by every user processed in one worker run."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .models import ApiCallResult, Notification
+
+LOGGER = logging.getLogger()
+
+
+class _Flight:
+    """One fetch in progress; callers asking for its key meanwhile share its outcome."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[ApiCallResult] = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedFetchCache:
+    """Thread-safe cache of successful upstream reads with single-flight de-duplication.
+
+    While one thread fetches a key, other threads asking for the same key wait for
+    that fetch and get its result, or its exception, instead of sending their own
+    request. Only successful results are cached: the next caller after a failure
+    fetches again. Should the fetching thread die without an outcome, a waiter
+    takes over.
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[Hashable, ApiCallResult] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], ApiCallResult]) -> ApiCallResult:
+        while True:
+            with self._lock:
+                if key in self._results:
+                    self.hits += 1
+                    return self._results[key]
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = self._inflight[key] = _Flight()
+                    self.misses += 1
+                    break
+            flight.done.wait()
+            if flight.error is not None or flight.result is not None:
+                with self._lock:
+                    self.hits += 1
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+
+        try:
+            flight.result = fetch()
+            if flight.result.success:
+                with self._lock:
+                    self._results[key] = flight.result
+            return flight.result
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._results)}
+
+
+class AsyncSharedFetchCache:
+    """SharedFetchCache for coroutines running on one event loop.
+
+    A cancelled fetch hands over to a waiter instead of cancelling it.
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[Hashable, ApiCallResult] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[ApiCallResult]]) -> ApiCallResult:
+        while True:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                break
+            result, error = await asyncio.shield(waiter)
+            if error is not None or result is not None:
+                self.hits += 1
+                if error is not None:
+                    raise error
+                return result
+
+        self.misses += 1
+        # Resolves to (result, error) of the fetch; (None, None) when it was cancelled
+        flight = self._inflight[key] = asyncio.get_running_loop().create_future()
+        outcome: Tuple[Optional[ApiCallResult], Optional[BaseException]] = (None, None)
+        try:
+            result = await fetch()
+            outcome = (result, None)
+            if result.success:
+                self._results[key] = result
+            return result
+        except Exception as error:
+            outcome = (None, error)
+            raise
+        finally:
+            del self._inflight[key]
+            flight.set_result(outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._results)}
+
+
+class NotificationOutbox:
+    """Result emails queued during a run; sent in one go once the orders are out."""
+
+    def __init__(self) -> None:
+        self._items: List[Notification] = []
+        self._lock = threading.Lock()
+
+    def add(self, notification: Notification) -> None:
+        with self._lock:
+            self._items.append(notification)
+
+    def flush(self, notifier) -> Dict[str, int]:
+        """Send everything queued so far through ``notifier`` (a SesNotifier)."""
+        with self._lock:
+            items, self._items = self._items, []
+        if not items or notifier is None:
+            return {"queued": len(items), "sent": 0, "failed": 0}
+        return notifier.send_many(items)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+@dataclass
+class RunContext:
+    """Run-scoped collaborators handed to ReservationService.prepare/fire
+    (``async_cache`` to their async variants)."""
+
+    cache: SharedFetchCache = field(default_factory=SharedFetchCache)
+    async_cache: AsyncSharedFetchCache = field(default_factory=AsyncSharedFetchCache)
+    # time.monotonic() after which no new order attempt starts (see core.retry)
+    deadline: Optional[float] = None
+    # Result emails are queued here and flushed after the order phase.
+    outbox: NotificationOutbox = field(default_factory=NotificationOutbox)
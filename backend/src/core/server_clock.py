@@ -0,0 +1,125 @@
+"""Estimate how far the local clock is from the hcafe server clock."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+from .reservation_client import default_base_url
+
+LOGGER = logging.getLogger()
+
+
+@dataclass
+class ClockEstimate:
+    """offset = server time - local time, in seconds; error is the half-width of the bound."""
+
+    offset: float
+    error: float
+    samples: int
+    rtt: Optional[float] = None
+
+    def server_now(self) -> float:
+        return time.time() + self.offset
+
+
+class ServerClock:
+    """NTP-style offset estimation from HTTP ``Date`` headers.
+
+    ``Date`` only has one-second resolution, so every sample yields an interval:
+    the server second ``S`` was current at some point between send (``t0``) and
+    receive (``t1``), hence ``S - t1 <= offset < S + 1 - t0``. Intersecting those
+    intervals and timing each probe to land on the predicted second boundary
+    narrows the bound to roughly one round trip.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        timeout: float = 5.0,
+        samples: int = 8,
+    ) -> None:
+        self.url = (base_url or default_base_url()).rstrip("/") + "/"
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.samples = samples
+
+    def estimate(self) -> ClockEstimate:
+        lower, upper = -math.inf, math.inf
+        best_rtt: Optional[float] = None
+        taken = 0
+
+        for _ in range(self.samples):
+            if best_rtt is not None and math.isfinite(lower) and math.isfinite(upper):
+                self._sleep_to_boundary((lower + upper) / 2, best_rtt)
+
+            sample = self._sample()
+            if sample is None:
+                continue
+            server_second, t0, t1 = sample
+            taken += 1
+            rtt = t1 - t0
+            best_rtt = rtt if best_rtt is None else min(best_rtt, rtt)
+
+            new_lower = max(lower, server_second - t1)
+            new_upper = min(upper, server_second + 1 - t0)
+            if new_lower > new_upper:
+                # Inconsistent sample (e.g. a different backend behind the balancer);
+                # restart from this sample alone rather than trusting stale bounds.
+                new_lower, new_upper = server_second - t1, server_second + 1 - t0
+            lower, upper = new_lower, new_upper
+
+        if not taken:
+            LOGGER.warning("Clock sync: no usable Date header from %s, assuming local clock", self.url)
+            return ClockEstimate(0.0, math.inf, 0)
+
+        estimate = ClockEstimate((lower + upper) / 2, (upper - lower) / 2, taken, best_rtt)
+        LOGGER.info(
+            "Clock sync: offset %+.3fs (±%.3fs) from %d samples, rtt %.3fs",
+            estimate.offset, estimate.error, estimate.samples, estimate.rtt,
+        )
+        return estimate
+
+    def wait_until(self, server_target: datetime, estimate: ClockEstimate, lead: float = 0.0) -> float:
+        """Sleep until ``server_target`` (aware) minus ``lead`` seconds on the server clock.
+
+        Returns the local epoch time at which it woke up.
+        """
+        local_target = server_target.timestamp() - estimate.offset - lead
+        while True:
+            remaining = local_target - time.time()
+            if remaining <= 0:
+                return time.time()
+            # Coarse sleep first, then short naps for millisecond precision.
+            time.sleep(remaining - 0.05 if remaining > 0.1 else min(remaining, 0.001))
+
+    def _sample(self):
+        t0 = time.time()
+        try:
+            response = self.session.head(self.url, timeout=self.timeout, verify=False, allow_redirects=False)
+        except requests.RequestException as error:
+            LOGGER.warning("Clock sync probe failed: %s", error)
+            return None
+        t1 = time.time()
+        header = response.headers.get("Date")
+        if not header:
+            return None
+        try:
+            server_second = parsedate_to_datetime(header).timestamp()
+        except (TypeError, ValueError):
+            return None
+        return server_second, t0, t1
+
+    @staticmethod
+    def _sleep_to_boundary(offset: float, rtt: float) -> None:
+        # Aim for the request to reach the server right at the next full second.
+        arrival = time.time() + rtt / 2 + offset
+        time.sleep(math.ceil(arrival) - arrival)
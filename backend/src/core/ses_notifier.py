@@ -2,37 +2,142 @@
 
 from __future__ import annotations
 
+import json
+import logging
 import os
-from typing import Iterable, Optional
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-import boto3
 from botocore.exceptions import ClientError
 
+from . import aws_clients
+from .governor import TokenBucket
+from .models import Notification
+from .tracing import traced
+
+LOGGER = logging.getLogger()
+
+THROTTLE_ERROR_CODES = frozenset({"Throttling", "ThrottlingException", "TooManyRequestsException"})
+SEND_ATTEMPTS = 4
+MAX_BULK_DESTINATIONS = 50  # SES limit per SendBulkTemplatedEmail call
+
 
 class SesNotifier:
     def __init__(
         self,
         sender: Optional[str] = None,
         ses_client=None,
+        template_name: Optional[str] = None,
+        max_send_rate: Optional[float] = None,
+        concurrency: Optional[int] = None,
     ) -> None:
         self.sender = sender or os.environ.get("SES_SENDER_EMAIL")
-        self._ses = ses_client or boto3.client("ses") if self.sender else None
+        self._ses = ses_client or aws_clients.client("ses") if self.sender else None
+        # SES template with {{{subject}}} / {{{body}}} for bulk sends (optional).
+        self.template_name = template_name or os.environ.get("SES_TEMPLATE_NAME") or None
+        # Account sending rate in recipients per second (SES sandbox: 1).
+        rate = max_send_rate or float(os.environ.get("SES_MAX_SEND_RATE", "1"))
+        self._bucket = TokenBucket(rate, max(1, int(rate)))
+        self.concurrency = concurrency or int(os.environ.get("SES_SEND_CONCURRENCY", "4"))
 
-    def send(self, subject: str, body: str, recipients: Iterable[str]) -> None:
+    @traced("notify")
+    def send(self, subject: str, body: str, recipients: Iterable[str]) -> bool:
         if not self.sender or not self._ses:
-            return
+            return False
         targets = [addr for addr in recipients if addr]
         if not targets:
-            return
+            return False
         try:
-            self._ses.send_email(
-                Source=self.sender,
-                Destination={"ToAddresses": targets},
-                Message={
-                    "Subject": {"Data": subject, "Charset": "UTF-8"},
-                    "Body": {"Text": {"Data": body, "Charset": "UTF-8"}},
-                },
+            self._call(
+                lambda: self._ses.send_email(
+                    Source=self.sender,
+                    Destination={"ToAddresses": targets},
+                    Message={
+                        "Subject": {"Data": subject, "Charset": "UTF-8"},
+                        "Body": {"Text": {"Data": body, "Charset": "UTF-8"}},
+                    },
+                ),
+                len(targets),
             )
+            return True
         except ClientError as error:
             # Notification failures should not crash the Lambda invocation.
-            print(f"SES send failed: {error}")
+            LOGGER.warning("SES send failed: %s", error)
+            return False
+
+    def send_many(self, notifications: Sequence[Notification]) -> Dict[str, int]:
+        """Send queued notifications within the SES rate; returns sent/failed counts.
+
+        With ``template_name`` they go out through SendBulkTemplatedEmail first;
+        whatever bulk does not deliver is sent one by one, ``concurrency`` at a time.
+        """
+        pending = [notification for notification in notifications if any(notification.recipients)]
+        stats = {"queued": len(notifications), "bulk": 0, "sent": 0, "failed": 0}
+        if not self.sender or not self._ses or not pending:
+            return stats
+        if self.template_name:
+            delivered, pending = self._send_bulk(pending)
+            stats["bulk"] = stats["sent"] = delivered
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending))) as pool:
+                results = list(pool.map(lambda item: self.send(item.subject, item.body, item.recipients), pending))
+            stats["sent"] += sum(results)
+            stats["failed"] = len(results) - sum(results)
+        return stats
+
+    def _send_bulk(self, notifications: List[Notification]) -> Tuple[int, List[Notification]]:
+        """Returns the number delivered and the notifications bulk could not send."""
+        delivered = 0
+        leftovers: List[Notification] = []
+        for start in range(0, len(notifications), MAX_BULK_DESTINATIONS):
+            chunk = notifications[start:start + MAX_BULK_DESTINATIONS]
+            destinations = [
+                {
+                    "Destination": {"ToAddresses": [addr for addr in item.recipients if addr]},
+                    "ReplacementTemplateData": json.dumps(
+                        {"subject": item.subject, "body": item.body}, ensure_ascii=False
+                    ),
+                }
+                for item in chunk
+            ]
+            try:
+                response = self._call(
+                    lambda: self._ses.send_bulk_templated_email(
+                        Source=self.sender,
+                        Template=self.template_name,
+                        DefaultTemplateData=json.dumps({"subject": "", "body": ""}),
+                        Destinations=destinations,
+                    ),
+                    sum(len(destination["Destination"]["ToAddresses"]) for destination in destinations),
+                )
+            except ClientError as error:
+                LOGGER.warning("SES bulk send failed, sending individually: %s", error)
+                leftovers.extend(chunk)
+                continue
+            statuses = response.get("Status", [])
+            for index, item in enumerate(chunk):
+                if index < len(statuses) and statuses[index].get("Status") == "Success":
+                    delivered += 1
+                else:
+                    leftovers.append(item)
+        return delivered, leftovers
+
+    def _call(self, send: Callable[[], Any], recipients: int) -> Any:
+        """Run an SES call after taking ``recipients`` tokens; retries throttling."""
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = max(self._bucket.reserve() for _ in range(max(1, recipients)))
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return send()
+            except ClientError as error:
+                code = error.response.get("Error", {}).get("Code")
+                if code not in THROTTLE_ERROR_CODES or attempt == SEND_ATTEMPTS:
+                    raise
+                delay = random.random() * min(5.0, 0.5 * 2 ** attempt)
+                LOGGER.warning("SES throttled (%s), retrying in %.2fs", code, delay)
+                time.sleep(delay)
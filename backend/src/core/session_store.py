@@ -0,0 +1,129 @@
+"""Encrypted hcafe sessions persisted in DynamoDB so calls can skip the login."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .config_store import ConfigStore
+from .crypto import decrypt, encrypt
+from .models import LoginResult, UserPreferences
+from .reservation_client import ReservationClient
+from .tracing import traced
+
+if TYPE_CHECKING:
+    from .async_reservation_client import AsyncReservationClient
+
+LOGGER = logging.getLogger()
+
+DEFAULT_SESSION_TTL_SECONDS = 1800
+
+
+class SessionStore:
+    """Cookie jars of logged-in reservation clients, encrypted at ``USER#<id>/SESSION``.
+
+    Stored sessions are reused optimistically: nothing validates them up front.
+    An expired session (401/403, or an errorCode asking for a login, see
+    ``ReservationClient._session_expired``) makes the client log in again through
+    its ``reauthenticate`` hook and the fresh cookies replace the stored ones.
+    Secrets are only decrypted when a real login is needed. :meth:`login_async`
+    does the same for an ``AsyncReservationClient``.
+    """
+
+    def __init__(self, config_store: ConfigStore, ttl_seconds: Optional[float] = None) -> None:
+        self.config_store = config_store
+        self.ttl_seconds = ttl_seconds or float(
+            os.environ.get("HCAFE_SESSION_TTL_SECONDS", DEFAULT_SESSION_TTL_SECONDS)
+        )
+
+    def login(self, client: ReservationClient, preferences: UserPreferences) -> LoginResult:
+        """Log ``client`` in as the user, reusing the stored session when it has not expired."""
+        client.reauthenticate = lambda: self._fresh_login(client, preferences).success
+        if self.restore(client, preferences.user_id):
+            LOGGER.info("Reusing stored hcafe session for %s", preferences.user_id)
+            return LoginResult(True, "Reused stored session")
+        return self._fresh_login(client, preferences)
+
+    async def login_async(self, client: AsyncReservationClient, preferences: UserPreferences) -> LoginResult:
+        """:meth:`login` for an AsyncReservationClient; DynamoDB/KMS work runs in threads."""
+
+        inflight: List[asyncio.Task] = []
+
+        async def reauthenticate() -> bool:
+            # Concurrent requests of the run (existing reservations + menu list)
+            # expire together; they share one login instead of racing.
+            if not inflight:
+                inflight.append(asyncio.ensure_future(self._fresh_login_async(client, preferences)))
+                inflight[0].add_done_callback(lambda _task: inflight.clear())
+            return (await asyncio.shield(inflight[0])).success
+
+        client.reauthenticate = reauthenticate
+        cookies = await asyncio.to_thread(self.load, preferences.user_id)
+        if cookies is not None:
+            client.import_cookies(cookies)
+            LOGGER.info("Reusing stored hcafe session for %s", preferences.user_id)
+            return LoginResult(True, "Reused stored session")
+        return await self._fresh_login_async(client, preferences)
+
+    def restore(self, client: ReservationClient, user_id: str) -> bool:
+        cookies = self.load(user_id)
+        if cookies is None:
+            return False
+        client.import_cookies(cookies)
+        return True
+
+    @traced("sessionRestore")
+    def load(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """The stored, unexpired cookies of ``user_id``, or None."""
+        try:
+            item = self.config_store.get_session(user_id)
+        except RuntimeError as error:
+            LOGGER.warning("Could not load stored session for %s: %s", user_id, error)
+            return None
+        if not item or int(item.get("expiresAt", 0)) <= time.time():
+            return None
+        try:
+            return json.loads(decrypt(item["cookies_encrypted"]))
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.warning("Discarding unreadable stored session for %s: %s", user_id, error)
+            return None
+
+    def save(self, client: ReservationClient, user_id: str) -> None:
+        self.store(user_id, client.export_cookies())
+
+    @traced("sessionSave")
+    def store(self, user_id: str, cookies: List[Dict[str, Any]]) -> None:
+        if not cookies:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        cookie_expiries = [cookie["expires"] for cookie in cookies if cookie.get("expires")]
+        if cookie_expiries:
+            expires_at = min(expires_at, min(cookie_expiries))
+        try:
+            encrypted, _ = encrypt(json.dumps(cookies))
+            self.config_store.save_session(user_id, encrypted, int(expires_at))
+        except Exception as error:  # pylint: disable=broad-except
+            # Only costs a login next time.
+            LOGGER.warning("Could not store hcafe session for %s: %s", user_id, error)
+
+    def _fresh_login(self, client: ReservationClient, preferences: UserPreferences) -> LoginResult:
+        if not preferences.secrets_loaded:
+            self.config_store.decrypt_secrets(preferences)
+        client.clear_cookies()
+        result = client.login(preferences.user_id, preferences.password, preferences.raw_payload)
+        if result.success:
+            self.save(client, preferences.user_id)
+        return result
+
+    async def _fresh_login_async(self, client: AsyncReservationClient, preferences: UserPreferences) -> LoginResult:
+        if not preferences.secrets_loaded:
+            await asyncio.to_thread(self.config_store.decrypt_secrets, preferences)
+        client.clear_cookies()
+        result = await client.login(preferences.user_id, preferences.password, preferences.raw_payload)
+        if result.success:
+            await asyncio.to_thread(self.store, preferences.user_id, client.export_cookies())
+        return result
@@ -0,0 +1,213 @@
+"""Per-phase timings of a reservation run.
+
+A :class:`Trace` is active for one user's run (see ``ReservationService``).
+Functions decorated with :func:`traced` record a span into the active trace;
+without one they only pay a context variable lookup. When the run settles the
+spans go into ``ReservationAttempt.details["phases"]``, one CloudWatch Embedded
+Metric Format line and, when Lambda tracing is active, X-Ray subsegments.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+LOGGER = logging.getLogger()
+
+DEFAULT_METRICS_NAMESPACE = "HGreenFoodAutoReserve"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_CURRENT: ContextVar[Optional["Trace"]] = ContextVar("reservation_trace", default=None)
+_XRAY_RECORDER: Any = None  # False once aws_xray_sdk turned out to be unavailable
+
+
+@dataclass
+class Span:
+    name: str
+    started_at: float  # epoch seconds
+    duration_ms: float
+    error: Optional[str] = None  # exception type that ended the span
+
+
+class Trace:
+    """Spans recorded for one reservation run, across threads and tasks."""
+
+    def __init__(self, name: str = "reservation") -> None:
+        self.name = name
+        self.annotations: Dict[str, str] = {}
+        self.spans: List[Span] = []
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+
+    def record(self, span: Span) -> None:
+        self.spans.append(span)  # list.append is atomic; spans may come from threads
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def phases(self) -> List[Dict[str, Any]]:
+        """Spans in start order, for ``ReservationAttempt.details``."""
+        phases = []
+        for span in sorted(self.spans, key=lambda item: item.started_at):
+            phase: Dict[str, Any] = {
+                "phase": span.name,
+                "offsetMs": round((span.started_at - self.started_at) * 1000, 1),
+                "ms": round(span.duration_ms, 1),
+            }
+            if span.error:
+                phase["error"] = span.error
+            phases.append(phase)
+        return phases
+
+    def totals(self) -> Dict[str, float]:
+        """Summed duration (ms) per phase name."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return totals
+
+
+def current() -> Optional[Trace]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def activate(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make ``trace`` the active trace of this context (threads/tasks started inside inherit it)."""
+    token = _CURRENT.set(trace)
+    try:
+        yield trace
+    finally:
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = _CURRENT.get()
+    if trace is None:
+        yield
+        return
+    started_at = time.time()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        trace.record(Span(name, started_at, (time.perf_counter() - started) * 1000, error))
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Record every call of the decorated function (sync or async) as span ``name``."""
+
+    def decorate(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def publish(trace: Trace, outcome: str) -> None:
+    """Emit the finished trace as an EMF metric line and X-Ray subsegments (best effort)."""
+    try:
+        if _emf_enabled():
+            sys.stdout.write(json.dumps(emf_document(trace, outcome), ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+        if os.environ.get("AWS_XRAY_DAEMON_ADDRESS"):
+            _export_xray(trace, outcome)
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.warning("Publishing reservation trace failed: %s", error)
+
+
+def emf_document(trace: Trace, outcome: str) -> Dict[str, Any]:
+    """CloudWatch Embedded Metric Format: one millisecond metric per phase plus ``total``."""
+    values = {name: round(ms, 1) for name, ms in trace.totals().items()}
+    values["total"] = round(trace.elapsed_ms(), 1)
+    document: Dict[str, Any] = {
+        "_aws": {
+            "Timestamp": int(trace.started_at * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": os.environ.get("METRICS_NAMESPACE", DEFAULT_METRICS_NAMESPACE),
+                "Dimensions": [["Outcome"]],
+                "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in values],
+            }],
+        },
+        "Outcome": outcome,
+    }
+    document.update(trace.annotations)  # searchable properties, not dimensions
+    document.update(values)
+    return document
+
+
+def _emf_enabled() -> bool:
+    value = os.environ.get("EMF_METRICS")
+    if value is None:
+        return bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+    return value.lower() in ("true", "1", "yes")
+
+
+def _export_xray(trace: Trace, outcome: str) -> None:
+    """Replay the spans as subsegments of the invocation's segment.
+
+    Done once the run is over, from a single thread: live subsegments would
+    interleave between the users sharing a thread or an event loop.
+    """
+    recorder = _xray_recorder()
+    if recorder is None:
+        return
+    parent = recorder.begin_subsegment(trace.name)
+    if parent is None:
+        return
+    parent.start_time = trace.started_at
+    parent.put_annotation("outcome", outcome)
+    for key, value in trace.annotations.items():
+        parent.put_annotation(key, value)
+    for item in sorted(trace.spans, key=lambda entry: entry.started_at):
+        subsegment = recorder.begin_subsegment(item.name)
+        if subsegment is None:
+            continue
+        subsegment.start_time = item.started_at
+        if item.error:
+            subsegment.add_fault_flag()
+            subsegment.put_metadata("error", item.error)
+        recorder.end_subsegment(item.started_at + item.duration_ms / 1000)
+    recorder.end_subsegment(trace.started_at + trace.elapsed_ms() / 1000)
+
+
+def _xray_recorder() -> Any:
+    """The X-Ray SDK recorder, imported on first use; None without aws_xray_sdk."""
+    global _XRAY_RECORDER
+    if _XRAY_RECORDER is None:
+        try:
+            from aws_xray_sdk.core import xray_recorder
+        except ImportError:
+            LOGGER.info("aws_xray_sdk not installed; X-Ray subsegments disabled")
+            _XRAY_RECORDER = False
+        else:
+            xray_recorder.configure(context_missing="LOG_ERROR")
+            _XRAY_RECORDER = xray_recorder
+    return _XRAY_RECORDER or None
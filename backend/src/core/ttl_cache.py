@@ -0,0 +1,110 @@
+"""Small thread-safe LRU cache with per-entry expiry and negative entries."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class CachedFailure(RuntimeError):
+    """Raised by TtlCache.get for a key whose last load failed recently."""
+
+
+class _Failure:
+    __slots__ = ("message",)
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+class TtlCache:
+    """LRU mapping whose entries expire ``ttl`` seconds after being set.
+
+    Holds at most ``maxsize`` entries (None: unbounded, expiry only).
+
+    ``set_failure`` stores a negative entry for ``negative_ttl`` seconds; ``get``
+    raises CachedFailure for it so a failing source is not retried on every lookup.
+    Lives at module level so warm Lambda containers keep it across invocations.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        negative_ttl: float = 30.0,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    if isinstance(value, _Failure):
+                        self.negative_hits += 1
+                        raise CachedFailure(value.message)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def set_failure(self, key: Hashable, error: BaseException) -> None:
+        self.set(key, _Failure(f"{type(error).__name__}: {error}"), ttl=self.negative_ttl)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.negative_hits = 0
+            self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a fresh entry exists (not counted as a hit or miss)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > self._clock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.negative_hits
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "negativeHits": self.negative_hits,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "hitRate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -1,10 +1,9 @@
 """Get user settings handler"""
 import os
-import json
 import logging
-import boto3
 from typing import Any, Dict
-from core import ConfigStore
+from core import ConfigStore, aws_clients
+from core.http import json_body, json_response
 
 LOGGER = logging.getLogger()
 if not LOGGER.handlers:
@@ -23,16 +22,10 @@ def get_user_settings_handler(event: Dict[str, Any], _context: Any) -> Dict[str,
         
         if not user_id:
             # Body에서도 시도
-            body = event.get("body")
-            if body:
-                if event.get("isBase64Encoded"):
-                    import base64
-                    body = base64.b64decode(body).decode()
-                payload = json.loads(body)
-                user_id = payload.get("userId")
+            user_id = json_body(event).get("userId")
         
         if not user_id:
-            return _response(400, {"message": "userId is required"})
+            return json_response(400, {"message": "userId is required"})
         
         LOGGER.info("Fetching settings for user: %s", user_id)
         
@@ -41,18 +34,18 @@ def get_user_settings_handler(event: Dict[str, Any], _context: Any) -> Dict[str,
         if not master_password:
             ssm_param = os.environ.get("MASTER_PASSWORD_SSM_PARAM")
             if ssm_param:
-                ssm_client = boto3.client("ssm")
+                ssm_client = aws_clients.client("ssm")
                 response = ssm_client.get_parameter(Name=ssm_param, WithDecryption=True)
                 master_password = response["Parameter"]["Value"]
         
         if not master_password:
-            return _response(500, {"message": "Master password not configured"})
+            return json_response(500, {"message": "Master password not configured"})
         
         # Get user preferences
         config_store = ConfigStore()
-        preferences = config_store.get_user_preferences(user_id)
+        preferences = config_store.get_user_preferences(user_id, decrypt=False)
         
-        return _response(200, {
+        return json_response(200, {
             "userId": user_id,
             "menuSeq": ",".join(preferences.menu_sequence),  # Convert back to string format
             "floorNm": preferences.floor_name,
@@ -62,17 +55,5 @@ def get_user_settings_handler(event: Dict[str, Any], _context: Any) -> Dict[str,
     except Exception as error:
         LOGGER.error("=== GET USER SETTINGS HANDLER FAILED ===")
         LOGGER.exception("Error getting settings: %s", str(error))
-        return _response(500, {"message": str(error)})
+        return json_response(500, {"message": str(error)})
 
-
-def _response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*",
-        },
-        "body": json.dumps(body, ensure_ascii=False),
-    }
@@ -1,11 +1,10 @@
 """Immediate reservation handler"""
 import os
-import json
 import logging
-import boto3
 from typing import Any, Dict
 from datetime import datetime, timedelta
-from core import ConfigStore, ReservationClient, HolidayService, ReservationService, SesNotifier
+from core import ConfigStore, ReservationClient, HolidayService, ReservationService, SesNotifier, SessionStore
+from core.http import json_body, json_response
 
 LOGGER = logging.getLogger()
 if not LOGGER.handlers:
@@ -16,22 +15,16 @@ LOGGER.setLevel(logging.INFO)
 def immediate_reservation_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
     """즉시 예약 실행"""
     LOGGER.info("=== IMMEDIATE RESERVATION HANDLER STARTED ===")
-    LOGGER.info("Received immediate reservation request: %s", event)
     
     try:
         LOGGER.info("Step 1: Parsing request body")
-        body = event.get("body")
-        if event.get("isBase64Encoded"):
-            import base64
-            body = base64.b64decode(body).decode()
-        payload = json.loads(body) if body else {}
-        LOGGER.info("Parsed payload: %s", payload)
+        payload = json_body(event)
         
         LOGGER.info("Step 2: Validating required fields")
         user_id = payload.get("userId")
         if not user_id:
             LOGGER.warning("No userId provided")
-            return _response(400, {"message": "userId is required"})
+            return json_response(400, {"message": "userId is required"})
         
         LOGGER.info("User ID: %s", user_id)
         
@@ -56,6 +49,7 @@ def immediate_reservation_handler(event: Dict[str, Any], _context: Any) -> Dict[
             holiday_service=holiday_service,
             notifier=notifier,
             timezone=timezone,
+            session_store=SessionStore(config_store),
         )
         
         LOGGER.info("Step 4: Making immediate reservation")
@@ -63,7 +57,7 @@ def immediate_reservation_handler(event: Dict[str, Any], _context: Any) -> Dict[
         result = service.run(user_id=user_id, service_date=None)
         
         LOGGER.info("=== IMMEDIATE RESERVATION HANDLER COMPLETED ===")
-        return _response(200, {
+        return json_response(200, {
             "success": result.success,
             "message": result.message,
             "targetDate": result.target_date.isoformat(),
@@ -74,17 +68,4 @@ def immediate_reservation_handler(event: Dict[str, Any], _context: Any) -> Dict[
     except Exception as error:
         LOGGER.error("=== IMMEDIATE RESERVATION HANDLER FAILED ===")
         LOGGER.exception("Error making immediate reservation: %s", str(error))
-        return _response(500, {"message": str(error)})
-
-
-def _response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*",
-        },
-        "body": json.dumps(body, ensure_ascii=False),
-    }
+        return json_response(500, {"message": str(error)})
@@ -1,11 +1,10 @@
 import os
-import json
 import logging
-import base64
 import secrets
 from typing import Any, Dict
-from core import ConfigStore
+from core import ConfigStore, EmailAlreadyRegistered, UserLimitReached
 from core.crypto import encrypt
+from core.http import json_body, json_response
 
 LOGGER = logging.getLogger()
 if not LOGGER.handlers:
@@ -14,16 +13,10 @@ LOGGER.setLevel(logging.INFO)
 
 def register_user_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
     LOGGER.info("=== REGISTER USER HANDLER STARTED ===")
-    LOGGER.info("Received user registration event: %s", event)
     
     try:
         LOGGER.info("Step 1: Parsing request body")
-        body = event.get("body")
-        if event.get("isBase64Encoded"):
-            LOGGER.info("Body is base64 encoded, decoding...")
-            body = base64.b64decode(body).decode()
-        payload = json.loads(body) if body else {}
-        LOGGER.info("Parsed payload: %s", {k: v if k not in ['password', 'pin'] else '***' for k, v in payload.items()})
+        payload = json_body(event)
 
         LOGGER.info("Step 2: Validating required fields")
         # PIN is no longer required from user
@@ -31,14 +24,7 @@ def register_user_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any
         missing = [f for f in required_fields if not payload.get(f)]
         if missing:
             LOGGER.warning("Missing required fields: %s", missing)
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({"message": f"Missing fields: {', '.join(missing)}"})
-            }
+            return json_response(400, {"message": f"Missing fields: {', '.join(missing)}"})
 
         user_id = payload["userId"]
         password = payload["password"]
@@ -53,14 +39,7 @@ def register_user_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any
         import re
         if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
             LOGGER.warning("Invalid email format: %s", email)
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({"message": "Invalid email format"})
-            }
+            return json_response(400, {"message": "Invalid email format"})
 
         LOGGER.info("Step 4: Encrypting user credentials (KMS)")
         try:
@@ -75,15 +54,8 @@ def register_user_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any
 
         LOGGER.info("Step 5: Processing device fingerprint")
         device_fingerprint = payload.get("deviceFingerprint")
-        devices = []
         if device_fingerprint:
             LOGGER.info("Device fingerprint provided: %s", device_fingerprint)
-            from datetime import datetime
-            devices = [{
-                "fingerprint": device_fingerprint,
-                "registeredAt": datetime.utcnow().isoformat(),
-                "lastAccessAt": datetime.utcnow().isoformat()
-            }]
         else:
             LOGGER.info("No device fingerprint provided")
         
@@ -99,7 +71,7 @@ def register_user_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any
             "email": email,
             "notificationEmails": [email],  # Enable reservation notifications by default
             "autoReservationEnabled": True,  # Enable auto-reservation by default
-            "devices": devices,
+            "devices": {},  # fingerprint -> registeredAt; kept by save_profile on re-registration
             "_salt": salt,  # Kept for schema compatibility, though KMS doesn't use it for decryption
         }
         LOGGER.info("Item built with keys: %s", list(item.keys()))
@@ -109,27 +81,23 @@ def register_user_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any
         LOGGER.info("ConfigStore initialized, table name: %s", config_store.table_name)
         
         LOGGER.info("Step 8: Saving profile to DynamoDB")
-        config_store.save_profile(item)
+        try:
+            config_store.save_profile(item, max_users=int(os.environ.get("MAX_USERS", "10")))
+        except UserLimitReached as error:
+            LOGGER.warning("Registration rejected: %s", error)
+            return json_response(403, {"message": "Registration is full"})
+        except EmailAlreadyRegistered as error:
+            LOGGER.warning("Registration rejected: %s", error)
+            return json_response(409, {"message": "Email already registered"})
         LOGGER.info("Profile saved successfully to DynamoDB")
+        if device_fingerprint:
+            config_store.register_device(user_id, email, device_fingerprint)
+            LOGGER.info("Device registered")
         
         LOGGER.info("=== REGISTER USER HANDLER COMPLETED SUCCESSFULLY ===")
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({"message": "User registered successfully", "userId": user_id})
-        }
+        return json_response(200, {"message": "User registered successfully", "userId": user_id})
     except Exception as error:
         LOGGER.error("=== REGISTER USER HANDLER FAILED ===")
         LOGGER.exception("Error registering user: %s", str(error))
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({"message": str(error)})
-        }
+        return json_response(500, {"message": str(error)})
 
@@ -0,0 +1,9 @@
+"""Unit tests of backend/src (python -m pytest backend/tests); no AWS or hcafe access."""
+import os
+import sys
+
+# Add backend/src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+os.environ.setdefault('CONFIG_TABLE_NAME', 'HGreenFoodAutoReserve')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-northeast-2')
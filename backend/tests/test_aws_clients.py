@@ -0,0 +1,37 @@
+import threading
+import unittest
+
+from core import aws_clients
+from core.config_store import ConfigStore
+
+
+def in_thread(function):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class ThreadResourceTest(unittest.TestCase):
+    def setUp(self):
+        aws_clients.clear()
+        self.addCleanup(aws_clients.clear)
+
+    def test_each_thread_gets_its_own_resource(self):
+        mine = aws_clients.thread_resource("dynamodb")
+        self.assertIs(aws_clients.thread_resource("dynamodb"), mine)
+        other = in_thread(lambda: aws_clients.thread_resource("dynamodb"))
+        self.assertIsNot(other, mine)
+
+    def test_config_store_tables_are_per_thread(self):
+        store = ConfigStore(table_name="t", default_config={})
+        table = store._table
+        self.assertIs(store._table, table)
+        other = in_thread(lambda: store._table)
+        self.assertIsNot(other, table)
+        self.assertEqual(other.name, "t")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from datetime import date
+
+from core.business_calendar import BusinessCalendar
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Holidays:
+    """holidays_for stub: month -> YYYYMMDD strings, None for unknown months."""
+
+    def __init__(self, months=None):
+        self.months = dict(months or {})
+        self.calls = 0
+
+    def __call__(self, year, month):
+        self.calls += 1
+        return self.months.get((year, month), set())
+
+
+class BusinessCalendarTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def calendar(self, holidays, ttl=None):
+        return BusinessCalendar(holidays, ttl=ttl, clock=self.clock)
+
+    def test_weekends_and_holidays_are_skipped(self):
+        # 2026-10-09 (Fri) is Hangul Day
+        calendar = self.calendar(Holidays({(2026, 10): {"20261009"}}))
+        self.assertFalse(calendar.is_workday(date(2026, 10, 9)))
+        self.assertFalse(calendar.is_workday(date(2026, 10, 10)))
+        self.assertEqual(calendar.next_workday(date(2026, 10, 8)), date(2026, 10, 12))
+        self.assertEqual(calendar.previous_workday(date(2026, 10, 12)), date(2026, 10, 8))
+        self.assertEqual(calendar.nearest_workday(date(2026, 10, 8)), date(2026, 10, 8))
+
+    def test_next_workday_crosses_the_year(self):
+        calendar = self.calendar(Holidays({(2027, 1): {"20270101"}}))
+        self.assertEqual(calendar.next_workday(date(2026, 12, 31)), date(2027, 1, 4))
+        self.assertEqual(calendar.previous_workday(date(2027, 1, 4)), date(2026, 12, 31))
+
+    def test_built_year_is_reused_until_ttl(self):
+        holidays = Holidays()
+        calendar = self.calendar(holidays, ttl=60.0)
+        calendar.is_workday(date(2026, 10, 8))
+        calendar.is_workday(date(2026, 3, 2))
+        self.assertEqual(holidays.calls, 12)
+
+        self.clock.now = 60.0
+        holidays.months[(2026, 10)] = {"20261008"}
+        self.assertFalse(calendar.is_workday(date(2026, 10, 8)))
+        self.assertEqual(holidays.calls, 24)
+
+    def test_year_with_unknown_month_is_not_cached(self):
+        holidays = Holidays({(2026, 10): None})
+        calendar = self.calendar(holidays)
+        # Unknown month: weekends only
+        self.assertTrue(calendar.is_workday(date(2026, 10, 9)))
+        self.assertEqual(holidays.calls, 12)
+
+        holidays.months[(2026, 10)] = {"20261009"}
+        self.assertFalse(calendar.is_workday(date(2026, 10, 9)))
+        self.assertEqual(holidays.calls, 24)
+        calendar.is_workday(date(2026, 10, 9))
+        self.assertEqual(holidays.calls, 24)
+
+    def test_invalidate_splices_one_month(self):
+        holidays = Holidays()
+        calendar = self.calendar(holidays)
+        self.assertTrue(calendar.is_workday(date(2026, 10, 9)))
+        holidays.months[(2026, 10)] = {"20261009"}
+        calendar.invalidate(2026, 10)
+        self.assertEqual(holidays.calls, 13)
+        self.assertFalse(calendar.is_workday(date(2026, 10, 9)))
+        self.assertTrue(calendar.is_workday(date(2026, 10, 8)))
+        self.assertEqual(holidays.calls, 13)
+
+    def test_invalidate_to_unknown_month_drops_the_year(self):
+        holidays = Holidays()
+        calendar = self.calendar(holidays)
+        calendar.is_workday(date(2026, 10, 9))
+        holidays.months[(2026, 10)] = None
+        calendar.invalidate(2026, 10)
+        holidays.months[(2026, 10)] = {"20261009"}
+        self.assertFalse(calendar.is_workday(date(2026, 10, 9)))
+
+    def test_invalidate_ignores_unbuilt_years(self):
+        holidays = Holidays()
+        calendar = self.calendar(holidays)
+        calendar.invalidate(2026, 10)
+        self.assertEqual(holidays.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
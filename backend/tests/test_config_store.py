@@ -0,0 +1,225 @@
+import os
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from core.config_store import ACTIVE_USERS_INDEXED_KEY, USER_COUNT_KEY, ConfigStore, EmailAlreadyRegistered, UserLimitReached
+
+
+def conditional_check_failed():
+    return ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+
+
+def transaction_cancelled(*codes):
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException"},
+            "CancellationReasons": [{"Code": code} for code in codes],
+        },
+        "TransactWriteItems",
+    )
+
+
+class FakeTable:
+    """Items by (PK, SK); each write pops the next scripted error (None: succeed)."""
+
+    def __init__(self):
+        self.items = {}
+        self.errors = []
+        self.calls = []
+        self.scans = []
+        self.queries = []
+        self.meta = self
+        self.client = self
+
+    def _next_error(self):
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+
+    def get_item(self, Key):
+        item = self.items.get((Key["PK"], Key["SK"]))
+        return {"Item": dict(item)} if item else {}
+
+    def put_item(self, Item, **kwargs):
+        self.calls.append(("put_item", Item, kwargs))
+        self._next_error()
+        self.items[(Item["PK"], Item["SK"])] = dict(Item)
+
+    def transact_write_items(self, TransactItems):
+        self.calls.append(("transact_write_items", TransactItems))
+        self._next_error()
+
+    def query(self, **kwargs):
+        self.queries.append(kwargs)
+        return {"Items": [item for item in self.items.values() if "activeSite" in item]}
+
+    def scan(self, **kwargs):
+        self.scans.append(kwargs)
+        if "IndexName" in kwargs:
+            return {"Items": [item for item in self.items.values() if "activeSite" in item]}
+        profiles = [item for key, item in self.items.items() if key[0].startswith("USER#") and key[1] == "PROFILE"]
+        if kwargs.get("Select") == "COUNT":
+            return {"Count": len(profiles)}
+        segment, segments = kwargs.get("Segment", 0), kwargs.get("TotalSegments", 1)
+        return {"Items": profiles[segment::segments]}
+
+
+class FakeResource:
+    def __init__(self, table):
+        self.table = table
+
+    def Table(self, _name):
+        return self.table
+
+
+def profile(user_id="alice", email="a@example.com"):
+    return {"PK": f"USER#{user_id}", "SK": "PROFILE", "userId": user_id, "email": email,
+            "autoReservationEnabled": False}
+
+
+class ConfigStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = FakeTable()
+        self.store = ConfigStore(table_name="t", dynamodb_resource=FakeResource(self.table), default_config={})
+
+
+class EmailIndexTest(ConfigStoreTestCase):
+    def test_new_profile_writes_conditional_pointer_in_the_transaction(self):
+        self.store.save_profile(profile(), max_users=10)
+        _, items = self.table.calls[-1]
+        profile_put, counter, pointer = items
+        self.assertEqual(profile_put["Put"]["ConditionExpression"], "attribute_not_exists(PK)")
+        self.assertEqual(counter["Update"]["Key"], USER_COUNT_KEY)
+        self.assertEqual(pointer["Put"]["Item"]["PK"], "EMAIL#a@example.com")
+        self.assertEqual(pointer["Put"]["ConditionExpression"], "attribute_not_exists(PK) OR userId = :uid")
+        self.assertEqual(pointer["Put"]["ExpressionAttributeValues"], {":uid": "alice"})
+
+    def test_email_of_another_user_is_rejected(self):
+        self.table.errors = [transaction_cancelled("None", "None", "ConditionalCheckFailed")]
+        with self.assertRaises(EmailAlreadyRegistered):
+            self.store.save_profile(profile(), max_users=10)
+
+    def test_email_conflict_on_existing_profile(self):
+        self.table.items[("USER#alice", "PROFILE")] = profile()
+        self.table.errors = [transaction_cancelled("None", "ConditionalCheckFailed")]
+        with self.assertRaises(EmailAlreadyRegistered):
+            self.store.save_profile(profile(email="b@example.com"))
+
+    def test_re_registration_keeps_the_device_map(self):
+        self.table.items[("USER#alice", "PROFILE")] = {**profile(), "devices": {"fp1": "2025-01-01T00:00:00"}}
+        self.store.save_profile({**profile(), "devices": {}}, max_users=10)
+        _, items = self.table.calls[-1]
+        self.assertEqual(items[0]["Put"]["Item"]["devices"], {"fp1": "2025-01-01T00:00:00"})
+        self.assertNotIn("ConditionExpression", items[0]["Put"])
+
+    def test_full_registration_still_reports_the_user_limit(self):
+        self.table.items[("META", "USER_COUNT")] = {**USER_COUNT_KEY, "count": 10}
+        self.table.errors = [transaction_cancelled("None", "ConditionalCheckFailed", "None")]
+        with self.assertRaises(UserLimitReached):
+            self.store.save_profile(profile(), max_users=10)
+
+    def test_save_email_index_is_conditional(self):
+        self.store.save_email_index("A@example.com ", "alice")
+        _, item, kwargs = self.table.calls[-1]
+        self.assertEqual(item["PK"], "EMAIL#a@example.com")
+        self.assertEqual(kwargs["ConditionExpression"], "attribute_not_exists(PK) OR userId = :uid")
+
+        self.table.errors = [conditional_check_failed()]
+        with self.assertRaises(EmailAlreadyRegistered):
+            self.store.save_email_index("a@example.com", "bob")
+
+
+class ReconcileUserCountTest(ConfigStoreTestCase):
+    def add_profiles(self, *user_ids):
+        for user_id in user_ids:
+            self.table.items[(f"USER#{user_id}", "PROFILE")] = profile(user_id)
+
+    def test_seeds_a_missing_counter_only_if_still_missing(self):
+        self.add_profiles("alice", "bob")
+        self.assertEqual(self.store.reconcile_user_count(), {"previous": None, "count": 2})
+        self.assertTrue(self.table.scans[-1]["ConsistentRead"])
+        _, item, kwargs = self.table.calls[-1]
+        self.assertEqual(item["count"], 2)
+        self.assertEqual(kwargs["ConditionExpression"], "attribute_not_exists(#count)")
+
+    def test_put_is_conditional_on_the_count_read(self):
+        self.table.items[("META", "USER_COUNT")] = {**USER_COUNT_KEY, "count": 5}
+        self.add_profiles("alice")
+        self.assertEqual(self.store.reconcile_user_count(), {"previous": 5, "count": 1})
+        _, _, kwargs = self.table.calls[-1]
+        self.assertEqual(kwargs["ConditionExpression"], "#count = :previous")
+        self.assertEqual(kwargs["ExpressionAttributeValues"], {":previous": 5})
+
+    def test_recounts_when_the_counter_changed_meanwhile(self):
+        self.table.items[("META", "USER_COUNT")] = {**USER_COUNT_KEY, "count": 1}
+        self.add_profiles("alice")
+        original_put = self.table.put_item
+
+        def put_after_registration(Item, **kwargs):
+            # A registration commits between the count and the Put
+            if not self.table.calls:
+                self.add_profiles("bob")
+                self.table.items[("META", "USER_COUNT")]["count"] = 2
+                self.table.errors = [conditional_check_failed()]
+            return original_put(Item, **kwargs)
+
+        self.table.put_item = put_after_registration
+        self.assertEqual(self.store.reconcile_user_count(), {"previous": 2, "count": 2})
+        self.assertEqual(len(self.table.calls), 2)
+
+    def test_gives_up_after_repeated_conflicts(self):
+        self.table.errors = [conditional_check_failed()] * 3
+        with self.assertRaisesRegex(RuntimeError, "kept changing"):
+            self.store.reconcile_user_count(attempts=3)
+        self.assertEqual(len(self.table.calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        self.table.errors = [ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem")]
+        with self.assertRaisesRegex(RuntimeError, "Failed to store user count"):
+            self.store.reconcile_user_count()
+        self.assertEqual(len(self.table.calls), 1)
+
+
+class GetAllUserProfilesTest(ConfigStoreTestCase):
+    def test_small_table_is_scanned_in_one_segment(self):
+        self.table.items[("META", "USER_COUNT")] = {**USER_COUNT_KEY, "count": 2}
+        self.table.items[("USER#alice", "PROFILE")] = profile("alice")
+        self.assertEqual([item["userId"] for item in self.store.get_all_user_profiles()], ["alice"])
+        self.assertNotIn("TotalSegments", self.table.scans[-1])
+
+    def test_segments_are_sized_from_the_user_counter(self):
+        self.table.items[("META", "USER_COUNT")] = {**USER_COUNT_KEY, "count": 300}
+        for index in range(3):
+            self.table.items[(f"USER#u{index}", "PROFILE")] = profile(f"u{index}")
+        profiles = self.store.get_all_user_profiles()
+        self.assertEqual(sorted(item["userId"] for item in profiles), ["u0", "u1", "u2"])
+        self.assertEqual({scan["TotalSegments"] for scan in self.table.scans}, {2})
+
+
+@mock.patch.dict(os.environ, {"ACTIVE_USERS_INDEX": "ActiveUsersIndex"})
+class ActiveUserProfilesTest(ConfigStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        # Stored before activeSite existed: enabled, but not in the index
+        self.table.items[("USER#alice", "PROFILE")] = dict(profile("alice"), autoReservationEnabled=True)
+
+    def test_scans_the_table_until_the_index_is_backfilled(self):
+        profiles = self.store.get_active_user_profiles(site="196274#Asia/Seoul")
+        self.assertEqual([item["userId"] for item in profiles], ["alice"])
+        self.assertNotIn("IndexName", self.table.scans[-1])
+        self.assertEqual(self.table.queries, [])
+
+    def test_uses_the_index_once_marked(self):
+        self.table.items[("USER#alice", "PROFILE")]["activeSite"] = "196274#Asia/Seoul"
+        self.store.mark_active_users_indexed()
+        self.assertIn(("META", ACTIVE_USERS_INDEXED_KEY["SK"]), self.table.items)
+        profiles = self.store.get_active_user_profiles(site="196274#Asia/Seoul")
+        self.assertEqual([item["userId"] for item in profiles], ["alice"])
+        self.assertEqual(self.table.queries[-1]["IndexName"], "ActiveUsersIndex")
+        self.assertEqual(self.table.scans, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import base64
+import os
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+from cryptography.exceptions import InvalidTag
+
+from core import crypto
+from core.ttl_cache import TtlCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubKms:
+    """Wraps data keys by index and 'encrypts' legacy values with a fixed prefix."""
+
+    def __init__(self):
+        self.data_keys = []
+        self.calls = []
+
+    def generate_data_key(self, KeyId, KeySpec):
+        self.calls.append("generate_data_key")
+        self.data_keys.append(os.urandom(32))
+        return {"Plaintext": self.data_keys[-1], "CiphertextBlob": b"wrapped-%d" % (len(self.data_keys) - 1)}
+
+    def encrypt(self, KeyId, Plaintext):
+        self.calls.append("encrypt")
+        return {"CiphertextBlob": b"kms:" + Plaintext}
+
+    def decrypt(self, CiphertextBlob):
+        self.calls.append("decrypt")
+        if CiphertextBlob.startswith(b"kms:"):
+            return {"Plaintext": CiphertextBlob[len(b"kms:"):]}
+        if CiphertextBlob.startswith(b"wrapped-"):
+            return {"Plaintext": self.data_keys[int(CiphertextBlob[len(b"wrapped-"):])]}
+        raise ClientError({"Error": {"Code": "InvalidCiphertextException"}}, "Decrypt")
+
+
+class CryptoTest(unittest.TestCase):
+    def setUp(self):
+        self.kms = StubKms()
+        self.clock = FakeClock()
+        patches = [
+            mock.patch.object(crypto, "_get_kms_client", return_value=self.kms),
+            mock.patch.object(crypto, "_DATA_KEY_CACHE", TtlCache(ttl=60.0, clock=self.clock)),
+            mock.patch.object(crypto, "_current_data_key", None),
+            mock.patch.dict(os.environ, {"KMS_ENVELOPE_ENCRYPTION": "true", "KMS_DATA_KEY_EPOCH_SECONDS": "3600"}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def forget_unwrapped_keys(self):
+        crypto._DATA_KEY_CACHE.clear()
+
+    def test_envelope_round_trip(self):
+        encrypted, salt = crypto.encrypt("비밀번호")
+        self.assertTrue(encrypted.startswith(crypto.ENVELOPE_PREFIX))
+        self.assertEqual(salt, "kms_managed")
+        self.assertNotIn("비밀번호".encode(), base64.b64decode(encrypted[len(crypto.ENVELOPE_PREFIX):]))
+        self.assertEqual(crypto.decrypt(encrypted), "비밀번호")
+
+    def test_one_data_key_per_epoch(self):
+        first, _ = crypto.encrypt("a")
+        second, _ = crypto.encrypt("b")
+        self.assertNotEqual(first, second)  # fresh nonce per value
+        self.assertEqual(self.kms.calls, ["generate_data_key"])
+
+    def test_new_epoch_generates_a_new_key(self):
+        with mock.patch.dict(os.environ, {"KMS_DATA_KEY_EPOCH_SECONDS": "0"}):
+            first, _ = crypto.encrypt("a")
+            second, _ = crypto.encrypt("b")
+        self.assertEqual(self.kms.calls.count("generate_data_key"), 2)
+        self.assertEqual((crypto.decrypt(first), crypto.decrypt(second)), ("a", "b"))
+
+    def test_decrypts_legacy_kms_ciphertext(self):
+        legacy = base64.b64encode(b"kms:old-secret").decode()
+        self.assertEqual(crypto.decrypt(legacy), "old-secret")
+        with mock.patch.dict(os.environ, {"KMS_ENVELOPE_ENCRYPTION": "false"}):
+            encrypted, _ = crypto.encrypt("direct")
+        self.assertFalse(encrypted.startswith(crypto.ENVELOPE_PREFIX))
+        self.assertEqual(crypto.decrypt(encrypted), "direct")
+
+    def test_unwrapped_key_is_cached_until_it_expires(self):
+        values = [crypto.encrypt(text)[0] for text in ("a", "b")]
+        self.forget_unwrapped_keys()
+        self.assertEqual([crypto.decrypt(value) for value in values], ["a", "b"])
+        self.assertEqual(self.kms.calls.count("decrypt"), 1)
+
+        self.clock.now = 60.0
+        self.assertEqual(crypto.decrypt(values[0]), "a")
+        self.assertEqual(self.kms.calls.count("decrypt"), 2)
+
+    def test_tampered_ciphertext_fails(self):
+        encrypted, _ = crypto.encrypt("secret")
+        blob = bytearray(base64.b64decode(encrypted[len(crypto.ENVELOPE_PREFIX):]))
+        blob[-1] ^= 0x01
+        tampered = crypto.ENVELOPE_PREFIX + base64.b64encode(bytes(blob)).decode()
+        with self.assertRaises(InvalidTag):
+            crypto.decrypt(tampered)
+
+    def test_unknown_wrapped_key_fails(self):
+        encrypted, _ = crypto.encrypt("secret")
+        blob = base64.b64decode(encrypted[len(crypto.ENVELOPE_PREFIX):])
+        # Same length as the real wrapped key ("wrapped-0"), unknown to KMS
+        forged = crypto.ENVELOPE_PREFIX + base64.b64encode(blob[:2] + b"bogus-key" + blob[11:]).decode()
+        with self.assertRaisesRegex(RuntimeError, "Failed to unwrap data key"):
+            crypto.decrypt(forged)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+import asyncio
+import unittest
+
+import requests
+
+from core.governor import (
+    CLOSED,
+    HALF_OPEN,
+    LOGIN,
+    OPEN,
+    ORDER,
+    READ,
+    CircuitBreaker,
+    CircuitOpenError,
+    Governor,
+    TokenBucket,
+    endpoint_class,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def status_of(response):
+    return response.status_code
+
+
+def breaker(clock, **kwargs):
+    return CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock, **kwargs)
+
+
+def governor(circuit):
+    # Large buckets: these tests are about the breaker.
+    return Governor({LOGIN: (1000.0, 1000), READ: (1000.0, 1000), ORDER: (1000.0, 1000)}, circuit)
+
+
+def open_breaker(clock):
+    circuit = breaker(clock)
+    circuit.record_failure()
+    circuit.record_failure()
+    return circuit
+
+
+def half_open_breaker(clock):
+    circuit = open_breaker(clock)
+    clock.now += 10.0
+    return circuit
+
+
+class TestEndpointClass(unittest.TestCase):
+    def test_classes(self):
+        self.assertEqual(endpoint_class('login.do'), LOGIN)
+        self.assertEqual(endpoint_class('insertReservationOrder.do'), ORDER)
+        self.assertEqual(endpoint_class('updateMenuReservationCancel.do'), ORDER)
+        self.assertEqual(endpoint_class('selectReserveMenuList.do'), READ)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_queue(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10.0, burst=2, clock=clock)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+        self.assertAlmostEqual(bucket.reserve(), 0.2)  # queued behind the previous caller
+
+    def test_refills_up_to_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10.0, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 60.0
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertGreater(bucket.reserve(), 0.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        clock = FakeClock()
+        circuit = breaker(clock)
+        circuit.record_failure()
+        circuit.record_success()
+        circuit.record_failure()
+        self.assertEqual(circuit.state, CLOSED)
+        circuit.record_failure()
+        self.assertEqual(circuit.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            circuit.allow()
+        self.assertEqual(circuit.stats()['rejected'], 1)
+
+    def test_half_open_allows_one_probe(self):
+        clock = FakeClock()
+        circuit = open_breaker(clock)
+        clock.now += 9.9
+        with self.assertRaises(CircuitOpenError):
+            circuit.allow()
+        clock.now += 0.1
+        self.assertTrue(circuit.allow())
+        self.assertEqual(circuit.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            circuit.allow()
+
+    def test_probe_success_closes(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+        circuit.allow()
+        circuit.record_success()
+        self.assertEqual(circuit.state, CLOSED)
+        self.assertFalse(circuit.allow())
+
+    def test_probe_failure_reopens(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+        circuit.allow()
+        circuit.record_failure()
+        self.assertEqual(circuit.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            circuit.allow()
+        clock.now += 10.0
+        self.assertTrue(circuit.allow())
+
+    def test_released_probe_can_be_taken_again(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+        circuit.allow()
+        circuit.release_probe()
+        self.assertEqual(circuit.state, HALF_OPEN)
+        self.assertTrue(circuit.allow())
+
+    def test_release_outside_half_open_is_ignored(self):
+        circuit = breaker(FakeClock())
+        circuit.release_probe()
+        self.assertEqual(circuit.state, CLOSED)
+        self.assertFalse(circuit.allow())
+
+
+class TestGovernorOutcomes(unittest.TestCase):
+    def test_statuses(self):
+        clock = FakeClock()
+        circuit = breaker(clock)
+        gov = governor(circuit)
+        gov.call('selectReserveMenuList.do', lambda: Response(503), status_of)
+        gov.call('selectReserveMenuList.do', lambda: Response(429), status_of)  # overload, but hcafe answers
+        gov.call('selectReserveMenuList.do', lambda: Response(500), status_of)
+        self.assertEqual(circuit.state, CLOSED)
+        gov.call('selectReserveMenuList.do', lambda: Response(502), status_of)
+        self.assertEqual(circuit.state, OPEN)
+
+    def test_open_breaker_does_not_send(self):
+        clock = FakeClock()
+        gov = governor(open_breaker(clock))
+        sent = []
+        with self.assertRaises(CircuitOpenError):
+            gov.call('insertReservationOrder.do', lambda: sent.append(1), status_of)
+        self.assertEqual(sent, [])
+
+    def test_probe_timeout_reopens(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+
+        def send():
+            raise requests.ReadTimeout('slow')
+
+        with self.assertRaises(requests.ReadTimeout):
+            governor(circuit).call('selectReserveMenuList.do', send, status_of)
+        self.assertEqual(circuit.state, OPEN)
+
+    def test_probe_with_unexpected_error_reopens(self):
+        for error in (requests.exceptions.ChunkedEncodingError('cut'), ValueError('not json')):
+            clock = FakeClock()
+            circuit = half_open_breaker(clock)
+
+            def send():
+                raise error
+
+            with self.assertRaises(type(error)):
+                governor(circuit).call('selectReserveMenuList.do', send, status_of)
+            self.assertEqual(circuit.state, OPEN, error)
+
+    def test_probe_with_failing_status_of_reopens(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+
+        def broken_status(_response):
+            raise ValueError('no status')
+
+        with self.assertRaises(ValueError):
+            governor(circuit).call('selectReserveMenuList.do', lambda: Response(200), broken_status)
+        self.assertEqual(circuit.state, OPEN)
+
+
+class TestGovernorCancellation(unittest.TestCase):
+    def test_cancelled_probe_releases_slot(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+        gov = governor(circuit)
+        started = asyncio.Event()
+
+        async def send():
+            started.set()
+            await asyncio.sleep(60)
+
+        async def main():
+            task = asyncio.ensure_future(gov.call_async('selectReserveMenuList.do', send, status_of))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # The slot is free again: the next request probes and closes the breaker.
+            async def ok():
+                return Response(200)
+
+            return await gov.call_async('selectReserveMenuList.do', ok, status_of)
+
+        self.assertEqual(asyncio.run(main()).status_code, 200)
+        self.assertEqual(circuit.state, CLOSED)
+
+    def test_cancelled_while_queued_in_bucket(self):
+        clock = FakeClock()
+        circuit = half_open_breaker(clock)
+        gov = Governor({READ: (0.001, 0)}, circuit)  # first token in ~1000 s
+        sent = []
+
+        async def send():
+            sent.append(1)
+            return Response(200)
+
+        async def main():
+            task = asyncio.ensure_future(gov.call_async('selectReserveMenuList.do', send, status_of))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        self.assertEqual(sent, [])
+        self.assertEqual(circuit.state, HALF_OPEN)
+        self.assertTrue(circuit.allow())
+
+    def test_cancelled_request_in_closed_state_records_nothing(self):
+        clock = FakeClock()
+        circuit = breaker(clock)
+        gov = governor(circuit)
+
+        async def send():
+            raise asyncio.CancelledError()
+
+        async def main():
+            with self.assertRaises(asyncio.CancelledError):
+                await gov.call_async('selectReserveMenuList.do', send, status_of)
+
+        asyncio.run(main())
+        self.assertEqual(circuit.stats()['consecutiveFailures'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
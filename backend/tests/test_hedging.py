@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+
+from core.hedging import Hedger, LatencyTracker
+
+
+def hedger(p90_seconds=0.05):
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record('selectReserveMenuList.do', p90_seconds)
+    return Hedger(tracker)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_p90_needs_min_samples(self):
+        tracker = LatencyTracker(min_samples=10)
+        for value in range(9):
+            tracker.record('x', value)
+        self.assertIsNone(tracker.p90('x'))
+        tracker.record('x', 9)
+        self.assertEqual(tracker.p90('x'), 8)
+
+    def test_window_drops_old_samples(self):
+        tracker = LatencyTracker(window=3, min_samples=1)
+        for value in (10, 1, 1, 1):
+            tracker.record('x', value)
+        self.assertEqual(tracker.p90('x'), 1)
+
+
+class TestHedgerAsync(unittest.TestCase):
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        hedge = hedger()
+        sends = []
+        cancelled = []
+
+        async def send():
+            copy = len(sends)
+            sends.append(copy)
+            try:
+                await asyncio.sleep(5 if copy == 0 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(copy)
+                raise
+            return copy
+
+        async def main():
+            result = await hedge.call_async('selectReserveMenuList.do', send)
+            await asyncio.sleep(0)  # let the cancellation run
+            return result
+
+        self.assertEqual(asyncio.run(main()), 1)
+        self.assertEqual(cancelled, [0])
+        stats = hedge.stats()['selectReserveMenuList.do']
+        self.assertEqual((stats['requests'], stats['hedged'], stats['won']), (1, 1, 1))
+
+    def test_fast_primary_is_not_hedged(self):
+        hedge = hedger(p90_seconds=1.0)
+        sends = []
+
+        async def send():
+            sends.append(1)
+            return 'menu'
+
+        self.assertEqual(asyncio.run(hedge.call_async('selectReserveMenuList.do', send)), 'menu')
+        self.assertEqual(len(sends), 1)
+        self.assertEqual(hedge.stats()['selectReserveMenuList.do']['hedged'], 0)
+
+    def test_orders_are_never_hedged(self):
+        hedge = hedger()
+        sends = []
+
+        async def send():
+            sends.append(1)
+            await asyncio.sleep(0.2)
+            return 'ordered'
+
+        self.assertEqual(asyncio.run(hedge.call_async('insertReservationOrder.do', send)), 'ordered')
+        self.assertEqual(len(sends), 1)
+        self.assertNotIn('insertReservationOrder.do', hedge.stats())
+
+    def test_error_of_one_copy_waits_for_the_other(self):
+        hedge = hedger()
+        sends = []
+
+        async def send():
+            copy = len(sends)
+            sends.append(copy)
+            if copy == 0:
+                await asyncio.sleep(0.1)
+                raise ConnectionResetError('reset')
+            await asyncio.sleep(0.2)
+            return 'menu'
+
+        self.assertEqual(asyncio.run(hedge.call_async('selectReserveMenuList.do', send)), 'menu')
+
+    def test_both_copies_failing_raises(self):
+        hedge = hedger()
+
+        async def send():
+            await asyncio.sleep(0.1)
+            raise ConnectionResetError('reset')
+
+        with self.assertRaises(ConnectionResetError):
+            asyncio.run(hedge.call_async('selectReserveMenuList.do', send))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import base64
+import json
+import sys
+import types
+import unittest
+
+from core.http import LatencyHistogram, Route, Router, json_body, json_response
+
+HANDLER_MODULE = "tests_http_handlers"
+
+
+def body_of(response):
+    return json.loads(response["body"])
+
+
+class HandlersModule:
+    """Registers a module holding the routes' handlers, imported lazily by Router."""
+
+    def __init__(self):
+        self.module = types.ModuleType(HANDLER_MODULE)
+        self.calls = []
+        self.module.echo = self.echo
+        self.module.fail = self.fail
+        self.module.reject = self.reject
+
+    def echo(self, event, _context):
+        self.calls.append(event)
+        return json_response(200, json_body(event))
+
+    @staticmethod
+    def fail(_event, _context):
+        raise KeyError("boom")
+
+    @staticmethod
+    def reject(_event, _context):
+        raise ValueError("bad date")
+
+
+class JsonBodyTest(unittest.TestCase):
+    def test_parses_once_and_caches_on_the_event(self):
+        event = {"body": '{"a": 1}'}
+        self.assertEqual(json_body(event), {"a": 1})
+        event["body"] = "not json"
+        self.assertEqual(json_body(event), {"a": 1})
+
+    def test_base64_and_empty_bodies(self):
+        encoded = base64.b64encode(b'{"a": 1}').decode()
+        self.assertEqual(json_body({"body": encoded, "isBase64Encoded": True}), {"a": 1})
+        self.assertEqual(json_body({"body": None}), {})
+
+    def test_rejects_invalid_or_non_object_bodies(self):
+        with self.assertRaises(ValueError):
+            json_body({"body": "{"})
+        with self.assertRaises(ValueError):
+            json_body({"body": "[1]"})
+
+
+class RouterTest(unittest.TestCase):
+    def setUp(self):
+        self.handlers = HandlersModule()
+        sys.modules[HANDLER_MODULE] = self.handlers.module
+        self.addCleanup(sys.modules.pop, HANDLER_MODULE, None)
+        self.router = Router([
+            Route("/echo", HANDLER_MODULE, "echo", required=("userId",)),
+            Route("/fail", HANDLER_MODULE, "fail"),
+            Route("/reject", HANDLER_MODULE, "reject"),
+        ])
+
+    def test_dispatches_by_resource_or_raw_path(self):
+        response = self.router({"resource": "/echo", "body": '{"userId": "alice"}'}, None)
+        self.assertEqual((response["statusCode"], body_of(response)), (200, {"userId": "alice"}))
+        response = self.router({"rawPath": "/echo", "body": '{"userId": "bob"}'}, None)
+        self.assertEqual(body_of(response), {"userId": "bob"})
+
+    def test_missing_required_fields_never_reach_the_handler(self):
+        response = self.router({"resource": "/echo", "body": '{"userId": ""}'}, None)
+        self.assertEqual(response["statusCode"], 400)
+        self.assertEqual(body_of(response)["message"], "Missing fields: userId")
+        self.assertEqual(self.handlers.calls, [])
+
+    def test_invalid_body_is_a_client_error(self):
+        response = self.router({"resource": "/echo", "body": "{"}, None)
+        self.assertEqual(response["statusCode"], 400)
+
+    def test_handler_errors_become_400_or_500(self):
+        self.assertEqual(self.router({"resource": "/reject"}, None)["statusCode"], 400)
+        response = self.router({"resource": "/fail"}, None)
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual(response["headers"]["Content-Type"], "application/json")
+
+    def test_unknown_path_uses_fallback_or_404(self):
+        self.assertEqual(self.router({"resource": "/nope"}, None)["statusCode"], 404)
+        router = Router([], fallback=lambda event, _context: json_response(204, {}))
+        self.assertEqual(router({"resource": "/nope"}, None)["statusCode"], 204)
+        self.assertIn("fallback", router.stats())
+
+    def test_records_latency_per_route(self):
+        for _ in range(3):
+            self.router({"resource": "/echo", "body": '{"userId": "alice"}'}, None)
+        self.router({"resource": "/fail"}, None)
+        stats = self.router.stats()
+        self.assertEqual(stats["/echo"]["count"], 3)
+        self.assertEqual(stats["/fail"]["count"], 1)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = LatencyHistogram(bounds=(10, 100))
+        for elapsed_ms in (1, 2, 3, 50, 500):
+            histogram.observe(elapsed_ms)
+        self.assertEqual(histogram.percentile(0.5), 10.0)
+        self.assertEqual(histogram.percentile(0.8), 100.0)
+        self.assertEqual(histogram.percentile(0.99), 500.0)
+        self.assertEqual(histogram.stats()["buckets"], {"le10": 3, "le100": 1, "inf": 1})
+
+    def test_empty_histogram(self):
+        self.assertEqual(LatencyHistogram().percentile(0.5), 0.0)
+        self.assertEqual(LatencyHistogram().stats()["avgMs"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
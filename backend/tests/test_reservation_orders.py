@@ -0,0 +1,43 @@
+import unittest
+
+from core.models import UserPreferences
+from core.reservation_service import ReservationService
+
+FLOOR = {"floorNm": "9층", "dlvrPlcFloorNo": "9", "dlvrPlcSeq": 3, "remainDeliQty": 4}
+
+
+def preferences():
+    return UserPreferences(
+        user_id="alice",
+        password="secret",
+        menu_sequence=["샐"],
+        floor_name="9층",
+        raw_payload={"userId": "alice", "remainDeliQty": -1},
+    )
+
+
+class BuildOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.service = ReservationService(config_store=None, reservation_client=None)
+
+    def build(self, phase):
+        return self.service._build_order(
+            preferences(), "샐", "0006", {"bizplcCd": "196274"}, "20261019", FLOOR, "live", phase
+        )
+
+    def test_prepared_order_does_not_carry_the_prepare_time_quantity(self):
+        order = self.build("prepare")
+        self.assertEqual(order.payload["dlvrPlcSeq"], 3)
+        self.assertEqual(order.payload["remainDeliQty"], -1)
+
+    def test_order_built_at_fire_time_uses_the_live_quantity(self):
+        self.assertEqual(self.build("fire").payload["remainDeliQty"], 4)
+
+    def test_live_floor_retry_uses_the_fresh_quantity(self):
+        order = self.build("prepare")
+        payload = self.service._payload_with_new_floor(order, dict(FLOOR, dlvrPlcSeq=5, remainDeliQty=2))
+        self.assertEqual((payload["dlvrPlcSeq"], payload["remainDeliQty"]), (5, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
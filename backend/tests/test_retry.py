@@ -0,0 +1,169 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import requests
+import urllib3
+
+from core.governor import CircuitOpenError
+from core.models import ApiCallResult
+from core.retry import (
+    DUPLICATE_RESERVATION_MESSAGE,
+    RETRYABLE,
+    SUCCESS,
+    TERMINAL,
+    RetryPolicy,
+    may_have_reached_server,
+)
+
+
+def http_error(status_code):
+    return ApiCallResult(False, None, f'HTTP {status_code}', {'statusCode': status_code})
+
+
+OK = ApiCallResult(True, 0, None, {'statusCode': 200})
+DUPLICATE = ApiCallResult(False, -1, DUPLICATE_RESERVATION_MESSAGE, {'statusCode': 200})
+SOLD_OUT = ApiCallResult(False, -1, '잔여 수량이 없습니다.', {'statusCode': 200})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def policy(clock, **kwargs):
+    return RetryPolicy(clock=clock, sleep=clock.sleep, rng=lambda: 1.0, **kwargs)
+
+
+def sequence(*steps):
+    """send() returning/raising the given results/exceptions in order."""
+    steps = list(steps)
+
+    def send():
+        step = steps.pop(0)
+        if isinstance(step, BaseException):
+            raise step
+        return step
+
+    return send
+
+
+class TestMayHaveReachedServer(unittest.TestCase):
+    def test_statuses(self):
+        for status in (500, 502, 504):
+            self.assertTrue(may_have_reached_server(http_error(status)), status)
+        for status in (408, 425, 429, 503):
+            self.assertFalse(may_have_reached_server(http_error(status)), status)
+
+    def test_read_timeout_and_reset_after_sending(self):
+        self.assertTrue(may_have_reached_server(None, requests.ReadTimeout()))
+        reset = urllib3.exceptions.ProtocolError('Connection aborted.', ConnectionResetError())
+        self.assertTrue(may_have_reached_server(None, requests.ConnectionError(reset)))
+        self.assertTrue(may_have_reached_server(None, asyncio.TimeoutError()))
+
+    def test_not_sent(self):
+        self.assertFalse(may_have_reached_server(None, requests.ConnectTimeout()))
+        refused = urllib3.exceptions.MaxRetryError(None, '/', urllib3.exceptions.NewConnectionError(None, 'refused'))
+        self.assertFalse(may_have_reached_server(None, requests.ConnectionError(refused)))
+        self.assertFalse(may_have_reached_server(None, CircuitOpenError('open')))
+
+    def test_aiohttp_errors(self):
+        aiohttp = __import__('aiohttp')
+        self.assertTrue(may_have_reached_server(None, aiohttp.ServerDisconnectedError()))
+        if hasattr(aiohttp, 'ConnectionTimeoutError'):
+            self.assertFalse(may_have_reached_server(None, aiohttp.ConnectionTimeoutError()))
+
+
+class TestClassify(unittest.TestCase):
+    def setUp(self):
+        self.policy = policy(FakeClock())
+
+    def test_results(self):
+        self.assertEqual(self.policy.classify(OK), SUCCESS)
+        self.assertEqual(self.policy.classify(DUPLICATE), TERMINAL)
+        self.assertEqual(self.policy.classify(SOLD_OUT), TERMINAL)
+        self.assertEqual(self.policy.classify(http_error(503)), RETRYABLE)
+        self.assertEqual(self.policy.classify(http_error(404)), TERMINAL)
+
+    def test_exceptions(self):
+        self.assertEqual(self.policy.classify(None, requests.ReadTimeout()), RETRYABLE)
+        self.assertEqual(self.policy.classify(None, CircuitOpenError('open')), RETRYABLE)
+        self.assertEqual(self.policy.classify(None, ValueError('bad json')), TERMINAL)
+
+
+class TestRun(unittest.TestCase):
+    def run_policy(self, *steps, **kwargs):
+        clock = FakeClock()
+        log = []
+        outcome = policy(clock, **kwargs).run(sequence(*steps), '샐', log)
+        return outcome, log, clock
+
+    def test_duplicate_after_timeout_is_ambiguous(self):
+        outcome, log, _clock = self.run_policy(requests.ReadTimeout(), DUPLICATE)
+        self.assertEqual(outcome.verdict, TERMINAL)
+        self.assertTrue(outcome.ambiguous)
+        self.assertEqual([entry['outcome'] for entry in log], [RETRYABLE, TERMINAL])
+
+    def test_duplicate_after_rejected_attempts_is_not_ambiguous(self):
+        outcome, _log, _clock = self.run_policy(http_error(429), http_error(503), CircuitOpenError('open'), DUPLICATE)
+        self.assertEqual(outcome.verdict, TERMINAL)
+        self.assertEqual(outcome.attempts, 4)
+        self.assertFalse(outcome.ambiguous)
+
+    def test_ambiguity_sticks_across_later_rejections(self):
+        outcome, _log, _clock = self.run_policy(http_error(504), http_error(429), DUPLICATE)
+        self.assertTrue(outcome.ambiguous)
+
+    def test_exhausted_attempts(self):
+        outcome, log, clock = self.run_policy(http_error(503), http_error(503), http_error(503), max_attempts=3)
+        self.assertEqual(outcome.verdict, RETRYABLE)
+        self.assertFalse(outcome.ambiguous)
+        self.assertEqual(len(log), 3)
+        self.assertEqual(clock.sleeps, [0.2, 0.4])
+
+    def test_deadline_stops_retries(self):
+        outcome, log, _clock = self.run_policy(http_error(503), http_error(503), deadline=0.3, max_attempts=10)
+        self.assertEqual(outcome.verdict, RETRYABLE)
+        self.assertEqual(len(log), 2)
+
+    def test_exhausted_by_exceptions(self):
+        outcome, _log, _clock = self.run_policy(requests.ReadTimeout('slow'), max_attempts=1)
+        self.assertEqual(outcome.verdict, RETRYABLE)
+        self.assertTrue(outcome.ambiguous)
+        self.assertIn('ReadTimeout', outcome.result.error_message)
+
+    def test_terminal_exceptions_propagate(self):
+        with self.assertRaises(ValueError):
+            self.run_policy(ValueError('bad json'))
+
+
+class TestRunAsync(unittest.TestCase):
+    def test_matches_sync_classification(self):
+        steps = [asyncio.TimeoutError(), http_error(429), DUPLICATE]
+
+        async def send():
+            step = steps.pop(0)
+            if isinstance(step, BaseException):
+                raise step
+            return step
+
+        async def no_sleep(_seconds):
+            return None
+
+        with patch('asyncio.sleep', no_sleep):
+            outcome = asyncio.run(policy(FakeClock()).run_async(send, '샐', []))
+        self.assertEqual(outcome.verdict, TERMINAL)
+        self.assertTrue(outcome.ambiguous)
+        self.assertEqual(outcome.attempts, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from core.models import ApiCallResult
+from core.run_context import AsyncSharedFetchCache, SharedFetchCache
+
+WAITERS = 6
+
+
+def ok(value="menu"):
+    return ApiCallResult(True, 0, None, {"value": value})
+
+
+def failed():
+    return ApiCallResult(False, 500, "upstream error", {})
+
+
+class BlockingFetch:
+    """fetch() that blocks until released, counting how often it ran."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def run_concurrently(cache, fetch, key="k"):
+    """WAITERS threads ask for ``key`` while the first fetch is still running."""
+    entered = threading.Semaphore(0)
+    outcomes = [None] * WAITERS
+
+    def ask(index):
+        entered.release()
+        try:
+            outcomes[index] = cache.get_or_fetch(key, fetch)
+        except Exception as error:  # pylint: disable=broad-except
+            outcomes[index] = error
+
+    threads = [threading.Thread(target=ask, args=(index,)) for index in range(WAITERS)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        entered.acquire()
+    time.sleep(0.05)  # let every thread reach the in-flight wait
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+class SharedFetchCacheTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_fetch(self):
+        cache = SharedFetchCache()
+        fetch = BlockingFetch(ok())
+        outcomes = run_concurrently(cache, fetch)
+        self.assertEqual(fetch.calls, 1)
+        self.assertTrue(all(outcome is outcomes[0] for outcome in outcomes))
+        self.assertEqual(cache.stats(), {"hits": WAITERS - 1, "misses": 1, "size": 1})
+        self.assertIs(cache.get_or_fetch("k", fetch), outcomes[0])
+        self.assertEqual(fetch.calls, 1)
+
+    def test_exception_reaches_every_waiter_and_is_not_cached(self):
+        cache = SharedFetchCache()
+        error = ConnectionError("reset")
+        fetch = BlockingFetch(error)
+        outcomes = run_concurrently(cache, fetch)
+        self.assertEqual(fetch.calls, 1)
+        self.assertTrue(all(outcome is error for outcome in outcomes))
+
+        fetch.outcome = ok()
+        self.assertTrue(cache.get_or_fetch("k", fetch).success)
+        self.assertEqual(fetch.calls, 2)
+
+    def test_failed_result_is_shared_but_not_cached(self):
+        cache = SharedFetchCache()
+        fetch = BlockingFetch(failed())
+        outcomes = run_concurrently(cache, fetch)
+        self.assertEqual(fetch.calls, 1)
+        self.assertTrue(all(not outcome.success for outcome in outcomes))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_keys_are_fetched_independently(self):
+        cache = SharedFetchCache()
+        self.assertEqual(cache.get_or_fetch(("prepare", "menuList"), lambda: ok("a")).raw["value"], "a")
+        self.assertEqual(cache.get_or_fetch(("fire", "menuList"), lambda: ok("b")).raw["value"], "b")
+
+
+class AsyncSharedFetchCacheTest(unittest.TestCase):
+    def gather(self, cache, outcome, extra=None):
+        calls = []
+
+        async def main():
+            release = asyncio.Event()
+
+            async def fetch():
+                calls.append(1)
+                await release.wait()
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+
+            tasks = [asyncio.ensure_future(cache.get_or_fetch("k", fetch)) for _ in range(WAITERS)]
+            await asyncio.sleep(0)
+            if extra:
+                extra(tasks)
+            release.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        return asyncio.run(main()), calls
+
+    def test_concurrent_callers_share_one_fetch(self):
+        cache = AsyncSharedFetchCache()
+        result = ok()
+        outcomes, calls = self.gather(cache, result)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(outcome is result for outcome in outcomes))
+
+    def test_exception_reaches_every_waiter_and_is_not_cached(self):
+        cache = AsyncSharedFetchCache()
+        error = ConnectionError("reset")
+        outcomes, calls = self.gather(cache, error)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(outcome is error for outcome in outcomes))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_cancelled_fetch_hands_over_to_a_waiter(self):
+        cache = AsyncSharedFetchCache()
+        result = ok()
+        outcomes, calls = self.gather(cache, result, extra=lambda tasks: tasks[0].cancel())
+        self.assertIsInstance(outcomes[0], asyncio.CancelledError)
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(outcome is result for outcome in outcomes[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
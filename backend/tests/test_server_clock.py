@@ -0,0 +1,103 @@
+import math
+import unittest
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+import requests
+
+from core import server_clock
+from core.server_clock import ClockEstimate, ServerClock
+
+
+class FakeTime:
+    """Stands in for the time module: sleep() advances time()."""
+
+    def __init__(self, now=1_000_000.25):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += max(seconds, 0.0)
+
+
+class Response:
+    def __init__(self, date=None):
+        self.headers = {"Date": date} if date else {}
+
+
+class FakeServer:
+    """HEAD answers whose Date header is the server second at arrival (offset, rtt in seconds)."""
+
+    def __init__(self, clock, offset, rtt, dates=None):
+        self.clock = clock
+        self.offset = offset
+        self.rtt = rtt
+        self.dates = list(dates or [])
+
+    def head(self, url, **kwargs):
+        self.clock.now += self.rtt / 2
+        if self.dates:
+            date = self.dates.pop(0)
+        else:
+            server_now = math.floor(self.clock.now + self.offset)
+            date = format_datetime(datetime.fromtimestamp(server_now, timezone.utc), usegmt=True)
+        self.clock.now += self.rtt / 2
+        if isinstance(date, Exception):
+            raise date
+        return Response(date)
+
+
+class ServerClockTest(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        patch = mock.patch.object(server_clock, "time", self.time)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def clock(self, server, samples=8):
+        return ServerClock(base_url="http://hcafe.test", session=server, samples=samples)
+
+    def test_bounds_narrow_to_about_one_round_trip(self):
+        estimate = self.clock(FakeServer(self.time, offset=2.3, rtt=0.04)).estimate()
+        self.assertEqual(estimate.samples, 8)
+        self.assertAlmostEqual(estimate.rtt, 0.04)
+        self.assertLessEqual(abs(estimate.offset - 2.3), estimate.error)
+        self.assertLessEqual(estimate.error, 0.04)
+
+    def test_single_sample_spans_the_date_second(self):
+        # Sent at t0, answered at t1 = t0 + 0.1 while the server showed second S
+        t0 = self.time.now
+        estimate = self.clock(FakeServer(self.time, offset=-0.4, rtt=0.1), samples=1).estimate()
+        server_second = math.floor(t0 + 0.05 - 0.4)
+        lower, upper = server_second - (t0 + 0.1), server_second + 1 - t0
+        self.assertAlmostEqual(estimate.offset, (lower + upper) / 2)
+        self.assertAlmostEqual(estimate.error, (upper - lower) / 2)
+
+    def test_inconsistent_sample_restarts_the_bounds(self):
+        # First answer from a backend 10s ahead, the rest from one in sync
+        ahead = format_datetime(datetime.fromtimestamp(math.floor(self.time.now + 10), timezone.utc), usegmt=True)
+        estimate = self.clock(FakeServer(self.time, offset=0.0, rtt=0.02, dates=[ahead])).estimate()
+        self.assertLess(abs(estimate.offset), 1.0)
+
+    def test_no_usable_sample_falls_back_to_the_local_clock(self):
+        failures = [requests.ConnectionError("down"), None, "not a date"]
+        server = FakeServer(self.time, offset=5.0, rtt=0.01, dates=failures)
+        estimate = self.clock(server, samples=3).estimate()
+        self.assertEqual((estimate.offset, estimate.error, estimate.samples), (0.0, math.inf, 0))
+
+    def test_wait_until_wakes_at_the_server_target(self):
+        estimate = ClockEstimate(offset=2.0, error=0.01, samples=8)
+        target = datetime.fromtimestamp(math.floor(self.time.now) + 60, timezone.utc)
+        woke = self.clock(FakeServer(self.time, 0.0, 0.0)).wait_until(target, estimate, lead=0.5)
+        local_target = target.timestamp() - 2.0 - 0.5
+        self.assertGreaterEqual(woke, local_target)
+        self.assertLess(woke - local_target, 0.002)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from core import ses_notifier
+from core.governor import TokenBucket
+from core.models import Notification
+from core.ses_notifier import MAX_BULK_DESTINATIONS, SEND_ATTEMPTS, SesNotifier
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "SendEmail")
+
+
+class StubSes:
+    """Records calls; each call pops the next scripted error (None: succeed)."""
+
+    def __init__(self):
+        self.sent = []
+        self.bulk = []
+        self.errors = []
+        self.bulk_statuses = None  # callable(destinations) -> Status list
+
+    def _next_error(self):
+        if self.errors:
+            failure = self.errors.pop(0)
+            if failure is not None:
+                raise failure
+
+    def send_email(self, **kwargs):
+        self._next_error()
+        self.sent.append(kwargs)
+        return {"MessageId": str(len(self.sent))}
+
+    def send_bulk_templated_email(self, **kwargs):
+        self._next_error()
+        self.bulk.append(kwargs)
+        destinations = kwargs["Destinations"]
+        if self.bulk_statuses:
+            return {"Status": self.bulk_statuses(destinations)}
+        return {"Status": [{"Status": "Success"} for _ in destinations]}
+
+
+def notifications(count):
+    return [Notification(f"subject {index}", f"body {index}", [f"u{index}@example.com"]) for index in range(count)]
+
+
+class SesNotifierTest(unittest.TestCase):
+    def setUp(self):
+        self.ses = StubSes()
+        self.clock = FakeClock()
+        self.sleeps = []
+        patches = [
+            mock.patch.object(ses_notifier.time, "sleep", self.sleep),
+            mock.patch.object(ses_notifier.random, "random", return_value=1.0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.clock.now += seconds
+
+    def notifier(self, template_name=None, rate=1000.0):
+        notifier = SesNotifier(sender="no-reply@example.com", ses_client=self.ses, template_name=template_name)
+        notifier._bucket = TokenBucket(rate, max(1, int(rate)), clock=self.clock)
+        return notifier
+
+    def test_send_skips_empty_recipients(self):
+        notifier = self.notifier()
+        self.assertFalse(notifier.send("s", "b", ["", None]))
+        self.assertTrue(notifier.send("s", "b", ["a@example.com", ""]))
+        self.assertEqual(self.ses.sent[0]["Destination"], {"ToAddresses": ["a@example.com"]})
+
+    def test_send_failure_is_logged_not_raised(self):
+        self.ses.errors = [error("MessageRejected")]
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertFalse(self.notifier().send("s", "b", ["a@example.com"]))
+        self.assertIn("SES send failed", logs.output[0])
+
+    def test_throttling_is_retried_with_backoff(self):
+        self.ses.errors = [error("Throttling"), error("ThrottlingException")]
+        self.assertTrue(self.notifier().send("s", "b", ["a@example.com"]))
+        self.assertEqual(self.sleeps, [1.0, 2.0])  # full jitter at its upper bound
+
+    def test_throttling_gives_up_after_the_last_attempt(self):
+        self.ses.errors = [error("Throttling")] * SEND_ATTEMPTS
+        self.assertFalse(self.notifier().send("s", "b", ["a@example.com"]))
+        self.assertEqual(len(self.sleeps), SEND_ATTEMPTS - 1)
+
+    def test_sends_wait_for_the_sending_rate(self):
+        notifier = self.notifier(rate=2.0)
+        notifier.send("s", "b", [f"u{index}@example.com" for index in range(5)])
+        self.assertEqual(self.sleeps, [1.5])  # 5 recipients, burst 2, 2 per second
+
+    def test_bulk_sends_chunks_of_fifty(self):
+        stats = self.notifier(template_name="result").send_many(notifications(MAX_BULK_DESTINATIONS + 5))
+        self.assertEqual([len(call["Destinations"]) for call in self.ses.bulk], [MAX_BULK_DESTINATIONS, 5])
+        self.assertEqual(stats, {"queued": 55, "bulk": 55, "sent": 55, "failed": 0})
+        data = json.loads(self.ses.bulk[0]["Destinations"][3]["ReplacementTemplateData"])
+        self.assertEqual(data, {"subject": "subject 3", "body": "body 3"})
+        self.assertEqual(self.ses.sent, [])
+
+    def test_bulk_leftovers_are_sent_individually(self):
+        self.ses.bulk_statuses = lambda destinations: [
+            {"Status": "Success" if index % 2 == 0 else "MessageRejected"} for index in range(len(destinations))
+        ]
+        stats = self.notifier(template_name="result").send_many(notifications(4))
+        self.assertEqual(stats, {"queued": 4, "bulk": 2, "sent": 4, "failed": 0})
+        self.assertEqual(sorted(call["Destination"]["ToAddresses"][0] for call in self.ses.sent),
+                         ["u1@example.com", "u3@example.com"])
+
+    def test_failed_bulk_call_falls_back_to_individual_sends(self):
+        self.ses.errors = [error("TemplateDoesNotExist")]
+        stats = self.notifier(template_name="result").send_many(notifications(3))
+        self.assertEqual(stats, {"queued": 3, "bulk": 0, "sent": 3, "failed": 0})
+
+    def test_without_template_everything_is_sent_individually(self):
+        items = notifications(3) + [Notification("s", "b", [])]
+        self.ses.errors = [error("MessageRejected")]
+        stats = self.notifier().send_many(items)
+        self.assertEqual(stats, {"queued": 4, "bulk": 0, "sent": 2, "failed": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from core import session_store
+from core.models import LoginResult, UserPreferences
+from core.session_store import SessionStore
+
+NOW = 1_800_000_000.0
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = NOW
+
+    def time(self):
+        return self.now
+
+
+class StubConfigStore:
+    def __init__(self):
+        self.sessions = {}
+        self.decrypted = 0
+        self.fail_reads = False
+
+    def get_session(self, user_id):
+        if self.fail_reads:
+            raise RuntimeError("throttled")
+        return self.sessions.get(user_id)
+
+    def save_session(self, user_id, cookies_encrypted, expires_at):
+        self.sessions[user_id] = {"cookies_encrypted": cookies_encrypted, "expiresAt": expires_at}
+
+    def decrypt_secrets(self, preferences):
+        self.decrypted += 1
+        preferences.password = "plain-password"
+        preferences.encrypted_secrets = {}
+        return preferences
+
+
+class StubClient:
+    """Cookie jar plus a login that issues a new session cookie each time."""
+
+    def __init__(self, login_succeeds=True, name="s"):
+        self.name = name
+        self.cookies = []
+        self.logins = []
+        self.login_succeeds = login_succeeds
+        self.reauthenticate = None
+
+    def import_cookies(self, cookies):
+        self.cookies = list(cookies)
+
+    def export_cookies(self):
+        return list(self.cookies)
+
+    def clear_cookies(self):
+        self.cookies = []
+
+    def _login(self, user_id, password):
+        self.logins.append((user_id, password, list(self.cookies)))
+        if not self.login_succeeds:
+            return LoginResult(False, "bad password")
+        self.cookies = [{"name": "JSESSIONID", "value": f"{self.name}{len(self.logins)}", "expires": None}]
+        return LoginResult(True, "ok")
+
+    def login(self, user_id, password, _payload):
+        return self._login(user_id, password)
+
+
+class AsyncStubClient(StubClient):
+    async def login(self, user_id, password, _payload):
+        await asyncio.sleep(0)
+        return self._login(user_id, password)
+
+
+def preferences():
+    return UserPreferences(
+        user_id="alice", password="", menu_sequence=["샐"], floor_name="9층", raw_payload={},
+        encrypted_secrets={"password": "ciphertext"},
+    )
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        patches = [
+            mock.patch.object(session_store, "time", self.time),
+            # Reversible stand-ins for KMS envelope encryption
+            mock.patch.object(session_store, "encrypt", lambda value: ("enc:" + value, "kms_managed")),
+            mock.patch.object(session_store, "decrypt", self.decrypt),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.config_store = StubConfigStore()
+        self.store = SessionStore(self.config_store, ttl_seconds=1800)
+
+    @staticmethod
+    def decrypt(value):
+        if not value.startswith("enc:"):
+            raise ValueError("not ours")
+        return value[len("enc:"):]
+
+    def stored_cookies(self):
+        item = self.config_store.sessions["alice"]
+        return json.loads(self.decrypt(item["cookies_encrypted"])), item["expiresAt"]
+
+    def test_fresh_login_stores_the_encrypted_cookie_jar(self):
+        client = StubClient()
+        result = self.store.login(client, preferences())
+        self.assertEqual((result.success, client.logins[0][1]), (True, "plain-password"))
+        self.assertTrue(self.config_store.sessions["alice"]["cookies_encrypted"].startswith("enc:"))
+        cookies, expires_at = self.stored_cookies()
+        self.assertEqual(cookies[0]["value"], "s1")
+        self.assertEqual(expires_at, int(NOW + 1800))
+
+    def test_stored_session_is_reused_without_login_or_decrypt(self):
+        self.store.login(StubClient(), preferences())
+        client = StubClient()
+        result = self.store.login(client, preferences())
+        self.assertEqual(result.message, "Reused stored session")
+        self.assertEqual(client.logins, [])
+        self.assertEqual(client.cookies[0]["value"], "s1")
+        self.assertEqual(self.config_store.decrypted, 1)
+
+    def test_expired_session_logs_in_again(self):
+        self.store.login(StubClient(), preferences())
+        self.time.now += 1800
+        client = StubClient()
+        self.store.login(client, preferences())
+        self.assertEqual(len(client.logins), 1)
+
+    def test_cookie_expiry_caps_the_stored_session(self):
+        self.store.store("alice", [{"name": "a", "value": "1", "expires": NOW + 60}])
+        self.assertEqual(self.stored_cookies()[1], int(NOW + 60))
+
+    def test_unreadable_or_unavailable_sessions_are_ignored(self):
+        self.config_store.sessions["alice"] = {"cookies_encrypted": "garbage", "expiresAt": int(NOW + 600)}
+        self.assertIsNone(self.store.load("alice"))
+        self.config_store.fail_reads = True
+        self.assertIsNone(self.store.load("alice"))
+
+    def test_reauthentication_replaces_the_stored_session(self):
+        self.store.login(StubClient(), preferences())
+        client = StubClient(name="r")
+        self.store.login(client, preferences())
+        self.assertEqual(client.cookies[0]["value"], "s1")
+        self.assertTrue(client.reauthenticate())
+        # The rejected cookies are dropped before logging in again
+        self.assertEqual(client.logins[0][2], [])
+        self.assertEqual(client.cookies[0]["value"], "r1")
+        self.assertEqual(self.stored_cookies()[0][0]["value"], "r1")
+
+    def test_failed_login_stores_nothing(self):
+        result = self.store.login(StubClient(login_succeeds=False), preferences())
+        self.assertFalse(result.success)
+        self.assertEqual(self.config_store.sessions, {})
+
+    def test_async_reauthentication_is_single_flight(self):
+        client = AsyncStubClient()
+
+        async def main():
+            await self.store.login_async(client, preferences())
+            return await asyncio.gather(client.reauthenticate(), client.reauthenticate())
+
+        self.assertEqual(asyncio.run(main()), [True, True])
+        self.assertEqual(len(client.logins), 2)  # initial login + one shared relogin
+        self.assertEqual(self.stored_cookies()[0][0]["value"], "s2")
+
+
+if __name__ == "__main__":
+    unittest.main()
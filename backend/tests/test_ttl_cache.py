@@ -0,0 +1,70 @@
+import unittest
+
+from core.ttl_cache import CachedFailure, TtlCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TtlCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_entries_expire_after_ttl(self):
+        cache = TtlCache(ttl=10.0, clock=self.clock)
+        cache.set("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(cache.get("a"), 1)
+        self.clock.now = 10.0
+        self.assertIsNone(cache.get("a"))
+        self.assertNotIn("a", cache)
+
+    def test_per_entry_ttl_overrides_default(self):
+        cache = TtlCache(ttl=10.0, clock=self.clock)
+        cache.set("a", 1, ttl=1.0)
+        self.clock.now = 1.0
+        self.assertIsNone(cache.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        cache = TtlCache(maxsize=2, clock=self.clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_unbounded_cache_never_evicts(self):
+        cache = TtlCache(maxsize=None, clock=self.clock)
+        for key in range(500):
+            cache.set(key, key)
+        self.assertEqual(len(cache), 500)
+        self.assertEqual(cache.get(0), 0)
+        self.assertEqual(cache.stats()["evictions"], 0)
+
+    def test_negative_entry_raises_until_it_expires(self):
+        cache = TtlCache(clock=self.clock, negative_ttl=5.0)
+        cache.set_failure("a", ValueError("boom"))
+        with self.assertRaisesRegex(CachedFailure, "ValueError: boom"):
+            cache.get("a")
+        self.clock.now = 5.0
+        self.assertIsNone(cache.get("a"))
+
+    def test_stats_count_hits_and_misses(self):
+        cache = TtlCache(clock=self.clock)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hitRate"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""주말과 캐시된 공휴일로 만든 근무일 인덱스.
+
+백엔드 backend/src/core/business_calendar.py 와 같은 구현이다 (데스크톱 앱은
+백엔드 패키지를 포함하지 않으므로 따로 둔다).
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# 근무일을 찾을 때 앞뒤로 살펴볼 최대 연수
+MAX_YEAR_SPAN = 2
+
+
+class BusinessCalendar:
+    """연도별로 정렬된 근무일 배열을 bisect 로 조회한다.
+
+    - holidays_for(year, month): 해당 월의 공휴일(YYYYMMDD) 목록. 그 해를 처음 조회할 때 월별로 한 번 호출된다.
+    - invalidate(year, month): 한 달의 공휴일이 바뀌면 그 달만 다시 계산해 연도 배열에 끼워 넣는다.
+    """
+
+    def __init__(self, holidays_for: Callable[[int, int], Iterable[str]]) -> None:
+        self._holidays_for = holidays_for
+        self._years: Dict[int, List[date]] = {}
+        self._lock = threading.Lock()
+
+    def is_workday(self, day: date) -> bool:
+        days = self._year(day.year)
+        index = bisect_left(days, day)
+        return index < len(days) and days[index] == day
+
+    def next_workday(self, day: date, inclusive: bool = False) -> date:
+        """day 다음의 첫 근무일 (inclusive 이면 day 자신 포함)"""
+        search = bisect_left if inclusive else bisect_right
+        for year in range(day.year, day.year + MAX_YEAR_SPAN + 1):
+            days = self._year(year)
+            index = search(days, day) if year == day.year else 0
+            if index < len(days):
+                return days[index]
+        raise ValueError(f"No working day within {MAX_YEAR_SPAN} years after {day}")
+
+    def previous_workday(self, day: date, inclusive: bool = False) -> date:
+        """day 이전의 마지막 근무일 (inclusive 이면 day 자신 포함)"""
+        search = bisect_right if inclusive else bisect_left
+        for year in range(day.year, day.year - MAX_YEAR_SPAN - 1, -1):
+            days = self._year(year)
+            index = search(days, day) if year == day.year else len(days)
+            if index > 0:
+                return days[index - 1]
+        raise ValueError(f"No working day within {MAX_YEAR_SPAN} years before {day}")
+
+    def nearest_workday(self, day: date) -> date:
+        """day 가 근무일이면 day, 아니면 다음 근무일"""
+        return self.next_workday(day, inclusive=True)
+
+    def invalidate(self, year: int, month: int) -> None:
+        """한 달의 공휴일을 다시 읽는다. 아직 만들지 않은 연도는 건드리지 않는다."""
+        with self._lock:
+            days = self._years.get(year)
+        if days is None:
+            return
+        month_days = self._month(year, month)
+        start, end = self._month_bounds(year, month)
+        with self._lock:
+            days = list(self._years.get(year, days))
+            days[bisect_left(days, start):bisect_left(days, end)] = month_days
+            self._years[year] = days
+
+    def clear(self) -> None:
+        with self._lock:
+            self._years.clear()
+
+    def _year(self, year: int) -> List[date]:
+        with self._lock:
+            days = self._years.get(year)
+        if days is None:
+            days = [day for month in range(1, 13) for day in self._month(year, month)]
+            with self._lock:
+                days = self._years.setdefault(year, days)
+        return days
+
+    def _month(self, year: int, month: int) -> List[date]:
+        holidays = set(self._holidays_for(year, month) or ())
+        start, end = self._month_bounds(year, month)
+        days = (start + timedelta(days=offset) for offset in range((end - start).days))
+        return [day for day in days if day.weekday() < 5 and day.strftime("%Y%m%d") not in holidays]
+
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> Tuple[date, date]:
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return start, end
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import requests
 from tinydb import TinyDB, Query
 
+from business_calendar import BusinessCalendar
 from config import DB_FILE, HOLIDAY_TBL_NM
 from util import load_yaml
 
@@ -14,6 +15,8 @@ holiday_tbl = db.table(HOLIDAY_TBL_NM)
 class Holiday:
     def __init__(self, config):
         self.config = config
+        # 근무일 인덱스 (공휴일은 캐시에서 월 단위로 읽는다)
+        self.calendar = BusinessCalendar(lambda year, month: self.get_cached_holidays(year, month)[0])
 
     def fetch_holidays(self, year: int, month: int):
         # data.go.kr 샘플 코드와 동일하게 params 사용
@@ -55,6 +58,7 @@ class Holiday:
         key = f"{year}{month:02d}"
         now = datetime.now().strftime("%Y-%m-%d")
         holiday_tbl.upsert({"key": key, "holidays": holidays, "last_updated": now}, Query().key == key)
+        self.calendar.invalidate(year, month)
 
     def get_cached_holidays(self, year: int, month: int):
         key = f"{year}{month:02d}"
@@ -113,43 +117,21 @@ class Holiday:
         - 주말/휴일: 다음 평일 13시
         """
         now = datetime.now()
-        today_str = now.strftime('%Y%m%d')
-        
-        # 오늘이 평일이고 휴일이 아닌지 확인
-        year, month = now.year, now.month
-        holidays, _ = self.get_cached_holidays(year, month)
-        is_workday = now.weekday() < 5 and today_str not in holidays
-        
-        if is_workday and now.hour < 13:
-            return today_str
-        
-        # 다음 평일 찾기
-        next_date = now + timedelta(days=1)
-        while True:
-            year, month = next_date.year, next_date.month
-            holidays, _ = self.get_cached_holidays(year, month)
-            
-            if next_date.weekday() < 5 and next_date.strftime('%Y%m%d') not in holidays:
-                return next_date.strftime('%Y%m%d')
-            
-            next_date += timedelta(days=1)
+        today = now.date()
+
+        # 오늘이 평일이고 휴일이 아니면 13시 전까지는 오늘
+        if self.calendar.is_workday(today) and now.hour < 13:
+            return today.strftime('%Y%m%d')
+
+        return self.calendar.next_workday(today).strftime('%Y%m%d')
 
     def get_target_service_date(self, action_date_str):
         """
         예약 실행 날짜(action_date)를 기준으로 예약할 식단 날짜(service_date)를 계산합니다.
         - 원칙: 예약 실행일의 '다음 근무일'
         """
-        action_date = datetime.strptime(action_date_str, '%Y%m%d')
-        next_date = action_date + timedelta(days=1)
-        
-        while True:
-            year, month = next_date.year, next_date.month
-            holidays, _ = self.get_cached_holidays(year, month)
-            
-            if next_date.weekday() < 5 and next_date.strftime('%Y%m%d') not in holidays:
-                return next_date.strftime('%Y%m%d')
-            
-            next_date += timedelta(days=1)
+        action_date = datetime.strptime(action_date_str, '%Y%m%d').date()
+        return self.calendar.next_workday(action_date).strftime('%Y%m%d')
 
     def get_nearest_future_workday(self):
         """
@@ -157,33 +139,14 @@ class Holiday:
         - 오늘이 평일이면 오늘 반환
         - 오늘이 휴일이면 다음 평일 반환
         """
-        now = datetime.now()
-        date = now
-        
-        while True:
-            year, month = date.year, date.month
-            holidays, _ = self.get_cached_holidays(year, month)
-            
-            if date.weekday() < 5 and date.strftime('%Y%m%d') not in holidays:
-                return date.strftime('%Y%m%d')
-            
-            date += timedelta(days=1)
+        return self.calendar.nearest_workday(datetime.now().date()).strftime('%Y%m%d')
 
     def get_previous_workday(self, date_str):
         """
         주어진 날짜의 바로 전 평일(근무일)을 찾습니다.
         """
-        date = datetime.strptime(date_str, '%Y%m%d')
-        date -= timedelta(days=1)
-        
-        while True:
-            year, month = date.year, date.month
-            holidays, _ = self.get_cached_holidays(year, month)
-            
-            if date.weekday() < 5 and date.strftime('%Y%m%d') not in holidays:
-                return date.strftime('%Y%m%d')
-            
-            date -= timedelta(days=1)
+        date = datetime.strptime(date_str, '%Y%m%d').date()
+        return self.calendar.previous_workday(date).strftime('%Y%m%d')
 
 
 
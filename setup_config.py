@@ -256,7 +256,8 @@ def create_config():
                 'hour': 13,
                 'minute': 0,
                 'second': 0
-            }
+            },
+            'lead_ms': 0  # 서버 시계 기준 정각보다 먼저 요청을 보낼 시간 (밀리초)
         },
         '_salt': base64.b64encode(salt).decode(),
         '_encrypted': True
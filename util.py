@@ -1,6 +1,9 @@
+import math
 import os
 import sys
+import time
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 
 import yaml
 from config import CONFIG_FILE
@@ -70,3 +73,43 @@ def 다음_근무일(날짜):
 
 def already_done(response):
     return response.json()['errorMsg'] == '동일날짜에 이미 등록된 예약이 존재합니다.'
+
+
+def estimate_server_offset(session, url, samples=6, timeout=5):
+    """서버 Date 헤더로 (서버 시각 - 로컬 시각) 차이를 초 단위로 추정한다.
+    - Date 헤더는 초 단위이므로 각 샘플은 구간 [S - t1, S + 1 - t0] 을 준다 (NTP 방식)
+    - 구간을 교집합으로 좁히고, 다음 요청은 예상 초 경계에 도착하도록 맞춰 보낸다
+    - 실패하면 0 (로컬 시계 사용)
+    """
+    lower, upper = -math.inf, math.inf
+    rtt = None
+    for _ in range(samples):
+        if rtt is not None and math.isfinite(lower) and math.isfinite(upper):
+            arrival = time.time() + rtt / 2 + (lower + upper) / 2
+            time.sleep(math.ceil(arrival) - arrival)
+        t0 = time.time()
+        try:
+            response = session.head(url, timeout=timeout, verify=False, allow_redirects=False)
+            server_second = parsedate_to_datetime(response.headers["Date"]).timestamp()
+        except Exception:
+            continue
+        t1 = time.time()
+        rtt = t1 - t0 if rtt is None else min(rtt, t1 - t0)
+        new_lower, new_upper = max(lower, server_second - t1), min(upper, server_second + 1 - t0)
+        if new_lower > new_upper:
+            new_lower, new_upper = server_second - t1, server_second + 1 - t0
+        lower, upper = new_lower, new_upper
+
+    if not math.isfinite(lower) or not math.isfinite(upper):
+        return 0.0
+    return (lower + upper) / 2
+
+
+def wait_until_server_time(target_time, offset, lead=0.0):
+    """서버 시계 기준 target_time(로컬 naive datetime) - lead 초까지 ms 단위로 대기한다."""
+    local_target = target_time.timestamp() - offset - lead
+    while True:
+        remaining = local_target - time.time()
+        if remaining <= 0:
+            return
+        time.sleep(remaining - 0.05 if remaining > 0.1 else min(remaining, 0.001))